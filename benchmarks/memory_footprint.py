@@ -0,0 +1,97 @@
+"""Memory footprint of SeWebElement and the cost of SeElementsArray proxied calls.
+No browser is needed: elements are created with a stub WebElement reference,
+as SeElementsArray does for every found element.
+
+Run: python -m benchmarks.memory_footprint
+"""
+import gc
+import time
+import tracemalloc
+
+from selen_kaa.element.se_web_element import SeWebElement
+from selen_kaa.element.se_elements_array import SeElementsArray
+
+
+ELEMENTS_COUNT = 10000
+PROXIED_CALLS = 2000
+
+
+class StubWebDriver:
+    pass
+
+
+class StubWebElement:
+    pass
+
+
+class DictWait:
+    def __init__(self, webdriver):
+        self._webdriver = webdriver
+
+
+class DictElementWaits:
+    def __init__(self, se_web_element, webdriver, timeout):
+        self._web_element = se_web_element
+        self._timeout = timeout
+        self._wait = DictWait(webdriver)
+
+
+class DictWebElement:
+    """Layout before the slots: the attributes in `__dict__`,
+    `should` and `expect` created with the element, each with a Wait of its own.
+    """
+
+    def __init__(self, webdriver, selector, timeout):
+        self._timeout = timeout
+        self._webdriver = webdriver
+        self._selector = selector
+        self._element = None
+        self.locator_strategy = "css selector"
+        self.timing_stats = None
+        self.page = None
+        self.frame = ()
+        self._relocate = None
+        self.should = DictElementWaits(self, webdriver, timeout)
+        self.expect = DictElementWaits(self, webdriver, timeout)
+
+
+def measure_element_footprint(element_type=SeWebElement, count=ELEMENTS_COUNT):
+    """Bytes per element with `should` and `expect` conditions touched, the stub WebElement included."""
+    webdriver = StubWebDriver()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    elements = []
+    for _ in range(count):
+        element = element_type(webdriver, ".row", 4)
+        element._element = StubWebElement()
+        _ = element.should, element.expect
+        elements.append(element)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return allocated / count
+
+
+def measure_array_proxy(count=ELEMENTS_COUNT, calls=PROXIED_CALLS, method="index"):
+    """Seconds per proxied call, `arr.index(elem)` or `arr.copy()`, on a materialized array."""
+    arr = SeElementsArray(None, ".row", 4)
+    arr.element_type = SeWebElement
+    for _ in range(count):
+        element = SeWebElement(None, ".row", 4)
+        element.web_element = StubWebElement()
+        arr._elements_array.append(element)
+    first = arr[0]
+    call = (lambda: arr.index(first)) if method == "index" else arr.copy
+    start = time.perf_counter()
+    for _ in range(calls):
+        call()
+    return (time.perf_counter() - start) / calls
+
+
+if __name__ == "__main__":
+    print(f"Element footprint before the slots: {measure_element_footprint(DictWebElement):.0f} bytes per element")
+    print(f"SeWebElement footprint: {measure_element_footprint():.0f} bytes per element")
+    for method_ in ("index", "copy"):
+        print(f"SeElementsArray proxied `{method_}()` on {ELEMENTS_COUNT} items: "
+              f"{measure_array_proxy(method=method_) * 1e6:.1f} us")
@@ -0,0 +1,188 @@
+"""Batching of user interactions into one W3C Actions payload.
+`SeWebDriver.action_chains` needs resolved WebElements and a `perform()` per chain,
+ActionBatch accepts SeWebElements, resolves all of them in one lookup script
+and sends the whole interaction with one `perform()`.
+
+"""
+import time
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from selenium.webdriver import ActionChains
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.wait import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from selen_kaa.deadline import remaining
+from selen_kaa.frames import enter_frame
+from selen_kaa.helper_runtime import HelperRuntime
+from selen_kaa.global_config import DEFAULT_TIMEOUT
+from selen_kaa.element.se_element_interface import SeElementInterface
+from selen_kaa.utils import custom_types
+from selen_kaa.utils import se_utils
+
+
+TimeoutType = custom_types.TimeoutType
+ElementType = custom_types.ElementType
+
+
+class BatchTiming(NamedTuple):
+    """Duration of the batch steps in seconds."""
+    resolve: float
+    perform: float
+    total: float
+    actions: int
+    lookup_calls: int
+
+
+class ActionBatch:
+    """Builder of one W3C Actions sequence, targets are SeWebElements, WebElements or selectors.
+    >>>with browser.batch_actions() as batch:
+    ...    batch.hover(menu).click(menu_item).type(search_input, "selen-kaa")
+    >>>batch.timing.total
+    """
+
+    def __init__(self, webdriver: WebDriver, timeout: TimeoutType = DEFAULT_TIMEOUT):
+        """
+        :param webdriver: WebDriver to perform actions with.
+        :param timeout: time to wait for all targets to be present.
+        """
+        self._webdriver = webdriver
+        self._timeout = timeout
+        self._steps: List[Tuple[str, Tuple[Optional[ElementType], ...], Tuple[Any, ...]]] = []
+        self.timing: Optional[BatchTiming] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.perform()
+
+    def click(self, target: Optional[ElementType] = None):
+        """Click the target, or at the current pointer position if no target."""
+        return self._add("click", (target,))
+
+    def double_click(self, target: Optional[ElementType] = None):
+        return self._add("double_click", (target,))
+
+    def context_click(self, target: Optional[ElementType] = None):
+        return self._add("context_click", (target,))
+
+    def click_and_hold(self, target: Optional[ElementType] = None):
+        return self._add("click_and_hold", (target,))
+
+    def release(self, target: Optional[ElementType] = None):
+        return self._add("release", (target,))
+
+    def hover(self, target: ElementType):
+        """Move the pointer to the middle of the target."""
+        return self._add("move_to_element", (target,))
+
+    def drag_and_drop(self, source: ElementType, target: ElementType):
+        return self._add("drag_and_drop", (source, target))
+
+    def type(self, target: ElementType, text: str):
+        """Click the target to focus it and type the text."""
+        self._add("click", (target,))
+        return self._add("send_keys", (), (text,))
+
+    def send_keys(self, *keys_to_send: str):
+        """Type into the focused element."""
+        return self._add("send_keys", (), keys_to_send)
+
+    def key_down(self, key: str):
+        return self._add("key_down", (), (key,))
+
+    def key_up(self, key: str):
+        return self._add("key_up", (), (key,))
+
+    def pause(self, seconds: float):
+        return self._add("pause", (), (seconds,))
+
+    def perform(self) -> BatchTiming:
+        """Resolve all targets in one lookup and send all actions as one payload."""
+        start_time = time.perf_counter()
+        resolved, lookup_calls = self._resolve_targets()
+        resolved_time = time.perf_counter()
+
+        chain = ActionChains(self._webdriver)
+        for method, targets, args in self._steps:
+            elements = [resolved[id(target)] if target is not None else None for target in targets]
+            getattr(chain, method)(*elements, *args)
+        chain.perform()
+        end_time = time.perf_counter()
+
+        self.timing = BatchTiming(resolve=resolved_time - start_time,
+                                  perform=end_time - resolved_time,
+                                  total=end_time - start_time,
+                                  actions=len(self._steps),
+                                  lookup_calls=lookup_calls)
+        self._steps = []
+        return self.timing
+
+    def _add(self, method: str, targets: Tuple[Optional[ElementType], ...], args: Tuple[Any, ...] = ()):
+        self._steps.append((method, targets, args))
+        return self
+
+    def _resolve_targets(self):
+        """WebElements of all targets by id(target), and the number of lookup calls."""
+        resolved = {}
+        to_lookup = {}
+        lookup_calls = 0
+        # actions can't span frames, all targets are resolved in the one frame of the batch
+        target_frames = {getattr(target, "frame", ()) for _, targets, _ in self._steps for target in targets
+                         if isinstance(target, SeElementInterface)}
+        if len(target_frames) > 1:
+            raise ValueError(f"Targets of ActionBatch are in different frames: {sorted(target_frames)}.")
+        enter_frame(self._webdriver, target_frames.pop() if target_frames else (), self._timeout)
+        for _, targets, _ in self._steps:
+            for target in targets:
+                if target is None or id(target) in resolved or id(target) in to_lookup:
+                    continue
+                if isinstance(target, WebElement):
+                    resolved[id(target)] = target
+                    continue
+                if isinstance(target, SeElementInterface):
+                    cached = getattr(target, "_element", None)
+                    if cached is not None:
+                        resolved[id(target)] = cached
+                        continue
+                    js_locator = se_utils.to_js_locator(target.locator_strategy, target.selector)
+                    if js_locator is None:
+                        # the locator can't be evaluated in the browser, resolve it separately
+                        resolved[id(target)] = target.web_element
+                        lookup_calls += 1
+                        continue
+                elif isinstance(target, str):
+                    js_locator = se_utils.to_js_locator(se_utils.get_selector_type(target), target)
+                else:
+                    raise TypeError(f"Unsupported target of ActionBatch: {target!r}.")
+                to_lookup[id(target)] = (target, js_locator)
+
+        if to_lookup:
+            ids = list(to_lookup)
+            locators = [to_lookup[id_][1] for id_ in ids]
+            missing: List[int] = []
+
+            runtime = HelperRuntime.shared(self._webdriver)
+
+            def lookup(_driver):
+                nonlocal lookup_calls, missing
+                lookup_calls += 1
+                elements = runtime.call("queryFirstBatch", locators)
+                missing = [index for index, element in enumerate(elements) if element is None]
+                return elements if not missing else False
+
+            try:
+                elements_ = WebDriverWait(self._webdriver, remaining(self._timeout)).until(lookup)
+            except TimeoutException:
+                selectors = ", ".join(_selector_of(to_lookup[ids[index]][0]) for index in missing)
+                raise NoSuchElementException(f"Targets of ActionBatch with selectors {selectors} "
+                                             f"have not been found.")
+            resolved.update(zip(ids, elements_))
+        return resolved, lookup_calls
+
+
+def _selector_of(target) -> str:
+    return target if isinstance(target, str) else target.selector
@@ -0,0 +1,77 @@
+"""Deadlines of waits and a test-level time budget.
+A wait creates one Deadline from its timeout, and every nested step (element lookup, poll, sleep)
+gets only the remaining time, so a 4 seconds wait ends in 4 seconds.
+A budget caps all deadlines created inside of it:
+>>>with browser.deadline(30):
+...    login_page.login()
+...    dashboard.title.should.be_visible(timeout=60)  # waits 30 seconds at most
+
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Union
+
+from selen_kaa.utils import custom_types
+
+
+TimeoutType = custom_types.TimeoutType
+
+# monotonic time, when the current budget ends, per thread and per asyncio task
+_budget_expires_at: ContextVar[Optional[float]] = ContextVar("selen_kaa_budget", default=None)
+
+
+class Deadline:
+    """Point in time, when a wait has to end, capped by the current budget.
+    `str(deadline)` is the requested timeout, so error messages keep the timeout the user passed.
+    """
+
+    __slots__ = ("timeout", "_expires_at")
+
+    def __init__(self, timeout: TimeoutType):
+        self.timeout = timeout
+        expires_at = time.monotonic() + (timeout or 0)
+        budget_expires_at = _budget_expires_at.get()
+        if budget_expires_at is not None and budget_expires_at < expires_at:
+            expires_at = budget_expires_at
+        self._expires_at = expires_at
+
+    @classmethod
+    def of(cls, timeout: Union[TimeoutType, "Deadline"]) -> "Deadline":
+        """The deadline itself, or a new deadline for a timeout."""
+        return timeout if isinstance(timeout, Deadline) else cls(timeout)
+
+    def remaining(self) -> float:
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self._expires_at
+
+    def __str__(self):
+        return str(self.timeout)
+
+    def __repr__(self):
+        return f"Deadline(timeout={self.timeout}, remaining={self.remaining():.3f})"
+
+
+def remaining(timeout: Union[TimeoutType, Deadline]) -> float:
+    """Seconds to wait for a timeout or a deadline, capped by the current budget."""
+    return Deadline.of(timeout).remaining()
+
+
+@contextmanager
+def budget(seconds: float) -> Iterator[Deadline]:
+    """Cap every wait inside of the block, a nested budget can only shorten the outer one.
+    :param seconds: time budget of the block.
+    :return: deadline of the budget, e.g. to check `remaining()`.
+    """
+    expires_at = time.monotonic() + seconds
+    outer_expires_at = _budget_expires_at.get()
+    if outer_expires_at is not None and outer_expires_at < expires_at:
+        expires_at = outer_expires_at
+    token = _budget_expires_at.set(expires_at)
+    try:
+        yield Deadline(seconds)
+    finally:
+        _budget_expires_at.reset(token)
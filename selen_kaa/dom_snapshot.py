@@ -0,0 +1,239 @@
+"""Offline assertions on a snapshot of the rendered DOM.
+The serialized DOM and computed visibility flags are captured with one script,
+then parsed with lxml, so hundreds of checks of static facts cost microseconds instead of commands.
+Requires `pip install lxml cssselect`.
+
+"""
+import re
+from typing import Dict, List, Optional
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from selen_kaa.errors import TIMEOUT_BASE_ERR_MSG
+from selen_kaa.utils import custom_types
+from selen_kaa.utils import html_tree
+from selen_kaa.utils.se_utils import get_selector_type
+from selen_kaa.utils.js_scripts import IS_VISIBLE_JS
+
+
+TimeoutType = custom_types.TimeoutType
+
+VISIBLE_ATTR = "data-selen-kaa-visible"
+ON_SCREEN_ATTR = "data-selen-kaa-on-screen"
+
+# Serializes a clone of the document, every element of the clone gets the computed flags
+# of the live element, the live DOM is not modified.
+SNAPSHOT_SCRIPT = IS_VISIBLE_JS + """
+    var root = document.documentElement, clone = root.cloneNode(true);
+    var live = root.getElementsByTagName('*'), cloned = clone.getElementsByTagName('*');
+    var width = document.documentElement.clientWidth, height = document.documentElement.clientHeight;
+    function mark(liveEl, clonedEl) {
+        clonedEl.setAttribute('%(visible)s', isVisible(liveEl) ? '1' : '0');
+        var rect = liveEl.getBoundingClientRect();
+        var onScreen = rect.left + window.pageXOffset < width && rect.top + window.pageYOffset < height;
+        clonedEl.setAttribute('%(on_screen)s', onScreen ? '1' : '0');
+    }
+    mark(root, clone);
+    for (var i = 0; i < live.length; i++) { mark(live[i], cloned[i]); }
+    return [clone.outerHTML, location.href, document.title];
+""" % {"visible": VISIBLE_ATTR, "on_screen": ON_SCREEN_ATTR}
+
+_ID_SELECTOR = re.compile(r"^#([A-Za-z_][\w-]*)$")
+
+
+class DomSnapshot:
+    """Snapshot of the DOM with the same `should`/`expect` conditions as SeWebElement.
+    >>>snapshot = browser.dom_snapshot()
+    >>>snapshot.find("#title").should.have_exact_text("Selen-kaa")
+    >>>len(snapshot.find_all(".row"))
+    """
+
+    def __init__(self, html: str, url: str = "", title: str = ""):
+        html_tree.require_lxml("DOM snapshot")
+        self.url = url
+        self.title = title
+        self._root = html_tree.lxml_html.document_fromstring(html)
+        self._by_id: Optional[Dict[str, object]] = None
+
+    @classmethod
+    def from_webdriver(cls, webdriver: WebDriver) -> "DomSnapshot":
+        """Capture the current page with one script."""
+        html_tree.require_lxml("DOM snapshot")
+        html, url, title = webdriver.execute_script(SNAPSHOT_SCRIPT)
+        return cls(html, url, title)
+
+    def find(self, selector: str) -> "SnapshotElement":
+        """The first element matched by a css selector or xpath.
+        Returned even if nothing matches, so `not_present_in_dom` can be checked.
+        """
+        nodes = self._select(self._root, selector, first=True)
+        return SnapshotElement(self, selector, nodes[0] if nodes else None)
+
+    def find_all(self, selector: str) -> List["SnapshotElement"]:
+        return [SnapshotElement(self, selector, node) for node in self._select(self._root, selector)]
+
+    def _select(self, node, selector: str, first: bool = False) -> list:
+        id_match = _ID_SELECTOR.match(selector)
+        if id_match and node is self._root:
+            if self._by_id is None:
+                self._by_id = {}
+                for element in self._root.iter():
+                    element_id = element.get("id") if isinstance(element.tag, str) else None
+                    if element_id is not None:
+                        self._by_id.setdefault(element_id, element)
+            found = self._by_id.get(id_match.group(1))
+            return [found] if found is not None else []
+        nodes = html_tree.select(node, get_selector_type(selector), selector)
+        return nodes[:1] if first else nodes
+
+
+class SnapshotElement:
+    """Element of a DomSnapshot, mimics the read-only part of SeWebElement."""
+
+    __slots__ = ("_snapshot", "_selector", "_node", "_text")
+
+    def __init__(self, snapshot: DomSnapshot, selector: str, node):
+        self._snapshot = snapshot
+        self._selector = selector
+        self._node = node
+        self._text: Optional[str] = None
+
+    @property
+    def selector(self) -> str:
+        return self._selector
+
+    @property
+    def is_present(self) -> bool:
+        return self._node is not None
+
+    @property
+    def node(self):
+        """lxml element."""
+        if self._node is None:
+            raise NoSuchElementException(f"Web Element with selector {self._selector} "
+                                         f"has not been found in DOM snapshot.")
+        return self._node
+
+    @property
+    def tag_name(self) -> str:
+        return self.node.tag
+
+    @property
+    def text(self) -> str:
+        """Visible text, an approximation of `innerText`: hidden subtrees are skipped,
+        whitespace is collapsed and block elements are separated with new lines.
+        """
+        if self._text is None:
+            self._text = html_tree.visible_text(self.node, _is_hidden)
+        return self._text
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        return self.node.get(name)
+
+    def get_class(self) -> str:
+        return self.node.get("class", "")
+
+    def is_displayed(self) -> bool:
+        # elements of a document parsed without the flags are considered visible
+        return self.node.get(VISIBLE_ATTR, "1") == "1"
+
+    def is_on_the_screen(self) -> bool:
+        return self.node.get(ON_SCREEN_ATTR, "1") == "1"
+
+    def find(self, selector: str) -> "SnapshotElement":
+        """The first descendant matched by a css selector or xpath."""
+        nodes = self._snapshot._select(self.node, selector, first=True)
+        return SnapshotElement(self._snapshot, selector, nodes[0] if nodes else None)
+
+    def find_all(self, selector: str) -> List["SnapshotElement"]:
+        return [SnapshotElement(self._snapshot, selector, node)
+                for node in self._snapshot._select(self.node, selector)]
+
+    @property
+    def should(self) -> "SnapshotConditions":
+        """Returns the element if the condition is true, otherwise throws TimeoutException,
+        as SeWebElement.should does, so the checks are interchangeable.
+        """
+        return SnapshotConditions(self, raise_error=True)
+
+    @property
+    def expect(self) -> "SnapshotConditions":
+        """Returns the element if the condition is true, otherwise False."""
+        return SnapshotConditions(self, raise_error=False)
+
+    def __repr__(self):
+        return f"Selen-kaa snapshot element with selector `{self._selector}`."
+
+
+def _is_hidden(node) -> bool:
+    return node.get(VISIBLE_ATTR) == "0"
+
+
+class SnapshotConditions:
+    """The conditions of ElementWaits evaluated on a snapshot.
+    `timeout` is accepted for compatibility only: a snapshot doesn't change.
+    """
+
+    __slots__ = ("_element", "_raise_error")
+
+    def __init__(self, element: SnapshotElement, raise_error: bool):
+        self._element = element
+        self._raise_error = raise_error
+
+    def _result(self, is_true: bool, err_msg: str):
+        if is_true:
+            return self._element
+        if self._raise_error:
+            raise TimeoutException(f"{err_msg} (in DOM snapshot)")
+        return False
+
+    def _base_err_msg(self, condition: str) -> str:
+        return TIMEOUT_BASE_ERR_MSG.format(0, self._element.selector, condition)
+
+    def be_visible(self, timeout: TimeoutType = None):
+        element = self._element
+        return self._result(element.is_present and element.is_displayed(), self._base_err_msg("be visible"))
+
+    def be_invisible(self, timeout: TimeoutType = None):
+        element = self._element
+        return self._result(not element.is_present or not element.is_displayed(),
+                            self._base_err_msg("disappear"))
+
+    def have_class(self, expected_class: str, timeout: TimeoutType = None):
+        actual_class = self._element.get_class() if self._element.is_present else None
+        is_true = actual_class is not None and set(expected_class.split()).issubset(actual_class.split())
+        return self._result(is_true, f"TimeoutException while waited 0 for class '{expected_class}'. "
+                                     f"Actual class is '{actual_class}'.")
+
+    def include_element(self, child_selector: str, timeout: TimeoutType = None):
+        is_true = self._element.is_present and self._element.find(child_selector).is_present
+        return self._result(is_true, f"TimeoutException while waiting for the element "
+                                     f"to have a child '{child_selector}'.")
+
+    def contain_text(self, text: str, timeout: TimeoutType = None):
+        actual = self._element.text if self._element.is_present else None
+        return self._result(actual is not None and text in actual,
+                            f"TimeoutException while waited 0 for the element {self._element.selector} "
+                            f"to contain text '{text}'. Actual text '{actual}'")
+
+    def have_similar_text(self, text: str, timeout: TimeoutType = None):
+        actual = self._element.text if self._element.is_present else None
+        is_true = actual is not None and any((actual == text, actual.lower() == text.lower(),
+                                              "".join(actual.split()) == "".join(text.split())))
+        return self._result(is_true, f"TimeoutException while waited 0 for text '{text}'. "
+                                     f"Actual text is '{actual}'")
+
+    def have_exact_text(self, text: str, timeout: TimeoutType = None):
+        actual = self._element.text if self._element.is_present else None
+        return self._result(actual == text,
+                            f"TimeoutException while waited 0 for the element {self._element.selector} "
+                            f"to have exact text '{text}'. Actual text '{actual}'")
+
+    def not_present_in_dom(self, timeout: TimeoutType = None):
+        return self._result(not self._element.is_present, self._base_err_msg("not be present in DOM"))
+
+    def be_on_the_screen(self, timeout: TimeoutType = None):
+        element = self._element
+        return self._result(element.is_present and element.is_on_the_screen(),
+                            "TimeoutException while waiting 0 sec for element to be in viewport.")
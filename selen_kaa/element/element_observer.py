@@ -0,0 +1,269 @@
+"""Streams of DOM changes of an element.
+A MutationObserver installed in the page buffers compact change records,
+so intermediate states (progress text, a toast shown for a moment) are not missed between polls.
+The buffer is drained with one script per interval by the thread, which iterates over the observer or waits
+for a change, so the drain doesn't interleave with the commands of the test: the frame of the element
+is selected before the drain, and the window is the one the test has selected.
+
+"""
+import time
+from collections import deque
+from typing import Callable, Deque, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from selen_kaa import frames
+from selen_kaa.utils import custom_types
+
+
+TimeoutType = custom_types.TimeoutType
+
+ATTRIBUTES = "attributes"
+TEXT = "text"
+CHILDREN = "children"
+
+# Installs an observer of the element in `window.__selenKaaObservers`, returns its id.
+# Arguments: element, options {attributes: bool or Array of names, text, children, maxRecords, maxText}.
+INSTALL_OBSERVER_SCRIPT = """
+    var el = arguments[0], options = arguments[1];
+    var registry = window.__selenKaaObservers = window.__selenKaaObservers || {next: 0, observers: {}};
+    var id = String(++registry.next);
+    var state = {records: [], dropped: 0, lastText: null};
+    function textOf(node) {
+        // WebElement.text of an element, which is not rendered, is empty
+        if (node.isConnected && !node.getClientRects().length) { return ''; }
+        var text = node.innerText !== undefined ? node.innerText : node.textContent;
+        return (text || '').replace(/\\u00a0/g, ' ').trim().slice(0, options.maxText);
+    }
+    function describe(node) {
+        var description = node.tagName.toLowerCase();
+        if (node.id) { description += '#' + node.id; }
+        if (typeof node.className === 'string' && node.className.trim()) {
+            description += '.' + node.className.trim().split(/\\s+/).join('.');
+        }
+        var text = (node.textContent || '').trim().slice(0, 100);
+        return text ? description + ' "' + text + '"' : description;
+    }
+    function push(record) {
+        if (state.records.length >= options.maxRecords) { state.dropped++; return; }
+        record.time = Date.now();
+        state.records.push(record);
+    }
+    state.handle = function (mutations) {
+        var added = [], removed = [];
+        mutations.forEach(function (mutation) {
+            if (mutation.type === 'attributes' && mutation.target === el) {
+                push({type: 'attributes', name: mutation.attributeName,
+                      value: el.getAttribute(mutation.attributeName), oldValue: mutation.oldValue});
+            } else if (mutation.type === 'childList' && options.children) {
+                Array.prototype.forEach.call(mutation.addedNodes, function (node) {
+                    if (node.nodeType === 1) { added.push(describe(node)); }
+                });
+                Array.prototype.forEach.call(mutation.removedNodes, function (node) {
+                    if (node.nodeType === 1) { removed.push(describe(node)); }
+                });
+            }
+        });
+        if (added.length || removed.length) { push({type: 'children', added: added, removed: removed}); }
+        if (options.text) {
+            var text = textOf(el);
+            if (text !== state.lastText) {
+                push({type: 'text', value: text, oldValue: state.lastText});
+                state.lastText = text;
+            }
+        }
+    };
+    state.lastText = options.text ? textOf(el) : null;
+    state.observer = new MutationObserver(state.handle);
+    var init = {childList: options.children || options.text, subtree: options.children || options.text,
+                characterData: options.text};
+    if (options.attributes) {
+        init.attributes = true;
+        init.attributeOldValue = true;
+        if (Array.isArray(options.attributes)) { init.attributeFilter = options.attributes; }
+    }
+    state.observer.observe(el, init);
+    registry.observers[id] = state;
+    return id;
+"""
+
+# Returns [records, dropped count] buffered since the last drain, null if the document has been replaced.
+# Arguments: observer id, true to disconnect the observer after the drain.
+DRAIN_OBSERVER_SCRIPT = """
+    var registry = window.__selenKaaObservers, id = arguments[0], stop = arguments[1];
+    var state = registry && registry.observers[id];
+    if (!state) { return null; }
+    var pending = state.observer.takeRecords();
+    if (pending.length) { state.handle(pending); }
+    var result = [state.records, state.dropped];
+    state.records = [];
+    state.dropped = 0;
+    if (stop) {
+        state.observer.disconnect();
+        delete registry.observers[id];
+    }
+    return result;
+"""
+
+
+class ChangeRecord(NamedTuple):
+    """One change of an observed element."""
+    type: str
+    # time of the change in the browser, seconds since the epoch
+    timestamp: float
+    # ATTRIBUTES: attribute name, new and old values; TEXT: new and old visible text
+    name: Optional[str] = None
+    value: Optional[str] = None
+    old_value: Optional[str] = None
+    # CHILDREN: descriptions of added and removed elements, e.g. `div#id.toast "Saved"`
+    added: Tuple[str, ...] = ()
+    removed: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_js(cls, record: dict) -> "ChangeRecord":
+        return cls(type=record["type"],
+                   timestamp=record["time"] / 1000,
+                   name=record.get("name"),
+                   value=record.get("value"),
+                   old_value=record.get("oldValue"),
+                   added=tuple(record.get("added", ())),
+                   removed=tuple(record.get("removed", ())))
+
+
+class ElementObserver:
+    """Change records of an element as an iterator, or pushed to a callback.
+    >>>with progress.observe(attributes=False, children=False) as observer:
+    ...    start_button.click()
+    ...    observer.wait_for(lambda change: change.value == "100%", timeout=10)
+    >>>[change.value for change in observer.history]
+    """
+
+    def __init__(self,
+                 webdriver: WebDriver,
+                 web_element: WebElement,
+                 attributes: Union[bool, Sequence[str]] = True,
+                 text: bool = True,
+                 children: bool = True,
+                 interval: float = 0.1,
+                 callback: Optional[Callable[[ChangeRecord], None]] = None,
+                 max_records: int = 1000,
+                 frame: frames.FramePathType = None):
+        """
+        :param webdriver: WebDriver of the element.
+        :param web_element: element to observe, changes of its subtree are observed too.
+        :param attributes: observe attributes of the element, True for all or names of the attributes.
+        :param text: observe the visible text of the element.
+        :param children: observe added and removed elements of the subtree.
+        :param interval: seconds between drains of the in-page buffer while iterating or waiting.
+        :param callback: called for every record by `poll()`, the iteration, `wait_for()` and `stop()`,
+        the iterator is not fed then.
+        :param max_records: size of the in-page buffer, records over it are counted in `dropped`.
+        :param frame: frame path of the element, see `selen_kaa.frames`.
+        """
+        self._webdriver = webdriver
+        self._web_element = web_element
+        self._options = {"attributes": list(attributes) if not isinstance(attributes, bool) else attributes,
+                         "text": text, "children": children, "maxRecords": max_records, "maxText": 10000}
+        self._interval = interval
+        self._callback = callback
+        self._frame = frames.to_frame_path(frame)
+        # drained records, which haven't been iterated yet
+        self._pending: Deque[ChangeRecord] = deque()
+        self._observer_id: Optional[str] = None
+        self._ended = False
+        self.history: List[ChangeRecord] = []
+        self.dropped = 0
+        self.error: Optional[Exception] = None
+
+    def start(self) -> "ElementObserver":
+        frames.enter_frame(self._webdriver, self._frame)
+        self._observer_id = self._webdriver.execute_script(INSTALL_OBSERVER_SCRIPT, self._web_element, self._options)
+        return self
+
+    def stop(self):
+        """Drain the last records, disconnect the observer and end the iteration."""
+        if self._ended:
+            return
+        self._ended = True
+        if self._observer_id is None:
+            return
+        try:
+            self._drain(stop=True)
+        except WebDriverException as exc:
+            # the session or the window is gone, nothing to disconnect
+            self.error = self.error or exc
+
+    @property
+    def is_active(self) -> bool:
+        return self._observer_id is not None and not self._ended
+
+    def __enter__(self):
+        if self._observer_id is None:
+            self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __iter__(self) -> Iterator[ChangeRecord]:
+        return self.changes()
+
+    def poll(self) -> int:
+        """Drain the buffered records now, e.g. to feed the callback. Returns the number of new records."""
+        if not self.is_active:
+            return 0
+        try:
+            drained = self._drain()
+        except WebDriverException as exc:
+            self.error = exc
+            drained = None
+        if drained is None:
+            # the document has been replaced or the session is gone, the stream is over
+            self._ended = True
+            return 0
+        return drained
+
+    def changes(self, timeout: TimeoutType = None) -> Iterator[ChangeRecord]:
+        """Records as they are drained, until the observer is stopped or `timeout` seconds have passed."""
+        deadline = time.time() + timeout if timeout is not None else None
+        while True:
+            if self._pending:
+                yield self._pending.popleft()
+                continue
+            if not self.is_active:
+                return
+            if self.poll():
+                continue
+            time_left = deadline - time.time() if deadline is not None else self._interval
+            if time_left <= 0:
+                return
+            time.sleep(min(self._interval, time_left))
+
+    def wait_for(self, predicate: Callable[[ChangeRecord], bool], timeout: TimeoutType = 4) -> ChangeRecord:
+        """The first record matching the predicate, raises TimeoutException if none comes within timeout."""
+        for record in self.changes(timeout):
+            if predicate(record):
+                return record
+        if self.error is not None:
+            raise TimeoutException(f"Observer of the element failed: {self.error}")
+        raise TimeoutException(f"TimeoutException while waited {timeout} second(s) for an expected change "
+                               f"of the element. Last changes: {self.history[-10:]}")
+
+    def _drain(self, stop: bool = False) -> Optional[int]:
+        """Fetch the buffered records, None if the observer has gone with its document."""
+        frames.enter_frame(self._webdriver, self._frame)
+        result = self._webdriver.execute_script(DRAIN_OBSERVER_SCRIPT, self._observer_id, stop)
+        if result is None:
+            return None
+        records, dropped = result
+        self.dropped += dropped
+        for record in records:
+            change = ChangeRecord.from_js(record)
+            self.history.append(change)
+            if self._callback is not None:
+                self._callback(change)
+            else:
+                self._pending.append(change)
+        return len(records)
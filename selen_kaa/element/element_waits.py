@@ -5,12 +5,25 @@ from selen_kaa.waits import Wait
 
 
 class ElementWaits:
-    """True if condition is fulfilled else throws exception."""
+    """True if condition is fulfilled else throws exception.
+    Holds references only, and Wait is shared per webdriver.
+    """
 
-    def __init__(self, se_web_element, webdriver: WebDriver, timeout: TimeoutType):
+    __slots__ = ("__web_element", "_default_timeout", "_wait")
+
+    def __init__(self, se_web_element, webdriver: WebDriver, timeout: TimeoutType = None):
+        """
+        :param timeout: default timeout of the conditions, the current timeout of the element if None.
+        """
         self.__web_element = se_web_element
-        self._timeout = timeout
-        self._wait = Wait(webdriver)
+        self._default_timeout = timeout
+        self._wait = Wait.shared(webdriver)
+
+    @property
+    def _timeout(self) -> TimeoutType:
+        if self._default_timeout is not None:
+            return self._default_timeout
+        return self.__web_element.timeout
 
     def be_visible(self, timeout: TimeoutType = None):
         """True when an element is visible on the html page.
@@ -11,6 +11,8 @@ class Expectations(ElementWaits):
     Errors are handled by returning False.
     """
 
+    __slots__ = ()
+
     def be_visible(self, timeout: TimeoutType = None):
         """True when an element is visible on the html page.
         :param timeout: time to wait element visibility.
@@ -0,0 +1,144 @@
+"""Uploads of files to the machine of a remote browser.
+`send_keys(path)` of Selenium zips and base64-encodes the whole file in memory and sends it in one request.
+Here the file is zipped into a temporary file, and the request body is streamed from it in chunks,
+so the memory doesn't grow with the size of the file. The remote path of an uploaded file is cached
+by the name and the sha256 of the file per session, the same file is not sent twice.
+>>>result = page.attachment_input.upload("fixtures/video-200mb.mp4")
+>>>print(f"{result.size} bytes in {result.seconds:.1f}s, {result.throughput / 2 ** 20:.1f} MiB/s")
+
+"""
+import base64
+import hashlib
+import http.client
+import json
+import os
+import ssl
+import tempfile
+import threading
+import time
+import zipfile
+from typing import Dict, Iterator, NamedTuple, Tuple
+from urllib import parse
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from selen_kaa.deadline import remaining
+
+
+# multiple of 3, so the base64 of the chunks joins without padding in between
+CHUNK_SIZE = 3 * 2 ** 18
+UPLOAD_TIMEOUT = 300
+
+# (url of the remote end, session id, file name, sha256 of the content): remote path,
+# the name is a part of the remote path, which the application may show or send
+_uploaded: Dict[Tuple[str, str, str, str], str] = {}
+_uploaded_lock = threading.Lock()
+
+
+class UploadResult(NamedTuple):
+    """Report of an upload."""
+    # path of the file on the machine of the browser
+    remote_path: str
+    # size of the file in bytes
+    size: int
+    # sha256 of the content, empty for a local webdriver
+    sha256: str
+    # bytes of the request body, 0 if nothing has been sent
+    sent_bytes: int
+    seconds: float
+    # True if the file of the same name and content had been uploaded in the session before
+    cached: bool
+
+    @property
+    def throughput(self) -> float:
+        """Bytes of the file per second, 0 if nothing has been sent."""
+        if not self.sent_bytes or not self.seconds:
+            return 0.0
+        return self.size / self.seconds
+
+
+def file_digest(path: str) -> Tuple[str, int]:
+    """sha256 of the content and the size of a file, read in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _request_body(zipped, zipped_size: int) -> Tuple[Iterator[bytes], int]:
+    """Chunks of `{"file": "<base64 of the zip>"}` and its length."""
+    prefix, suffix = b'{"file":"', b'"}'
+    length = len(prefix) + 4 * ((zipped_size + 2) // 3) + len(suffix)
+
+    def chunks():
+        yield prefix
+        for chunk in iter(lambda: zipped.read(CHUNK_SIZE), b""):
+            yield base64.b64encode(chunk)
+        yield suffix
+
+    return chunks(), length
+
+
+def _connection(url: parse.ParseResult, timeout: float) -> http.client.HTTPConnection:
+    if url.scheme == "https":
+        return http.client.HTTPSConnection(url.hostname, url.port, timeout=timeout,
+                                           context=ssl.create_default_context())
+    return http.client.HTTPConnection(url.hostname, url.port, timeout=timeout)
+
+
+def _send(webdriver: WebDriver, zipped, zipped_size: int, timeout) -> Tuple[str, int]:
+    """Remote path of the uploaded file and the number of bytes sent."""
+    executor = webdriver.command_executor
+    url = parse.urlparse(executor._url)
+    headers = executor.get_remote_connection_headers(url)
+    body, length = _request_body(zipped, zipped_size)
+    headers["Content-Length"] = str(length)
+    path = f"{url.path.rstrip('/')}/session/{webdriver.session_id}/se/file"
+    connection = _connection(url, remaining(timeout))
+    try:
+        connection.request("POST", path, body=body, headers=headers)
+        response = connection.getresponse()
+        data = response.read().decode("utf-8")
+    finally:
+        connection.close()
+    try:
+        value = json.loads(data).get("value")
+    except ValueError:
+        value = None
+    if response.status >= 400 or not isinstance(value, str):
+        message = value.get("message") if isinstance(value, dict) else data[:200]
+        raise WebDriverException(f"Upload of the file has failed with the status {response.status}: {message}")
+    return value, length
+
+
+def upload_file(webdriver: WebDriver, path: str, timeout=UPLOAD_TIMEOUT) -> UploadResult:
+    """Send the file to the remote end of the webdriver, unless it has been sent in the session.
+    The local path is returned for a local webdriver, the browser reads the file itself, nothing is hashed.
+    :param webdriver: WebDriver of the session.
+    :param path: path of the local file.
+    :param timeout: seconds to wait for the remote end on every read and write, or a Deadline.
+    """
+    path = os.path.abspath(path)
+    if not getattr(webdriver, "_is_remote", True):
+        return UploadResult(path, os.path.getsize(path), "", 0, 0.0, cached=False)
+    sha256, size = file_digest(path)
+    key = (webdriver.command_executor._url, webdriver.session_id, os.path.basename(path), sha256)
+    with _uploaded_lock:
+        remote_path = _uploaded.get(key)
+    if remote_path is not None:
+        return UploadResult(remote_path, size, sha256, 0, 0.0, cached=True)
+    start = time.monotonic()
+    with tempfile.TemporaryFile() as zipped:
+        with zipfile.ZipFile(zipped, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.write(path, os.path.basename(path))
+        zipped_size = zipped.tell()
+        zipped.seek(0)
+        remote_path, sent_bytes = _send(webdriver, zipped, zipped_size, timeout)
+    seconds = time.monotonic() - start
+    with _uploaded_lock:
+        _uploaded[key] = remote_path
+    return UploadResult(remote_path, size, sha256, sent_bytes, seconds, cached=False)
@@ -6,6 +6,9 @@ class SeElementInterface(ABC):
     Used for type reference. Shall be implemented in separate class.
     """
 
+    # empty slots, so implementations can be slotted too
+    __slots__ = ()
+
     @property
     def web_element(self):
         raise NotImplementedError()
@@ -17,6 +20,10 @@ class SeElementInterface(ABC):
     def get_web_element_by_timeout(self, timeout):
         raise NotImplementedError()
 
+    def _recovering_stale(self, operation, element, deadline):
+        """Result of the operation on the web element, implementations may find a stale element again."""
+        return operation(element)
+
     @property
     def selector(self):
         raise NotImplementedError()
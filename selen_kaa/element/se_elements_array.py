@@ -1,20 +1,71 @@
-from typing import Optional
+import re
+import time
+import uuid
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Pattern, Union
 
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support.wait import WebDriverWait
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.expected_conditions import presence_of_all_elements_located
+from selenium.common.exceptions import (NoSuchElementException, StaleElementReferenceException, TimeoutException,
+                                        WebDriverException)
+from selenium.webdriver.remote.webelement import WebElement
 
-from selen_kaa.utils.se_utils import get_selector_type
+from selen_kaa import frames
+from selen_kaa import locators
+from selen_kaa.utils.se_utils import get_selector_type, to_js_locator, javascript_enabled
+from selen_kaa.deadline import Deadline, remaining
+from selen_kaa.helper_runtime import HelperRuntime
 from selen_kaa.utils import custom_types
 
 TimeoutType = custom_types.TimeoutType
 
+_JS_REGEX_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+# characters of the text kept as the identity of an item found without JavaScript
+_IDENTITY_LENGTH = 200
+
+
+def _text_identity(web_element: WebElement) -> str:
+    return " ".join(web_element.text.split())[:_IDENTITY_LENGTH]
+
+
+class _ItemLocator:
+    """Finds an item of SeElementsArray again at its index, if it's still the same item.
+    The identity comes with the item from `arrayQuery`; without JavaScript it's the text of the item,
+    read when the item is used for the first time, not for every element when the array is built.
+    An item which went stale before its text was read is found again at its index without the check.
+    """
+    __slots__ = ("_array", "_index", "_identity")
+
+    def __init__(self, array: "SeElementsArray", index: int, identity: Optional[str] = None):
+        self._array = array
+        self._index = index
+        self._identity = identity
+
+    def remember(self, web_element: WebElement):
+        """Keep the identity of the item, called by `SeWebElement` before an operation on the item."""
+        if self._identity is None:
+            self._identity = _text_identity(web_element)
+
+    def __call__(self, deadline: Deadline) -> WebElement:
+        return self._array._locate(self._index, self._identity, deadline)
+
+
+class CollectedItem(NamedTuple):
+    """An element found by `SeElementsArray.collect_until()`."""
+    # value of the key attribute, or the text if the element has no such attribute
+    key: str
+    text: str
+    # wrapped element, it may be stale if the list recycles its nodes
+    element: Any
+
 
 class SeElementsArray:
     """Lazy initialization of a list of web_elements.
     We need this for calling a list of wrapped web_elements,
     instead of standard find_elements().
+    `len(arr)`, `arr[index]` and `arr[start:stop]` don't materialize the whole array:
+    they transfer only the count or the requested elements from the browser.
+    Filters are chainable and lazy, the chain is evaluated in the browser as one predicate:
+    >>>arr.filter_visible().filter_class("active").filter_text(contains="Save")
     """
 
     DEFAULT_TIMEOUT = 4
@@ -23,13 +74,18 @@ class SeElementsArray:
                  webdriver: WebDriver,
                  selector: str,
                  timeout: TimeoutType = DEFAULT_TIMEOUT,
-                 locator_strategy: Optional[str] = None):
+                 locator_strategy: Optional[str] = None,
+                 frame: frames.FramePathType = None):
         self._webdriver = webdriver
         self._selector = selector
         self._timeout = timeout
         self._elements_array = []
         self._element_type = None
+        # specs of the filters, see `js_scripts.COMPILE_FILTERS_JS`
+        self._filters: List[list] = []
         self.locator_strategy = locator_strategy if locator_strategy else get_selector_type(self._selector)
+        # selectors of the iframes of the elements, `()` for the top document
+        self.frame = frames.to_frame_path(frame)
 
     @property
     def element_type(self):
@@ -45,32 +101,263 @@ class SeElementsArray:
     @property
     def _lazy_array(self):
         if len(self._elements_array) < 1:
+            return self._found_array()
+        return self._elements_array
+
+    def _found_array(self):
+        frames.enter_frame(self._webdriver, self.frame, self._timeout)
+        # the identities of the items come with the elements, without a script of their own
+        result = self._query("slice")
+        if result is None:
+            # the locator can't be evaluated in the browser, filter in python
+            def find_matching(driver):
+                found = locators.find_elements(driver, self.locator_strategy, self._selector)
+                return [elem for elem in found if self._matches_filters(elem)] or False
+
             try:
-                elements_ = WebDriverWait(self._webdriver, self._timeout).until(
-                    presence_of_all_elements_located((self.locator_strategy, self._selector))
-                )
+                elements_ = WebDriverWait(self._webdriver, remaining(self._timeout)).until(find_matching)
             except TimeoutException:
                 # return empty array if no element is present on the page
                 return []
+            # the texts are read only for the items which are used, see `_ItemLocator`
+            identities = [None] * len(elements_)
+        else:
+            elements_, identities = result[1], result[2]
+        self._elements_array.extend(self._wrap(elem, index, identity)
+                                    for index, (elem, identity) in enumerate(zip(elements_, identities)))
+        return self._elements_array
 
-            for elem in elements_:
-                wrapped_elem = self._element_type(
-                    self._webdriver, self._selector, self._timeout, self.locator_strategy
-                )
-                wrapped_elem.web_element = elem
-                self._elements_array.append(wrapped_elem)
+    def _matches_filters(self, web_element) -> bool:
+        for filter_ in self._filters:
+            kind = filter_[0]
+            if kind == "visible" and not web_element.is_displayed():
+                return False
+            if kind == "text_contains" and filter_[1] not in web_element.text:
+                return False
+            if kind == "text_regex" and not re.search(filter_[1], web_element.text, filter_[3]):
+                return False
+            if kind == "class":
+                actual_class = web_element.get_attribute("class") or ""
+                if not set(filter_[1]).issubset(actual_class.split()):
+                    return False
+            if kind == "attr":
+                value = web_element.get_attribute(filter_[1])
+                if value is None or (filter_[2] is not None and value != filter_[2]) \
+                        or (filter_[3] is not None and filter_[3] not in value):
+                    return False
+        return True
 
-        return self._elements_array
+    def _with_filter(self, *filter_spec) -> "SeElementsArray":
+        """New array with the same element type and one more filter."""
+        arr = self.__class__(self._webdriver, self._selector, self._timeout, self.locator_strategy, self.frame)
+        arr._element_type = self._element_type
+        arr._filters = self._filters + [list(filter_spec)]
+        return arr
+
+    def filter_visible(self) -> "SeElementsArray":
+        """Only elements, which are displayed."""
+        return self._with_filter("visible")
+
+    def filter_text(self, contains: Optional[str] = None,
+                    regex: Union[str, Pattern, None] = None) -> "SeElementsArray":
+        """Only elements, which text contains a substring or matches a regular expression.
+        :param contains: substring of the text.
+        :param regex: pattern for `re.search`, flags IGNORECASE, MULTILINE and DOTALL are supported.
+        The pattern is evaluated by the browser, so it should be compatible with JavaScript RegExp.
+        """
+        if (contains is None) == (regex is None):
+            raise TypeError("Provide either `contains` or `regex` for `filter_text()`.")
+        if contains is not None:
+            return self._with_filter("text_contains", contains)
+        pattern = re.compile(regex)
+        js_flags = "".join(js_flag for flag, js_flag in _JS_REGEX_FLAGS if pattern.flags & flag)
+        # the 4th item is used only by the python fallback
+        return self._with_filter("text_regex", pattern.pattern, js_flags, pattern.flags)
+
+    def filter_class(self, class_name: str) -> "SeElementsArray":
+        """Only elements having all classes, e.g. "active" or "btn active"."""
+        return self._with_filter("class", class_name.split())
+
+    def filter_attr(self, name: str, value: Optional[str] = None,
+                    contains: Optional[str] = None) -> "SeElementsArray":
+        """Only elements having an attribute.
+        :param name: attribute name.
+        :param value: exact value of the attribute, any value if not passed.
+        :param contains: substring of the attribute value.
+        """
+        return self._with_filter("attr", name, value, contains)
+
+    def first_where(self,
+                    visible: bool = False,
+                    contains: Optional[str] = None,
+                    regex: Union[str, Pattern, None] = None,
+                    class_name: Optional[str] = None,
+                    attributes: Optional[dict] = None):
+        """The first element matching all the conditions, None if no element matches within timeout.
+        >>>arr.first_where(visible=True, class_name="active")
+        """
+        arr = self
+        if visible:
+            arr = arr.filter_visible()
+        if contains is not None or regex is not None:
+            arr = arr.filter_text(contains=contains, regex=regex)
+        if class_name is not None:
+            arr = arr.filter_class(class_name)
+        for name, value in (attributes or {}).items():
+            arr = arr.filter_attr(name, value)
+        try:
+            return arr[0]
+        except IndexError:
+            return None
+
+    def collect_until(self,
+                      count: Optional[int] = None,
+                      predicate: Optional[Callable[[CollectedItem], bool]] = None,
+                      timeout: TimeoutType = None,
+                      key: Optional[str] = None,
+                      scroll_pause: float = 0.2,
+                      max_text_length: int = 1000) -> Iterator[CollectedItem]:
+        """Stream elements of an infinite feed or a virtualized list, scrolling it in the browser.
+        Every batch transfers only elements, which keys haven't been seen yet, so nodes recycled
+        by a virtualized list are collected by their new content.
+        >>>for item in feed.collect_until(count=100, key="data-id", timeout=30):
+        ...    print(item.key, item.text)
+        The iteration ends when `count` items are collected, an item matches `predicate`,
+        the list can't be scrolled further and no new items appear, or timeout is over.
+        :param count: number of items to collect.
+        :param predicate: the last item to collect, e.g. `lambda item: "2019" in item.text`.
+        :param timeout: time for the whole collection, array's timeout by default.
+        :param key: attribute to deduplicate items, e.g. "data-id", the text by default.
+        :param scroll_pause: seconds between batches, for the list to render new items.
+        :param max_text_length: texts of the items are truncated to it.
+        """
+        deadline = Deadline.of(timeout if timeout is not None else self._timeout)
+        frames.enter_frame(self._webdriver, self.frame, deadline)
+        js_locator = to_js_locator(self.locator_strategy, self._selector)
+        if js_locator is None or not javascript_enabled(self._webdriver):
+            # nothing to scroll, collect the rendered elements
+            batches = None
+        else:
+            batches = self._collect_batches(js_locator, key, max_text_length, scroll_pause, deadline)
+        seen = set()
+        collected = 0
+        for item in self._rendered_items(key) if batches is None else batches:
+            # keys are deduplicated in the page too, but a new document starts with an empty set
+            if item.key in seen:
+                continue
+            seen.add(item.key)
+            collected += 1
+            yield item
+            if count is not None and collected >= count:
+                return
+            if predicate is not None and predicate(item):
+                return
+
+    def _collect_batches(self, js_locator, key, max_text_length, scroll_pause, deadline) -> Iterator[CollectedItem]:
+        runtime = HelperRuntime.shared(self._webdriver)
+        collector_id = uuid.uuid4().hex
+        # batches without new items at the end of the list
+        idle = 0
+        try:
+            while True:
+                # the consumer may have used elements of another frame between the batches
+                frames.enter_frame(self._webdriver, self.frame, deadline)
+                items, scrolled = runtime.call("collectBatch", collector_id, js_locator, self._js_filters, key,
+                                               max_text_length, False)
+                for key_, text, web_element in items:
+                    yield CollectedItem(key_, text, self._wrap(web_element))
+                idle = 0 if items or scrolled else idle + 1
+                if idle >= 3 or deadline.expired:
+                    return
+                time.sleep(min(scroll_pause, deadline.remaining()))
+        finally:
+            try:
+                frames.enter_frame(self._webdriver, self.frame)
+                runtime.call("collectBatch", collector_id, None, None, None, 0, True)
+            except WebDriverException:
+                # the page or the session is gone, so is the collector
+                pass
+
+    def _rendered_items(self, key) -> Iterator[CollectedItem]:
+        for element in self._lazy_array:
+            text = element.text
+            key_ = (element.get_attribute(key) if key else None) or text
+            yield CollectedItem(key_, text, element)
+
+    def _wrap(self, web_element, index: Optional[int] = None, identity: Optional[str] = None):
+        """Wrapped element, the index and the identity let it be found again after it went stale."""
+        wrapped_elem = self._element_type(
+            self._webdriver, self._selector, self._timeout, self.locator_strategy
+        )
+        wrapped_elem.web_element = web_element
+        wrapped_elem.frame = self.frame
+        if index is not None:
+            wrapped_elem._relocate = _ItemLocator(self, index, identity)
+        return wrapped_elem
+
+    def _locate(self, index: int, identity: Optional[str], deadline: Deadline) -> WebElement:
+        """The element at the index found again, e.g. after a re-render replaced the nodes of the list.
+        Raises StaleElementReferenceException if another item is at the index now, e.g. a row above was removed.
+        :param identity: identity of the item, None if unknown, then any element at the index is taken.
+        """
+        frames.enter_frame(self._webdriver, self.frame, deadline)
+        result = self._query("index", index, timeout=deadline)
+        if result is None:
+            def find_item(driver):
+                found = locators.find_elements(driver, self.locator_strategy, self._selector)
+                matching = [elem for elem in found if self._matches_filters(elem)]
+                return matching[index] if -len(matching) <= index < len(matching) else False
+
+            try:
+                element = WebDriverWait(self._webdriver, deadline.remaining()).until(find_item)
+                result = (None, element, None if identity is None else _text_identity(element))
+            except TimeoutException:
+                result = (0, None, None)
+        if result[1] is None:
+            raise NoSuchElementException(f"Element {index} of SeElementsArray with selector `{self._selector}` "
+                                         f"has not been found again.")
+        if identity is not None and result[2] != identity:
+            raise StaleElementReferenceException(f"Element {index} of SeElementsArray with selector "
+                                                 f"`{self._selector}` has been replaced by another item.")
+        return result[1]
+
+    def _query(self, mode: str, start: Optional[int] = None, stop: Optional[int] = None,
+               timeout: TimeoutType = None):
+        """Run `arrayQuery` helper until any element matches or timeout is reached.
+        :return: [total count, element or list of elements, identity or list of identities],
+        None if the locator can't be used in the browser or the webdriver can't execute scripts.
+        """
+        js_locator = to_js_locator(self.locator_strategy, self._selector)
+        if js_locator is None or not javascript_enabled(self._webdriver):
+            return None
+        timeout = self._timeout if timeout is None else timeout
+        frames.enter_frame(self._webdriver, self.frame, timeout)
+
+        runtime = HelperRuntime.shared(self._webdriver)
+
+        def query(_driver):
+            total, result, identities = runtime.call("arrayQuery", js_locator, mode, start, stop, self._js_filters)
+            # wait only for the array to render, an index out of a rendered array is an error at once
+            return (total, result, identities) if total > 0 else False
+
+        try:
+            return WebDriverWait(self._webdriver, remaining(timeout)).until(query)
+        except TimeoutException:
+            return (0, [], []) if mode == "slice" else (0, None, None)
+
+    @property
+    def _js_filters(self):
+        return [filter_[:3] if filter_[0] == "text_regex" else filter_ for filter_ in self._filters]
 
     def __getattr__(self, attr):
+        array = self._lazy_array
         try:
-            orig_attr = self._lazy_array.__getattribute__(attr)
+            orig_attr = array.__getattribute__(attr)
             if callable(orig_attr):
                 def hooked(*args, **kwargs):
-                    # prevent recursion
                     result = orig_attr(*args, **kwargs)
-                    # prevent recursion
-                    if result == self._lazy_array:
+                    # prevent recursion, identity check is O(1), unlike comparing the whole lists
+                    if result is array:
                         return self
                     return result
 
@@ -80,7 +367,32 @@ class SeElementsArray:
             raise AttributeError(f"No attribute {attr}.\n{exc}")
 
     def __getitem__(self, index):
-        return self._lazy_array[index]
+        if self._elements_array:
+            return self._elements_array[index]
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                return self._lazy_array[index]
+            result = self._query("slice", index.start, index.stop)
+            if result is None:
+                return self._lazy_array[index]
+            first = slice(index.start, index.stop).indices(result[0])[0]
+            return [self._wrap(elem, first + position, identity)
+                    for position, (elem, identity) in enumerate(zip(result[1], result[2]))]
+
+        result = self._query("index", index)
+        if result is None:
+            return self._lazy_array[index]
+        if result[1] is None:
+            raise IndexError(f"SeElementsArray index {index} out of range for selector `{self._selector}`.")
+        return self._wrap(result[1], index, result[2])
+
+    def __iter__(self):
+        return iter(self._lazy_array)
 
     def __len__(self):
-        return len(self._lazy_array)
+        if self._elements_array:
+            return len(self._elements_array)
+        result = self._query("count")
+        if result is None:
+            return len(self._lazy_array)
+        return result[0]
@@ -1,16 +1,30 @@
-from typing import Optional
+import time
+from typing import Any, Callable, Optional, Sequence, Tuple, Union
 
 from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import (ElementClickInterceptedException, ElementNotInteractableException,
+                                        NoSuchElementException, NoSuchFrameException,
+                                        StaleElementReferenceException, TimeoutException)
+from selenium.webdriver.common.utils import keys_to_typing
+from selenium.webdriver.remote.command import Command
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support.expected_conditions import presence_of_element_located
 
+from selen_kaa import frames
+from selen_kaa import global_config
+from selen_kaa import locators
+from selen_kaa.deadline import Deadline
+from selen_kaa.helper_runtime import HelperRuntime
+from selen_kaa.metrics import record_stale_recovery
+from selen_kaa.timing_stats import page_key
 from selen_kaa.utils import custom_types
+from selen_kaa.utils import se_utils
 from selen_kaa.utils.se_utils import get_selector_type
 from selen_kaa.element.element_waits import ElementWaits
 from selen_kaa.element.se_element_interface import SeElementInterface
 from selen_kaa.element.expectations import Expectations
+from selen_kaa.element.element_observer import ChangeRecord, ElementObserver
+from selen_kaa.element.file_upload import UPLOAD_TIMEOUT, UploadResult, upload_file
 
 
 TimeoutType = custom_types.TimeoutType
@@ -25,30 +39,93 @@ class SeWebElement(SeElementInterface):
 
     DEFAULT_TIMEOUT = 4
 
+    # SeElementsArray creates an element for every match, so there is no `__dict__`:
+    # subclasses without `__slots__` of their own get it and may keep attributes of their own
+    __slots__ = ("_timeout", "_webdriver", "_selector", "_element", "locator_strategy", "timing_stats", "page",
+                 "frame", "_relocate", "_expect", "_should", "__weakref__")
+
     def __init__(self,
                  webdriver: WebDriver,
                  selector: str,
-                 timeout: TimeoutType = DEFAULT_TIMEOUT,
-                 locator_strategy: Optional[str] = None):
-        self.timeout = timeout
+                 timeout: Optional[TimeoutType] = DEFAULT_TIMEOUT,
+                 locator_strategy: Optional[str] = None,
+                 timing_stats=None,
+                 page: Optional[str] = None,
+                 frame: frames.FramePathType = None):
+        # None for the timeout derived from timing_stats
+        self._timeout = timeout
         self._webdriver = webdriver
         self._selector = selector
         self._element = None
+        self.locator_strategy = locator_strategy if locator_strategy else get_selector_type(self._selector)
+        # `selen_kaa.timing_stats.TimingStats` to record time-to-appear, optional
+        self.timing_stats = timing_stats
+        # page key for timing_stats, the path of the current url at the time of the lookup if None
+        self.page = page
+        # selectors of the iframes of the element, `()` for the top document
+        self.frame = frames.to_frame_path(frame)
+        # finds the element again after it went stale, set for elements of SeElementsArray
+        self._relocate: Optional[Callable[[Deadline], WebElement]] = None
         self._expect = None
         self._should = None
-        self.locator_strategy = locator_strategy if locator_strategy else get_selector_type(self._selector)
+
+    @property
+    def timeout(self) -> TimeoutType:
+        """Timeout of the element, derived from the time-to-appear statistics of the current page
+        if the element has been initialized without a timeout.
+        """
+        return self._timeout_and_page()[0]
+
+    @timeout.setter
+    def timeout(self, timeout: Optional[TimeoutType]):
+        self._timeout = timeout
+
+    def _page_key(self) -> str:
+        return self.page if self.page is not None else page_key(self._webdriver.current_url)
+
+    def _timeout_and_page(self) -> Tuple[TimeoutType, Optional[str]]:
+        """Timeout of the element and the page key it has been derived for, None if there are no statistics.
+        The current url is read once, the page key is reused for the sample of the lookup.
+        """
+        if self._timeout is not None:
+            return self._timeout, None
+        if self.timing_stats is None:
+            return self.DEFAULT_TIMEOUT, None
+        page = self._page_key()
+        return self.timing_stats.timeout_for(page, self._selector), page
 
     @property
     def web_element(self):
         """Get reference to Selenium WebElement."""
-        return self.get_web_element_by_timeout(self.timeout)
+        timeout, page = self._timeout_and_page()
+        return self.get_web_element_by_timeout(timeout, page)
 
-    def get_web_element_by_timeout(self, timeout):
+    def get_web_element_by_timeout(self, timeout, page: Optional[str] = None):
+        """Find the element within timeout seconds, or within the remaining time of a wait's Deadline.
+        The frame of the element is selected first, if another one is selected.
+        A time-to-appear sample is recorded only if the element was absent at the first lookup,
+        an element, which is already there, says nothing about the time it needs to appear.
+        :param page: page key for timing_stats, if it's known already.
+        """
+        deadline = Deadline.of(timeout)
+        try:
+            frames.enter_frame(self._webdriver, self.frame, deadline)
+        except NoSuchFrameException as exc:
+            raise NoSuchElementException(f"Web Element with selector {self._selector} has not been found."
+                                         f"\n{exc.msg}")
         if self._element is None:
+            start_time = time.time()
+            located = locators.element_located(self.locator_strategy, self._selector)
+            element = located(self._webdriver)
+            if element:
+                return element
             try:
-                return WebDriverWait(self._webdriver, timeout).until(
-                    presence_of_element_located((self.locator_strategy, self._selector))
-                )
+                element = WebDriverWait(self._webdriver, deadline.remaining()).until(located)
+                if self.timing_stats is not None:
+                    elapsed = time.time() - start_time
+                    self.timing_stats.record(page if page is not None else self._page_key(), self._selector,
+                                             elapsed)
+                return element
             except TimeoutException as exc:
                 raise NoSuchElementException(f"Web Element with selector {self._selector} has not been found."
                                              f"\n{exc.msg}")
@@ -69,7 +146,8 @@ class SeWebElement(SeElementInterface):
         after timeout it returns False.
         """
         if self._expect is None:
-            self._expect = Expectations(self, self._webdriver, self.timeout)
+            # without a timeout of its own it follows the timeout of the element
+            self._expect = Expectations(self, self._webdriver)
         return self._expect
 
     @property
@@ -78,29 +156,118 @@ class SeWebElement(SeElementInterface):
         otherwise it throws TimeoutException.
         """
         if self._should is None:
-            self._should = ElementWaits(self, self._webdriver, self.timeout)
+            self._should = ElementWaits(self, self._webdriver)
         return self._should
 
     def __getattr__(self, attr):
         """Calls method or properties on self.web_element.
         Returns callable or attribute of WebElement.
+        After StaleElementReferenceException the element is found again by its locator and the call is repeated,
+        up to `global_config.STALE_RECOVERY_ATTEMPTS` times within the timeout of the element.
         :param attr: any attr of the WebElement
         """
+        timeout, page = self._timeout_and_page()
+        deadline = Deadline.of(timeout)
+        element = self.get_web_element_by_timeout(deadline, page)
         try:
-            orig_attr = self.web_element.__getattribute__(attr)
+            orig_attr = self._recovering_stale(lambda web_element: web_element.__getattribute__(attr),
+                                               element, deadline)
             if callable(orig_attr):
                 def hooked(*args, **kwargs):
-                    return orig_attr(*args, **kwargs)
+                    return self._recovering_stale(
+                        lambda web_element: web_element.__getattribute__(attr)(*args, **kwargs),
+                        element, Deadline.of(timeout))
                 return hooked
             return orig_attr
         except AttributeError as exc:
             raise AttributeError(f"WebElement has no attribute {attr}.\n{exc}")
 
+    def _recovering_stale(self, operation: Callable[[WebElement], Any], element: WebElement, deadline: Deadline):
+        """Result of the operation on the element, which is found again if it went stale."""
+        # an item of SeElementsArray keeps what tells it from other items before it's used, see `_ItemLocator`
+        remember = getattr(self._relocate, "remember", None)
+        recoveries = 0
+        while True:
+            try:
+                if remember is not None and recoveries == 0:
+                    remember(element)
+                return operation(element)
+            except StaleElementReferenceException:
+                # an element set from outside without a way to find it again can't be recovered
+                recoverable = self._element is None or self._relocate is not None
+                if not recoverable or recoveries >= global_config.STALE_RECOVERY_ATTEMPTS:
+                    raise
+            recoveries += 1
+            if self._element is not None:
+                self._element = self._relocate(deadline)
+            element = self.get_web_element_by_timeout(deadline)
+            record_stale_recovery(self._selector)
+
+    def observe(self,
+                attributes: Union[bool, Sequence[str]] = True,
+                text: bool = True,
+                children: bool = True,
+                interval: float = 0.1,
+                callback: Optional[Callable[[ChangeRecord], None]] = None) -> ElementObserver:
+        """Start streaming DOM changes of the element, see `ElementObserver`.
+        >>>with page.toasts.observe(attributes=False, text=False) as observer:
+        ...    page.save.click()
+        ...    observer.wait_for(lambda change: any("Saved" in added for added in change.added))
+        :param attributes: True for all attributes of the element, names of attributes or False.
+        :param text: stream changes of the visible text.
+        :param children: stream added and removed elements of the subtree.
+        :param interval: seconds between fetches of the buffered changes.
+        :param callback: function to call with every change instead of iteration, it's called on drains of the
+        observer: `poll()`, the iteration, `wait_for()` and `stop()`.
+        :return: started ElementObserver, stop it or use it as a context manager.
+        """
+        return ElementObserver(self._webdriver, self.web_element, attributes, text, children,
+                               interval, callback, frame=self.frame).start()
+
     def set_text_value(self, input_val):
         """Clears the input area before sending a new text value."""
         self.web_element.clear()
         self.web_element.send_keys(input_val)
 
+    def smart_click(self, timeout: TimeoutType = None):
+        """Click the element once it can receive the click. One script in the browser scrolls the element
+        into view, and waits until the element is still and is the hit target of its center,
+        e.g. until an overlay over it is gone. Without JavaScript it's a plain click.
+        >>>page.save_button.smart_click(timeout=10)
+        :param timeout: time to wait for the element and for the click to become possible,
+        the timeout of the element if None.
+        :raise ElementClickInterceptedException: another element covers the element after timeout.
+        :raise ElementNotInteractableException: the element is not rendered, disabled or moving after timeout.
+        """
+        deadline = Deadline.of(self.timeout if timeout is None else timeout)
+        element = self.get_web_element_by_timeout(deadline)
+        if se_utils.javascript_enabled(self._webdriver):
+            seconds = deadline.remaining()
+            # the browser handles the deadline, the script timeout only has to be longer
+            with se_utils.script_timeout(self._webdriver, seconds + 5):
+                ready, reason, covered = HelperRuntime.shared(self._webdriver).call_async(
+                    "clickReady", element, int(seconds * 1000))
+            if not ready:
+                exception = ElementClickInterceptedException if covered else ElementNotInteractableException
+                raise exception(f"Web Element with selector {self._selector} can't be clicked "
+                                f"in {deadline} second(s): {reason}.")
+        element.click()
+
+    def upload(self, path: str, timeout: TimeoutType = UPLOAD_TIMEOUT) -> UploadResult:
+        """Set the file to the file input. The file is streamed to a remote end in chunks,
+        and not sent again, if its content has been uploaded in the session, see `file_upload`.
+        >>>result = page.attachment_input.upload("fixtures/video-200mb.mp4")
+        :param path: path of the local file.
+        :param timeout: seconds for the upload.
+        :return: UploadResult with the remote path, the time and the throughput of the upload.
+        """
+        element = self.web_element
+        result = upload_file(self._webdriver, path, timeout)
+        # the remote path is typed as is, `send_keys()` would upload an existing path once more
+        element._execute(Command.SEND_KEYS_TO_ELEMENT,
+                         {"text": result.remote_path, "value": keys_to_typing(result.remote_path)})
+        return result
+
     def get_class(self):
         """Get class of element."""
         return self.web_element.get_attribute("class")
@@ -0,0 +1,122 @@
+"""Filling of a whole form in a minimal number of WebDriver commands.
+Script mode sets all values and dispatches `input`/`change` events in one script.
+Keys mode types into text fields with real keystrokes, sent as one W3C Actions sequence.
+Both modes finish with one script reading all the values back.
+
+"""
+from typing import Any, Dict, List, Optional
+
+from selenium.webdriver import ActionChains
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.wait import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from selen_kaa.deadline import remaining
+from selen_kaa.global_config import DEFAULT_TIMEOUT
+from selen_kaa.helper_runtime import HelperRuntime
+from selen_kaa.utils import custom_types
+from selen_kaa.utils import se_utils
+
+
+TimeoutType = custom_types.TimeoutType
+
+FILL_BY_SCRIPT = "script"
+FILL_BY_KEYS = "keys"
+
+
+def fill_form(webdriver: WebDriver,
+              values: Dict[str, Any],
+              mode: str = FILL_BY_SCRIPT,
+              verify: bool = True,
+              timeout: TimeoutType = DEFAULT_TIMEOUT,
+              select_all_key: str = Keys.CONTROL) -> Optional[Dict[str, Any]]:
+    """Set values of form controls.
+    :param webdriver: WebDriver with the form.
+    :param values: {css selector or xpath: value}, value is a str for text fields,
+    bool for checkboxes and radio buttons, option value or text (or list of them) for selects.
+    :param mode: FILL_BY_SCRIPT or FILL_BY_KEYS, in keys mode text fields get real keystrokes,
+    other controls are set by the script anyway.
+    :param verify: read all values back and raise ValueError if any differs.
+    :param timeout: time to wait for all controls to be present.
+    :param select_all_key: modifier to select the old text before typing, Keys.COMMAND for macOS.
+    :return: {selector: actual value} if verify, else None.
+    """
+    if mode not in (FILL_BY_SCRIPT, FILL_BY_KEYS):
+        raise ValueError(f"Unknown mode of fill_form() '{mode}', use '{FILL_BY_SCRIPT}' or '{FILL_BY_KEYS}'.")
+    selectors = list(values)
+    locators = [_js_locator(selector) for selector in selectors]
+    values_ = [_to_js_value(values[selector]) for selector in selectors]
+    missing: List[int] = []
+    to_type: List[list] = []
+    runtime = HelperRuntime.shared(webdriver)
+
+    def fill(_driver):
+        nonlocal missing, to_type
+        missing, to_type = runtime.call("fillForm", locators, values_, mode == FILL_BY_KEYS)
+        # to_type is empty in script mode, the wait ends when all controls are found
+        return not missing
+
+    try:
+        WebDriverWait(webdriver, remaining(timeout)).until(fill)
+    except TimeoutException:
+        missing_selectors = ", ".join(selectors[index] for index in missing)
+        raise NoSuchElementException(f"Form controls with selectors {missing_selectors} have not been found.")
+
+    if to_type:
+        chain = ActionChains(webdriver)
+        for index, element in to_type:
+            chain.click(element)
+            chain.key_down(select_all_key).send_keys("a").key_up(select_all_key)
+            chain.send_keys(Keys.DELETE, values_[index])
+        chain.perform()
+
+    if not verify:
+        return None
+    actual_values = runtime.call("readForm", locators)
+    result = {}
+    mismatches = {}
+    for selector, expected, actual in zip(selectors, values_, actual_values):
+        result[selector] = _from_js_value(expected, actual)
+        if not _value_matches(expected, actual):
+            mismatches[selector] = (expected, result[selector])
+    if mismatches:
+        raise ValueError(f"Form controls have unexpected values after fill_form(), "
+                         f"{{selector: (expected, actual)}}: {mismatches}")
+    return result
+
+
+def _js_locator(selector: str) -> List[str]:
+    js_locator = se_utils.to_js_locator(se_utils.get_selector_type(selector), selector)
+    if js_locator is None:
+        raise TypeError(f"Selector `{selector}` can't be used by fill_form(), use css selector or xpath.")
+    return js_locator
+
+
+def _to_js_value(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value]
+    return str(value)
+
+
+def _from_js_value(expected, actual):
+    """Selected options are read as [value, text] pairs, return their values only."""
+    if isinstance(actual, list):
+        option_values = [value for value, _ in actual]
+        if isinstance(expected, list):
+            return option_values
+        return option_values[0] if option_values else None
+    return actual
+
+
+def _value_matches(expected, actual) -> bool:
+    if isinstance(actual, bool):
+        return actual == bool(expected)
+    if isinstance(actual, list):
+        expected_ = expected if isinstance(expected, list) else [expected]
+        return len(expected_) == len(actual) and all(
+            any(item in option for option in actual) for item in expected_
+        )
+    return actual == expected
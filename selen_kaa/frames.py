@@ -0,0 +1,138 @@
+"""Frames of elements.
+An element initialized with a frame path is looked up in its frame, e.g. `("#editor", "iframe.preview")`
+for an iframe inside of an iframe. A FrameTracker per webdriver knows the selected frame and switches only
+when the next element is in another frame: to the parent frames, or to the top document and down,
+whatever takes fewer commands. Elements without a frame path switch back to the top document lazily,
+when they are used after an element in a frame.
+After `switch_to` calls past selen-kaa, call `browser.frames.invalidate()`.
+
+"""
+import weakref
+from typing import Optional, Sequence, Tuple, Union
+
+from selenium.common.exceptions import NoSuchFrameException, TimeoutException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.wait import WebDriverWait
+
+from selen_kaa import locators
+from selen_kaa.deadline import remaining
+from selen_kaa.utils import custom_types
+from selen_kaa.utils.se_utils import get_selector_type
+
+
+TimeoutType = custom_types.TimeoutType
+# selector of an iframe, or selectors of nested iframes from the top document
+FramePathType = Union[str, Sequence[str], None]
+
+TOP = ()
+
+
+def to_frame_path(frame: FramePathType) -> Tuple[str, ...]:
+    """Frame path as a tuple of selectors, `()` for the top document.
+    >>>to_frame_path("#editor")
+    ('#editor',)
+    """
+    if not frame:
+        return TOP
+    if isinstance(frame, str):
+        return (frame,)
+    return tuple(frame)
+
+
+class FrameTracker:
+    """The selected frame of a webdriver."""
+
+    __slots__ = ("_webdriver", "current", "switches", "__weakref__")
+    _shared: "weakref.WeakKeyDictionary[WebDriver, FrameTracker]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, webdriver: WebDriver):
+        self._webdriver = webdriver
+        # path of the selected frame, None if unknown
+        self.current: Optional[Tuple[str, ...]] = TOP
+        # number of switch commands sent
+        self.switches = 0
+
+    @classmethod
+    def shared(cls, webdriver: WebDriver) -> "FrameTracker":
+        try:
+            return cls._shared[webdriver]
+        except KeyError:
+            tracker = cls._shared[webdriver] = cls(webdriver)
+            return tracker
+
+    def reset(self):
+        """The top document is selected, e.g. after a navigation or a switch of windows."""
+        self.current = TOP
+
+    def invalidate(self):
+        """The selected frame is unknown, the next switch starts from the top document."""
+        self.current = None
+
+    def switch(self, frame: FramePathType, timeout: TimeoutType = 0):
+        """Select the frame, if it isn't selected.
+        :param frame: frame path, see `to_frame_path()`.
+        :param timeout: time to wait for every iframe of the path to appear.
+        """
+        path = to_frame_path(frame)
+        current = self.current
+        if current == path:
+            return
+        if current is None:
+            common = ups = None
+        else:
+            common = 0
+            for current_selector, selector in zip(current, path):
+                if current_selector != selector:
+                    break
+                common += 1
+            ups = len(current) - common
+        # switching down to a frame takes two commands: find the iframe and switch to it
+        if ups is None or ups > 1 + 2 * common:
+            self._webdriver.switch_to.default_content()
+            self.switches += 1
+            self.current = TOP
+            common = 0
+        else:
+            for _ in range(ups):
+                self._webdriver.switch_to.parent_frame()
+                self.switches += 1
+            self.current = path[:common]
+        for depth in range(common, len(path)):
+            selector = path[depth]
+            try:
+                iframe = WebDriverWait(self._webdriver, remaining(timeout)).until(
+                    locators.element_located(get_selector_type(selector), selector))
+            except TimeoutException:
+                raise NoSuchFrameException(f"Frame with selector {selector} of the frame path {path} "
+                                           f"has not been found.")
+            self._webdriver.switch_to.frame(iframe)
+            self.switches += 1
+            self.current = path[:depth + 1]
+
+
+def enter_frame(webdriver: WebDriver, frame: FramePathType, timeout: TimeoutType = 0):
+    """Select the frame of an element before its lookup or use.
+    Nothing is sent, until an element with a frame is used, and while the selected frame is the right one.
+    """
+    if not frame and not FrameTracker._shared:
+        return
+    try:
+        tracker = FrameTracker._shared.get(webdriver)
+    except TypeError:
+        # webdriver can't be weak referenced
+        return
+    if tracker is None:
+        if not frame:
+            return
+        tracker = FrameTracker.shared(webdriver)
+    tracker.switch(frame, timeout)
+
+
+def reset_to_top(webdriver: WebDriver):
+    """The top document of the webdriver is selected, e.g. after a navigation."""
+    try:
+        tracker = FrameTracker._shared.get(webdriver)
+    except TypeError:
+        return
+    if tracker is not None:
+        tracker.reset()
@@ -1 +1,5 @@
 DEFAULT_TIMEOUT = 4
+# search elements by an equivalent CSS selector, if XPath can be translated safely
+TRANSLATE_XPATH_TO_CSS = False
+# times an element is found again by its locator after StaleElementReferenceException, within its timeout
+STALE_RECOVERY_ATTEMPTS = 2
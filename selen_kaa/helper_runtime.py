@@ -0,0 +1,150 @@
+"""Library of JavaScript helpers installed once per document.
+Scripts sent every poll carry only a short call of a helper by name, the helpers are installed
+in a versioned `window.__selenKaa_<version>` object. A new document has no library,
+the call returns a marker and the library is installed together with the call in the same round trip.
+>>>runtime = HelperRuntime.shared(webdriver)
+>>>height, width = runtime.call("viewportSize")
+Helpers are script bodies, their arguments are `arguments[i]`, the result is returned with `return`.
+An async helper gets a callback as the last argument, like `execute_async_script()`.
+
+"""
+import hashlib
+import threading
+import weakref
+from typing import Any, Dict, Optional
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from selen_kaa.utils import js_scripts
+
+
+RUNTIME_VERSION = "1"
+
+# returned by a call, if the document has no library
+MISSING = "__selenKaaRuntimeMissing__"
+
+_CALL_SCRIPT = "var r=window.{name};return r?r.call(arguments):'{missing}'"
+_CALL_ASYNC_SCRIPT = "var r=window.{name};r?r.call(arguments):arguments[arguments.length-1]('{missing}')"
+_INSTALL_SCRIPT = """
+    if (!window.{name}) {{
+        window.{name} = {{
+            version: '{version}',
+            helpers: {{{helpers}}},
+            call: function (args) {{
+                return this.helpers[args[0]].apply(null, Array.prototype.slice.call(args, 1));
+            }}
+        }};
+    }}
+"""
+
+# name: script body of every helper of the library
+_helpers: Dict[str, str] = {
+    "arrayQuery": js_scripts.ARRAY_QUERY_SCRIPT,
+    "clickReady": js_scripts.CLICK_READY_SCRIPT,
+    "collectBatch": js_scripts.COLLECT_BATCH_SCRIPT,
+    "queryAll": js_scripts.QUERY_ALL_SCRIPT,
+    "queryChild": js_scripts.QUERY_CHILD_SCRIPT,
+    "queryFirst": js_scripts.QUERY_FIRST_SCRIPT,
+    "queryFirstBatch": js_scripts.QUERY_FIRST_BATCH_SCRIPT,
+    "readForm": js_scripts.READ_FORM_SCRIPT,
+    "elementPredicate": js_scripts.ELEMENT_PREDICATE_SCRIPT,
+    "fillForm": js_scripts.FILL_FORM_SCRIPT,
+    "instrumentReadiness": js_scripts.INSTRUMENT_JS,
+    "viewportSize": js_scripts.VIEWPORT_SIZE_SCRIPT,
+    "waitSettled": js_scripts.WAIT_SETTLED_SCRIPT,
+}
+_library_lock = threading.Lock()
+_library: Optional["_Library"] = None
+
+
+class _Library:
+    """Scripts of one version of the library."""
+
+    def __init__(self, helpers: Dict[str, str]):
+        source = ",".join(f"{name!r}: function () {{{body}}}" for name, body in sorted(helpers.items()))
+        self.version = f"{RUNTIME_VERSION}_{hashlib.sha1(source.encode('utf-8')).hexdigest()[:8]}"
+        name = f"__selenKaa_{self.version}"
+        self.names = frozenset(helpers)
+        self.call_script = _CALL_SCRIPT.format(name=name, missing=MISSING)
+        self.call_async_script = _CALL_ASYNC_SCRIPT.format(name=name, missing=MISSING)
+        install_script = _INSTALL_SCRIPT.format(name=name, version=self.version, helpers=source)
+        self.install_and_call_script = install_script + self.call_script
+        self.install_and_call_async_script = install_script + self.call_async_script
+
+
+def register_helper(name: str, body: str):
+    """Add a helper to the library, the documents get the new version of the library with the next call."""
+    global _library
+    with _library_lock:
+        _helpers[name] = body
+        _library = None
+
+
+def _current_library() -> _Library:
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = _Library(_helpers)
+        return _library
+
+
+class HelperRuntime:
+    """Calls of the helpers of the library in the documents of a webdriver."""
+
+    __slots__ = ("_webdriver", "injections", "calls", "__weakref__")
+    _shared: "weakref.WeakKeyDictionary[WebDriver, HelperRuntime]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, webdriver: WebDriver):
+        self._webdriver = webdriver
+        # number of documents, where the library has been installed
+        self.injections = 0
+        self.calls = 0
+
+    @classmethod
+    def shared(cls, webdriver: WebDriver) -> "HelperRuntime":
+        """The runtime has no state besides counters, so one instance per webdriver is enough."""
+        try:
+            return cls._shared[webdriver]
+        except KeyError:
+            runtime = cls._shared[webdriver] = cls(webdriver)
+            return runtime
+        except TypeError:
+            # webdriver can't be weak referenced
+            return cls(webdriver)
+
+    @property
+    def version(self) -> str:
+        return _current_library().version
+
+    def call(self, name: str, *args: Any) -> Any:
+        """Result of a helper, the library is installed if the document has none.
+        :param name: name of the helper, see `register_helper()`.
+        :param args: arguments of the helper: json values and WebElements.
+        """
+        library = self._library_of(name)
+        self.calls += 1
+        result = self._webdriver.execute_script(library.call_script, name, *args)
+        if isinstance(result, str) and result == MISSING:
+            self.injections += 1
+            result = self._webdriver.execute_script(library.install_and_call_script, name, *args)
+        return result
+
+    def call_async(self, name: str, *args: Any) -> Any:
+        """Result of an async helper, which passes it to the callback, the last argument of the helper.
+        The script timeout of the webdriver applies, see `se_utils.script_timeout()`.
+        """
+        library = self._library_of(name)
+        self.calls += 1
+        result = self._webdriver.execute_async_script(library.call_async_script, name, *args)
+        if isinstance(result, str) and result == MISSING:
+            self.injections += 1
+            result = self._webdriver.execute_async_script(library.install_and_call_async_script, name, *args)
+        return result
+
+    @staticmethod
+    def _library_of(name: str) -> _Library:
+        library = _current_library()
+        if name not in library.names:
+            raise ValueError(f"There is no helper '{name}' in the helper runtime. "
+                             f"Register it with `register_helper()`.")
+        return library
@@ -0,0 +1,109 @@
+"""Resolution of locators of SeWebElement and SeElementsArray.
+Locators of selen-kaa, which webdrivers don't know (text selectors, shadow DOM paths), are resolved by the helpers
+of the helper runtime in the browser. Without JavaScript they are translated by `se_utils.to_fast_locator()`.
+The conditions are used with WebDriverWait, they return False until the elements are found.
+
+"""
+from typing import Callable, List, Union
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from selen_kaa.helper_runtime import HelperRuntime
+from selen_kaa.utils import se_utils
+
+
+# locator strategies, which are resolved in the browser
+BROWSER_LOCATORS = frozenset((se_utils.TEXT_LOCATOR, se_utils.SHADOW_LOCATOR))
+
+
+def _in_browser(webdriver: WebDriver, locator_strategy: str) -> bool:
+    return locator_strategy in BROWSER_LOCATORS and se_utils.javascript_enabled(webdriver)
+
+
+def find_element(webdriver: WebDriver, locator_strategy: str, selector: str) -> WebElement:
+    """The first element matched by a locator, raises NoSuchElementException if there is none."""
+    if _in_browser(webdriver, locator_strategy):
+        element = HelperRuntime.shared(webdriver).call("queryFirst", se_utils.to_js_locator(locator_strategy, selector))
+        if element is None:
+            raise NoSuchElementException(f"No element matches `{selector}`.")
+        return element
+    return webdriver.find_element(*se_utils.to_fast_locator(locator_strategy, selector))
+
+
+def find_elements(webdriver: WebDriver, locator_strategy: str, selector: str) -> List[WebElement]:
+    """All elements matched by a locator in the document order."""
+    if _in_browser(webdriver, locator_strategy):
+        return HelperRuntime.shared(webdriver).call("queryAll", se_utils.to_js_locator(locator_strategy, selector))
+    return webdriver.find_elements(*se_utils.to_fast_locator(locator_strategy, selector))
+
+
+def find_child_element(webdriver: WebDriver, parent: WebElement, locator_strategy: str,
+                       selector: str) -> WebElement:
+    """The first descendant of the parent element matched by a locator, raises NoSuchElementException if there is none.
+    XPath is evaluated with the parent as context, the first host of a shadow DOM path is searched in the parent.
+    """
+    if _in_browser(webdriver, locator_strategy):
+        element = HelperRuntime.shared(webdriver).call(
+            "queryChild", parent, se_utils.to_js_locator(locator_strategy, selector))
+        if element is None:
+            raise NoSuchElementException(f"No child element matches `{selector}`.")
+        return element
+    return parent.find_element(*se_utils.to_fast_locator(locator_strategy, selector, element_context=True))
+
+
+def element_located(locator_strategy: str, selector: str) -> Callable[[WebDriver], Union[WebElement, bool]]:
+    """Condition for WebDriverWait: the first matched element."""
+    def condition(webdriver):
+        try:
+            return find_element(webdriver, locator_strategy, selector)
+        except NoSuchElementException:
+            return False
+
+    return condition
+
+
+def all_elements_located(locator_strategy: str,
+                         selector: str) -> Callable[[WebDriver], Union[List[WebElement], bool]]:
+    """Condition for WebDriverWait: all matched elements, if there is at least one."""
+    def condition(webdriver):
+        return find_elements(webdriver, locator_strategy, selector) or False
+
+    return condition
+
+
+def element_visible(locator_strategy: str, selector: str) -> Callable[[WebDriver], Union[WebElement, bool]]:
+    """Condition for WebDriverWait: the first matched element, if it's displayed."""
+    def condition(webdriver):
+        try:
+            element = find_element(webdriver, locator_strategy, selector)
+            return element if element.is_displayed() else False
+        except (NoSuchElementException, StaleElementReferenceException):
+            return False
+
+    return condition
+
+
+def element_invisible(locator_strategy: str, selector: str) -> Callable[[WebDriver], Union[WebElement, bool]]:
+    """Condition for WebDriverWait: True if no element is matched, or the first matched element isn't displayed."""
+    def condition(webdriver):
+        try:
+            element = find_element(webdriver, locator_strategy, selector)
+            return element if not element.is_displayed() else False
+        except (NoSuchElementException, StaleElementReferenceException):
+            return True
+
+    return condition
+
+
+def text_in_element(locator_strategy: str, selector: str,
+                    text: str) -> Callable[[WebDriver], bool]:
+    """Condition for WebDriverWait: the text of the first matched element contains the text."""
+    def condition(webdriver):
+        try:
+            return text in find_element(webdriver, locator_strategy, selector).text
+        except (NoSuchElementException, StaleElementReferenceException):
+            return False
+
+    return condition
@@ -0,0 +1,160 @@
+"""Page performance metrics collected from the test runs.
+Navigation Timing, paint timings, resource counts and sizes and long tasks are gathered
+in one script after the page load, and aggregated across runs into percentiles per url.
+Recoveries of elements from StaleElementReferenceException are counted per selector for the whole process,
+the selectors with most recoveries point to the components, which re-render the most.
+
+"""
+import json
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from selen_kaa.utils import se_utils
+
+
+# Resolves with the metrics of the current document, waits for the load event end first.
+COLLECT_METRICS_SCRIPT = """
+    var done = arguments[arguments.length - 1], start = Date.now();
+    function collect(longTasks) {
+        var metrics = {};
+        var nav = performance.getEntriesByType('navigation')[0];
+        if (nav) {
+            metrics.ttfb_ms = nav.responseStart - nav.startTime;
+            metrics.response_ms = nav.responseEnd - nav.responseStart;
+            metrics.dom_interactive_ms = nav.domInteractive - nav.startTime;
+            metrics.dom_content_loaded_ms = nav.domContentLoadedEventEnd - nav.startTime;
+            metrics.load_ms = nav.loadEventEnd - nav.startTime;
+            metrics.document_transfer_bytes = nav.transferSize;
+        }
+        performance.getEntriesByType('paint').forEach(function (paint) {
+            metrics[paint.name.replace(/-/g, '_') + '_ms'] = paint.startTime;
+        });
+        var resources = performance.getEntriesByType('resource');
+        metrics.resource_count = resources.length;
+        metrics.resource_transfer_bytes = 0;
+        metrics.resource_decoded_bytes = 0;
+        resources.forEach(function (resource) {
+            metrics.resource_transfer_bytes += resource.transferSize || 0;
+            metrics.resource_decoded_bytes += resource.decodedBodySize || 0;
+        });
+        metrics.long_task_count = longTasks.length;
+        metrics.long_task_total_ms = 0;
+        metrics.total_blocking_ms = 0;
+        longTasks.forEach(function (task) {
+            metrics.long_task_total_ms += task.duration;
+            metrics.total_blocking_ms += Math.max(0, task.duration - 50);
+        });
+        done(metrics);
+    }
+    function collectLongTasks() {
+        var longTasks = [];
+        try {
+            var observer = new PerformanceObserver(function (list) {
+                longTasks = longTasks.concat(list.getEntries());
+            });
+            // buffered entries are delivered asynchronously
+            observer.observe({type: 'longtask', buffered: true});
+            setTimeout(function () {
+                longTasks = longTasks.concat(observer.takeRecords());
+                observer.disconnect();
+                collect(longTasks);
+            }, 50);
+        } catch (error) {
+            // long tasks are not supported by the browser
+            collect(longTasks);
+        }
+    }
+    function waitLoaded() {
+        var nav = performance.getEntriesByType('navigation')[0];
+        var loaded = document.readyState === 'complete' && (!nav || nav.loadEventEnd > 0);
+        if (loaded || Date.now() - start > 10000) {
+            collectLongTasks();
+        } else {
+            setTimeout(waitLoaded, 50);
+        }
+    }
+    waitLoaded();
+"""
+
+
+# selector: number of recoveries from StaleElementReferenceException
+_stale_recoveries: Counter = Counter()
+_stale_recoveries_lock = threading.Lock()
+
+
+def record_stale_recovery(selector: str):
+    """An element has been found again by its selector after it went stale."""
+    with _stale_recoveries_lock:
+        _stale_recoveries[selector] += 1
+
+
+class MetricsCollector:
+    """Metrics of page loads, aggregated per url.
+    >>>browser.get("https://some.com", collect_metrics=True)
+    >>>browser.metrics().summary()["https://some.com"]["load_ms"]["p90"]
+    """
+
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self):
+        self._runs: Dict[str, List[Dict[str, float]]] = defaultdict(list)
+        self.last: Optional[Dict[str, float]] = None
+
+    def collect(self, webdriver: WebDriver, url: str) -> Dict[str, float]:
+        """Gather the metrics of the loaded page in one script and add them to the runs of the url."""
+        # the script waits for the load event end up to 10 seconds
+        with se_utils.script_timeout(webdriver, 15):
+            metrics = webdriver.execute_async_script(COLLECT_METRICS_SCRIPT)
+        self.add(url, metrics)
+        return metrics
+
+    def add(self, url: str, metrics: Dict[str, float]):
+        """Add metrics of one run, e.g. collected by another process."""
+        self._runs[url].append(metrics)
+        self.last = metrics
+
+    def runs(self, url: str) -> List[Dict[str, float]]:
+        return list(self._runs.get(url, []))
+
+    @property
+    def urls(self) -> List[str]:
+        return list(self._runs)
+
+    def summary(self, percentiles: Sequence[float] = PERCENTILES) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """{url: {metric: {"p50": value, ..., "runs": count}}}."""
+        result = {}
+        for url, runs in self._runs.items():
+            values_by_metric: Dict[str, List[float]] = defaultdict(list)
+            for run in runs:
+                for metric, value in run.items():
+                    if value is not None:
+                        values_by_metric[metric].append(value)
+            result[url] = {
+                metric: dict({f"p{pct:g}": se_utils.percentile(values, pct) for pct in percentiles},
+                             runs=len(values))
+                for metric, values in values_by_metric.items()
+            }
+        return result
+
+    @staticmethod
+    def stale_recoveries() -> Dict[str, int]:
+        """{selector: recoveries from StaleElementReferenceException}, the most recovered selectors first."""
+        with _stale_recoveries_lock:
+            return dict(_stale_recoveries.most_common())
+
+    def to_json(self, path: Optional[str] = None, include_runs: bool = False) -> str:
+        """Summary and stale recoveries as JSON, written to `path` if passed.
+        :param path: file to write to.
+        :param include_runs: add raw metrics of every run.
+        """
+        content = {"summary": self.summary(), "stale_recoveries": self.stale_recoveries()}
+        if include_runs:
+            content["runs"] = dict(self._runs)
+        dumped = json.dumps(content, indent=2, sort_keys=True)
+        if path is not None:
+            with open(path, "w") as file_:
+                file_.write(dumped)
+        return dumped
@@ -0,0 +1,65 @@
+"""Waits for a page to settle, driven by in-page counters of pending work.
+Counters of fetch/XHR requests, opening WebSockets and pending short timers are injected
+at document start (Chromium via DevTools protocol), or into the current document on the first wait.
+A wait is one async script, which resolves as soon as the counters stay at zero for the quiet period.
+
+"""
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import TimeoutException
+
+from selen_kaa.deadline import remaining
+from selen_kaa.global_config import DEFAULT_TIMEOUT
+from selen_kaa.helper_runtime import HelperRuntime
+from selen_kaa.utils import custom_types
+from selen_kaa.utils import se_utils
+from selen_kaa.utils.js_scripts import INSTRUMENT_JS
+
+
+TimeoutType = custom_types.TimeoutType
+
+
+class PageReadiness:
+    """Network-idle and page-ready waits of a webdriver."""
+
+    def __init__(self, webdriver: WebDriver):
+        self._webdriver = webdriver
+        self._installed = False
+
+    def install(self) -> bool:
+        """Inject the counters into every new document and into the current one.
+        Call it before the first `get()` to count the requests of the first page load too.
+        :return: True if the counters are injected at document start,
+        False if the browser doesn't support it and counters are injected on the first wait on a page.
+        """
+        at_document_start = False
+        if hasattr(self._webdriver, "execute_cdp_cmd"):
+            self._webdriver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": INSTRUMENT_JS})
+            at_document_start = True
+        HelperRuntime.shared(self._webdriver).call("instrumentReadiness")
+        self._installed = True
+        return at_document_start
+
+    def wait_network_idle(self, quiet_ms: int = 500, timeout: TimeoutType = DEFAULT_TIMEOUT):
+        """Wait until there are no pending fetch/XHR requests and opening WebSockets for `quiet_ms`."""
+        return self._wait_settled(quiet_ms, timeout, page_ready=False)
+
+    def wait_page_ready(self, quiet_ms: int = 500, timeout: TimeoutType = DEFAULT_TIMEOUT):
+        """Wait until the document is loaded, the network is idle for `quiet_ms`,
+        and there are no pending short timers (up to 1 second).
+        """
+        return self._wait_settled(quiet_ms, timeout, page_ready=True)
+
+    def _wait_settled(self, quiet_ms, timeout, page_ready):
+        if not self._installed:
+            self.install()
+        timeout_ = remaining(timeout)
+        # the browser resolves the wait, the script timeout is only a safety net
+        with se_utils.script_timeout(self._webdriver, timeout_ + 5):
+            pending = HelperRuntime.shared(self._webdriver).call_async("waitSettled", quiet_ms, timeout_ * 1000,
+                                                                       page_ready)
+        if pending:
+            state = "ready" if page_ready else "network idle"
+            raise TimeoutException(f"TimeoutException while waited {timeout} second(s) for the page to be {state}. "
+                                   f"Pending requests: {pending['requests']}, websockets: {pending['sockets']}, "
+                                   f"timers: {pending['timers']}, document.readyState: '{pending['readyState']}'.")
+        return True
@@ -0,0 +1,237 @@
+"""Snapshots of an authenticated browser state, to start tests without logging in through the UI.
+A snapshot keeps cookies, localStorage and sessionStorage of the current origin and, optionally,
+IndexedDB databases of it, as a gzipped JSON file.
+>>>if not browser.load_state("state/admin.json.gz", ttl=3600, validate=is_logged_in):
+...    login_page.login("admin")
+...    browser.save_state("state/admin.json.gz")
+Cookies of other domains, e.g. of an identity provider, are not saved: WebDriver sees only the cookies
+of the current document. IndexedDB values are saved as JSON, so Blobs, Dates and typed arrays don't survive.
+
+"""
+import gzip
+import json
+import os
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from selen_kaa.utils import se_utils
+
+
+STATE_VERSION = 1
+
+# Returns [origin, localStorage entries, sessionStorage entries], null storages if they are not accessible.
+READ_STORAGE_SCRIPT = """
+    function entries(storage) {
+        var result = {};
+        for (var i = 0; i < storage.length; i++) {
+            var key = storage.key(i);
+            result[key] = storage.getItem(key);
+        }
+        return result;
+    }
+    try {
+        return [location.origin, entries(window.localStorage), entries(window.sessionStorage)];
+    } catch (e) {
+        // e.g. about:blank or a sandboxed document
+        return [location.origin, null, null];
+    }
+"""
+
+# Replaces the storages of the document. Arguments: localStorage and sessionStorage entries or null.
+WRITE_STORAGE_SCRIPT = """
+    [[window.localStorage, arguments[0]], [window.sessionStorage, arguments[1]]].forEach(function (pair) {
+        if (pair[1] === null) { return; }
+        pair[0].clear();
+        Object.keys(pair[1]).forEach(function (key) { pair[0].setItem(key, pair[1][key]); });
+    });
+"""
+
+# Passes Array of databases {name, version, stores: [{name, keyPath, autoIncrement, indexes, keys, values}]}
+# to the callback, null if the browser can't list databases.
+READ_INDEXED_DB_SCRIPT = """
+    var done = arguments[arguments.length - 1];
+    if (!window.indexedDB || !indexedDB.databases) { done(null); return; }
+    indexedDB.databases().then(function (infos) {
+        var result = [], pending = infos.length;
+        function finish(database) {
+            if (database) { result.push(database); }
+            if (--pending === 0) { done(JSON.parse(JSON.stringify(result))); }
+        }
+        if (!pending) { done(result); return; }
+        infos.forEach(function (info) {
+            var request = indexedDB.open(info.name);
+            request.onerror = function () { finish(null); };
+            request.onsuccess = function () {
+                var db = request.result, names = Array.prototype.slice.call(db.objectStoreNames);
+                var database = {name: info.name, version: db.version, stores: []};
+                if (!names.length) { db.close(); finish(database); return; }
+                var transaction = db.transaction(names, 'readonly');
+                names.forEach(function (name) {
+                    var store = transaction.objectStore(name);
+                    var entry = {name: name, keyPath: store.keyPath, autoIncrement: store.autoIncrement,
+                                 keys: [], values: []};
+                    entry.indexes = Array.prototype.map.call(store.indexNames, function (indexName) {
+                        var index = store.index(indexName);
+                        return [index.name, index.keyPath, index.unique, index.multiEntry];
+                    });
+                    store.getAllKeys().onsuccess = function (event) { entry.keys = event.target.result; };
+                    store.getAll().onsuccess = function (event) { entry.values = event.target.result; };
+                    database.stores.push(entry);
+                });
+                transaction.oncomplete = function () { db.close(); finish(database); };
+                transaction.onerror = function () { db.close(); finish(null); };
+            };
+        });
+    }, function () { done(null); });
+"""
+
+# Recreates databases read by READ_INDEXED_DB_SCRIPT, passes null to the callback, or the error message.
+# A deletion is blocked while the page keeps a connection to the database, the script fails then instead of waiting.
+WRITE_INDEXED_DB_SCRIPT = """
+    var databases = arguments[0], done = arguments[arguments.length - 1];
+    function next(position) {
+        if (position >= databases.length) { done(null); return; }
+        var database = databases[position];
+        var failed = false;
+        function fail(reason) {
+            failed = true;
+            done('database "' + database.name + '" ' + reason);
+        }
+        var deletion = indexedDB.deleteDatabase(database.name);
+        deletion.onblocked = function () {
+            fail('is open in the page, it cannot be deleted; restore from a page of the origin, '
+                 + 'which does not open it');
+        };
+        deletion.onerror = function () { fail('cannot be deleted: ' + deletion.error); };
+        deletion.onsuccess = function () {
+            // a blocked deletion succeeds after the page closes the database, the restore has failed already
+            if (failed) { return; }
+            var request = indexedDB.open(database.name, database.version);
+            request.onupgradeneeded = function () {
+                database.stores.forEach(function (entry) {
+                    var store = request.result.createObjectStore(entry.name,
+                        {keyPath: entry.keyPath, autoIncrement: entry.autoIncrement});
+                    entry.indexes.forEach(function (index) {
+                        store.createIndex(index[0], index[1], {unique: index[2], multiEntry: index[3]});
+                    });
+                });
+            };
+            request.onblocked = function () { fail('is open in the page, it cannot be created'); };
+            request.onerror = function () { fail('cannot be created: ' + request.error); };
+            request.onsuccess = function () {
+                var db = request.result;
+                if (failed) { db.close(); return; }
+                if (!database.stores.length) { db.close(); next(position + 1); return; }
+                var transaction = db.transaction(database.stores.map(function (entry) { return entry.name; }),
+                                                 'readwrite');
+                database.stores.forEach(function (entry) {
+                    var store = transaction.objectStore(entry.name);
+                    entry.values.forEach(function (value, index) {
+                        if (entry.keyPath === null) {
+                            store.put(value, entry.keys[index]);
+                        } else {
+                            store.put(value);
+                        }
+                    });
+                });
+                // a failed request aborts the transaction, either of the events fires once
+                transaction.oncomplete = function () { db.close(); next(position + 1); };
+                transaction.onabort = function () {
+                    db.close();
+                    fail('cannot be written: ' + transaction.error);
+                };
+            };
+        };
+    }
+    next(0);
+"""
+
+
+class BrowserState(NamedTuple):
+    """Snapshot of the state of one origin."""
+    version: int
+    # seconds since the epoch
+    created: float
+    url: str
+    origin: Optional[str]
+    cookies: List[Dict[str, Any]]
+    local_storage: Optional[Dict[str, str]]
+    session_storage: Optional[Dict[str, str]]
+    # None if IndexedDB has not been captured
+    indexed_db: Optional[List[Dict[str, Any]]] = None
+
+    def age(self) -> float:
+        return time.time() - self.created
+
+
+def capture(webdriver: WebDriver, indexed_db: bool = False, timeout: float = 10) -> BrowserState:
+    """State of the current origin of the webdriver.
+    :param webdriver: WebDriver on a page of the application.
+    :param indexed_db: capture IndexedDB databases too.
+    :param timeout: time for the browser to read IndexedDB.
+    """
+    origin = local_storage = session_storage = databases = None
+    if se_utils.javascript_enabled(webdriver):
+        origin, local_storage, session_storage = webdriver.execute_script(READ_STORAGE_SCRIPT)
+        if indexed_db:
+            with se_utils.script_timeout(webdriver, timeout):
+                databases = webdriver.execute_async_script(READ_INDEXED_DB_SCRIPT)
+    return BrowserState(version=STATE_VERSION,
+                        created=time.time(),
+                        url=webdriver.current_url,
+                        origin=origin,
+                        cookies=webdriver.get_cookies(),
+                        local_storage=local_storage,
+                        session_storage=session_storage,
+                        indexed_db=databases)
+
+
+def save(state: BrowserState, path: str):
+    """Write the state as gzipped JSON, the file is replaced atomically."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(temp_path, "wt", encoding="utf-8") as file:
+        json.dump(state._asdict(), file, separators=(",", ":"))
+    os.replace(temp_path, path)
+
+
+def load(path: str, ttl: Optional[float] = None) -> Optional[BrowserState]:
+    """The saved state, None if there is no file, it's of another format version or older than ttl seconds."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        # no file, or a broken one
+        return None
+    if data.get("version") != STATE_VERSION:
+        return None
+    state = BrowserState(**data)
+    if ttl is not None and state.age() > ttl:
+        return None
+    return state
+
+
+def restore(webdriver: WebDriver, state: BrowserState, url: Optional[str] = None, timeout: float = 10):
+    """Open the page of the state, restore the state and reload the page, so the application sees it.
+    :param url: page to open instead of the saved one, it should be of the same origin.
+        Databases are recreated, restore IndexedDB from a page, which doesn't keep them open.
+    :param timeout: time for the browser to write IndexedDB.
+    """
+    webdriver.get(url or state.url)
+    now = time.time()
+    for cookie in state.cookies:
+        if cookie.get("expiry") is not None and cookie["expiry"] < now:
+            continue
+        webdriver.add_cookie(cookie)
+    if se_utils.javascript_enabled(webdriver):
+        webdriver.execute_script(WRITE_STORAGE_SCRIPT, state.local_storage, state.session_storage)
+        if state.indexed_db:
+            with se_utils.script_timeout(webdriver, timeout):
+                error = webdriver.execute_async_script(WRITE_INDEXED_DB_SCRIPT, state.indexed_db)
+            if error is not None:
+                raise WebDriverException(f"IndexedDB of the state has not been restored: {error}.")
+    webdriver.refresh()
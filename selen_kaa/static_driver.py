@@ -0,0 +1,564 @@
+"""In-process webdriver for server-rendered pages, without a browser and without JavaScript.
+Pages are fetched with a local HTTP client (or called directly on a WSGI app), parsed with lxml,
+and the subset of WebDriver used by SeWebDriver, SeWebElement, SeElementsArray and Wait is implemented on the tree:
+navigation, find by any locator strategy, text, attributes, links, form controls and form submission.
+Visibility is derived from the markup only (`hidden`, inline `display: none`/`visibility: hidden`, hidden inputs),
+styles of stylesheets are not applied.
+Requires `pip install lxml cssselect`.
+>>>browser = SeWebDriver(StaticWebDriver())
+>>>browser.get("http://127.0.0.1:5000/")
+>>>browser.init_web_element("h1").should.have_exact_text("Selen-kaa")
+
+"""
+import io
+import re
+import sys
+import email.message
+import urllib.error
+import urllib.request
+from http.cookiejar import Cookie, CookieJar
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urldefrag, urlencode, urljoin, urlsplit, urlunsplit
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import (ElementNotInteractableException, NoSuchElementException,
+                                        StaleElementReferenceException, WebDriverException)
+
+from selen_kaa.utils import html_tree
+
+
+_HIDDEN_STYLE = re.compile(r"(display\s*:\s*none|visibility\s*:\s*hidden)", re.IGNORECASE)
+_SUBMIT_KEYS = (Keys.ENTER, Keys.RETURN)
+# Keys constants are in the private use area of Unicode
+_SPECIAL_KEYS_START, _SPECIAL_KEYS_END = "\ue000", "\uf8ff"
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+_BOOLEAN_ATTRIBUTES = frozenset(("checked", "selected", "disabled", "readonly", "required", "multiple", "hidden"))
+
+
+class Response(NamedTuple):
+    url: str
+    status: int
+    headers: email.message.Message
+    body: bytes
+
+
+class UrllibTransport:
+    """HTTP client of StaticWebDriver, cookies are kept in the driver's cookie jar."""
+
+    def __init__(self, cookie_jar: CookieJar, timeout: float = 30):
+        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookie_jar))
+        self._timeout = timeout
+
+    def request(self, method: str, url: str, data: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Response:
+        request = urllib.request.Request(url, data=data, headers=headers or {}, method=method)
+        try:
+            with self._opener.open(request, timeout=self._timeout) as response:
+                return Response(response.geturl(), response.status, response.headers, response.read())
+        except urllib.error.HTTPError as exc:
+            # error pages are rendered, as a browser does
+            return Response(exc.geturl(), exc.code, exc.headers, exc.read())
+
+
+class WsgiTransport:
+    """Calls a WSGI application (Flask, Django, ...) in process, no server and no sockets."""
+
+    MAX_REDIRECTS = 10
+
+    def __init__(self, app: Callable, cookie_jar: CookieJar):
+        self._app = app
+        self._cookie_jar = cookie_jar
+
+    def request(self, method: str, url: str, data: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Response:
+        for _ in range(self.MAX_REDIRECTS + 1):
+            request = urllib.request.Request(url, data=data, headers=headers or {}, method=method)
+            self._cookie_jar.add_cookie_header(request)
+            response = self._call(request)
+            self._cookie_jar.extract_cookies(_CookieResponse(response.headers), request)
+            location = response.headers.get("Location")
+            if response.status not in _REDIRECT_STATUSES or not location:
+                return response
+            url = urljoin(url, location)
+            if response.status not in (307, 308):
+                method, data = "GET", None
+        raise WebDriverException(f"Too many redirects while loading {url}.")
+
+    def _call(self, request: urllib.request.Request) -> Response:
+        parts = urlsplit(request.full_url)
+        body = request.data or b""
+        environ = {
+            "REQUEST_METHOD": request.get_method(),
+            "SCRIPT_NAME": "",
+            "PATH_INFO": unquote(parts.path, encoding="latin-1") or "/",
+            "QUERY_STRING": parts.query,
+            "SERVER_NAME": parts.hostname or "localhost",
+            "SERVER_PORT": str(parts.port or (443 if parts.scheme == "https" else 80)),
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "CONTENT_LENGTH": str(len(body)),
+            "HTTP_HOST": parts.netloc,
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": parts.scheme or "http",
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": False,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in request.header_items():
+            key = name.upper().replace("-", "_")
+            environ[key if key == "CONTENT_TYPE" else "HTTP_" + key] = value
+
+        started = []
+        written: List[bytes] = []
+
+        def start_response(status, response_headers, exc_info=None):
+            started[:] = [status, response_headers]
+            return written.append
+
+        result = self._app(environ, start_response)
+        try:
+            chunks = list(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        status, response_headers = started
+        headers = email.message.Message()
+        for name, value in response_headers:
+            headers[name] = value
+        return Response(request.full_url, int(status.split()[0]), headers, b"".join(written + chunks))
+
+
+class _CookieResponse:
+    """The part of a urllib response used by CookieJar.extract_cookies()."""
+
+    def __init__(self, headers: email.message.Message):
+        self._headers = headers
+
+    def info(self):
+        return self._headers
+
+
+class StaticWebDriver:
+    """WebDriver without a browser for pages, which need no JavaScript.
+    `capabilities["javascriptEnabled"]` is False, so SeElementsArray uses the lookups instead of scripts,
+    and `execute_script()` raises WebDriverException.
+    """
+
+    name = "static"
+    session_id = "static"
+    current_window_handle = "static"
+    window_handles = ["static"]
+
+    def __init__(self, wsgi_app: Optional[Callable] = None, timeout: float = 30):
+        """
+        :param wsgi_app: WSGI application to call in process, pages are fetched over HTTP if not passed.
+        :param timeout: timeout of HTTP requests in seconds.
+        """
+        html_tree.require_lxml("StaticWebDriver")
+        self.cookie_jar = CookieJar()
+        if wsgi_app is not None:
+            self._transport = WsgiTransport(wsgi_app, self.cookie_jar)
+        else:
+            self._transport = UrllibTransport(self.cookie_jar, timeout)
+        self.capabilities = {"browserName": self.name, "javascriptEnabled": False}
+        # (url, html) of visited pages, `back()` and `forward()` restore them without requests
+        self._history: List[Tuple[str, str]] = []
+        self._position = -1
+        self._root = None
+        # elements of a previous document are stale
+        self._generation = 0
+        self.last_response: Optional[Response] = None
+
+    def get(self, url: str):
+        self._navigate("GET", url)
+
+    def back(self):
+        if self._position > 0:
+            self._position -= 1
+            self._load(*self._history[self._position])
+
+    def forward(self):
+        if self._position < len(self._history) - 1:
+            self._position += 1
+            self._load(*self._history[self._position])
+
+    def refresh(self):
+        if self._position >= 0:
+            self._navigate("GET", self.current_url, replace=True)
+
+    @property
+    def current_url(self) -> str:
+        return self._history[self._position][0] if self._position >= 0 else "about:blank"
+
+    @property
+    def title(self) -> str:
+        title = self.document.find(".//title")
+        return " ".join((title.text_content() if title is not None else "").split())
+
+    @property
+    def page_source(self) -> str:
+        return html_tree.lxml_html.tostring(self.document, encoding=str)
+
+    @property
+    def document(self):
+        """lxml root of the current page."""
+        if self._root is None:
+            self._load("about:blank", "<html><head></head><body></body></html>")
+        return self._root
+
+    def find_element(self, by=By.ID, value=None) -> "StaticWebElement":
+        return _first(self.find_elements(by, value), by, value)
+
+    def find_elements(self, by=By.ID, value=None) -> List["StaticWebElement"]:
+        return [StaticWebElement(self, node) for node in html_tree.select(self.document, by, value)]
+
+    def execute_script(self, script, *args):
+        raise WebDriverException("JavaScript is not supported by StaticWebDriver, the page needs a browser.")
+
+    def execute_async_script(self, script, *args):
+        raise WebDriverException("JavaScript is not supported by StaticWebDriver, the page needs a browser.")
+
+    def execute(self, driver_command: str, params=None):
+        """Remote commands of WebElement, which are not implemented on the parsed page."""
+        raise WebDriverException(f"Command '{driver_command}' is not supported by StaticWebDriver.")
+
+    def get_cookies(self) -> List[dict]:
+        return [_cookie_to_dict(cookie) for cookie in self.cookie_jar]
+
+    def get_cookie(self, name: str) -> Optional[dict]:
+        for cookie in self.get_cookies():
+            if cookie["name"] == name:
+                return cookie
+        return None
+
+    def add_cookie(self, cookie_dict: dict):
+        domain = cookie_dict.get("domain") or urlsplit(self.current_url).hostname or ""
+        self.cookie_jar.set_cookie(Cookie(
+            version=0, name=cookie_dict["name"], value=cookie_dict["value"], port=None, port_specified=False,
+            domain=domain, domain_specified=domain.startswith("."), domain_initial_dot=domain.startswith("."),
+            path=cookie_dict.get("path", "/"), path_specified=True, secure=cookie_dict.get("secure", False),
+            expires=cookie_dict.get("expiry"), discard=cookie_dict.get("expiry") is None, comment=None,
+            comment_url=None, rest={"HttpOnly": None} if cookie_dict.get("httpOnly") else {}
+        ))
+
+    def delete_cookie(self, name: str):
+        for cookie in [cookie for cookie in self.cookie_jar if cookie.name == name]:
+            self.cookie_jar.clear(cookie.domain, cookie.path, cookie.name)
+
+    def delete_all_cookies(self):
+        self.cookie_jar.clear()
+
+    def implicitly_wait(self, time_to_wait: float):
+        """Lookups on a parsed page are immediate."""
+
+    def set_page_load_timeout(self, time_to_wait: float):
+        """Requests use the timeout of the driver."""
+
+    def close(self):
+        self.quit()
+
+    def quit(self):
+        self._history = []
+        self._position = -1
+        self._root = None
+        self._generation += 1
+
+    def submit_form(self, form, submitter=None):
+        """Submit a form element (lxml) with the values of its controls, as a browser does."""
+        fields = _form_fields(self.document, form, submitter)
+        submitter_ = submitter if submitter is not None else form
+        action = submitter_.get("formaction") or form.get("action") or ""
+        url = urldefrag(urljoin(self.current_url, action))[0]
+        method = (submitter_.get("formmethod") or form.get("method") or "get").lower()
+        if method == "post":
+            self._navigate("POST", url, urlencode(fields).encode(),
+                           {"Content-Type": "application/x-www-form-urlencoded"})
+        else:
+            self._navigate("GET", urlunsplit(urlsplit(url)._replace(query=urlencode(fields))))
+
+    def _navigate(self, method: str, url: str, data: Optional[bytes] = None,
+                  headers: Optional[Dict[str, str]] = None, replace: bool = False):
+        response = self._transport.request(method, url, data, headers)
+        self.last_response = response
+        html = response.body.decode(response.headers.get_content_charset() or "utf-8", errors="replace")
+        if replace:
+            self._history[self._position] = (response.url, html)
+        else:
+            del self._history[self._position + 1:]
+            self._history.append((response.url, html))
+            self._position += 1
+        self._load(response.url, html)
+
+    def _load(self, url: str, html: str):
+        self._root = html_tree.lxml_html.document_fromstring(html or "<html></html>", base_url=url)
+        self._generation += 1
+
+
+class StaticWebElement(WebElement):
+    """WebElement of a page parsed by StaticWebDriver."""
+
+    def __init__(self, driver: StaticWebDriver, node):
+        super().__init__(driver, f"static-{driver._generation}-{id(node)}")
+        self._node = node
+        self._generation = driver._generation
+
+    @property
+    def node(self):
+        """lxml element, raises StaleElementReferenceException after navigation."""
+        if self._generation != self._parent._generation:
+            raise StaleElementReferenceException(f"Element {self._node.tag} is not attached to the page document.")
+        return self._node
+
+    @property
+    def tag_name(self) -> str:
+        return self.node.tag
+
+    @property
+    def text(self) -> str:
+        return html_tree.visible_text(self.node, _is_hidden)
+
+    @property
+    def location(self) -> dict:
+        return {"x": 0, "y": 0}
+
+    @property
+    def size(self) -> dict:
+        return {"height": 0, "width": 0}
+
+    @property
+    def rect(self) -> dict:
+        return {"x": 0, "y": 0, "height": 0, "width": 0}
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        """Current value of a property or an attribute, as Selenium returns it."""
+        node = self.node
+        if name == "value":
+            return _control_value(node)
+        if name in ("checked", "selected") and _is_checkable(node):
+            return "true" if self.is_selected() else None
+        if name in _BOOLEAN_ATTRIBUTES:
+            return "true" if node.get(name) is not None else None
+        if name in ("href", "src", "action") and node.get(name) is not None:
+            return urljoin(self._parent.current_url, node.get(name))
+        if name in ("textContent", "innerText"):
+            return node.text_content() if name == "textContent" else self.text
+        return node.get(name)
+
+    def get_dom_attribute(self, name: str) -> Optional[str]:
+        return self.node.get(name)
+
+    def get_property(self, name: str):
+        return self.get_attribute(name)
+
+    def is_displayed(self) -> bool:
+        node = self.node
+        while node is not None:
+            if _is_hidden(node) or node.tag in html_tree.NO_TEXT_TAGS:
+                return False
+            node = node.getparent()
+        return True
+
+    def is_enabled(self) -> bool:
+        return self.node.get("disabled") is None
+
+    def is_selected(self) -> bool:
+        node = self.node
+        if node.tag == "option":
+            return node.get("selected") is not None or node is _selected_options(_select_of(node))[0]
+        return node.get("checked") is not None
+
+    def click(self):
+        node = self.node
+        if not self.is_enabled():
+            return
+        type_ = (node.get("type") or "").lower()
+        if node.tag == "input" and type_ == "checkbox":
+            _set_flag(node, "checked", node.get("checked") is None)
+        elif node.tag == "input" and type_ == "radio":
+            _check_radio(self._parent.document, node)
+        elif node.tag == "option":
+            _select_option(node)
+        elif (node.tag == "input" and type_ in ("submit", "image")) or (node.tag == "button" and type_ in ("", "submit")):
+            form = _form_of(self._parent.document, node)
+            if form is not None:
+                self._parent.submit_form(form, node)
+        else:
+            link = next((el for el in node.iterancestors("a") if el.get("href") is not None), None) \
+                if node.tag != "a" or node.get("href") is None else node
+            href = link.get("href") if link is not None else None
+            if href and not href.startswith(("#", "javascript:")):
+                self._parent.get(urljoin(self._parent.current_url, href))
+
+    def send_keys(self, *value):
+        node = self.node
+        if node.tag not in ("input", "textarea") or not self.is_enabled():
+            raise ElementNotInteractableException(f"Element {node.tag} can't get keys in StaticWebDriver.")
+        text = "".join(str(item) for item in value)
+        typed = []
+        for char in text:
+            if char in _SUBMIT_KEYS and node.tag == "textarea":
+                typed.append("\n")
+            elif char in _SUBMIT_KEYS:
+                self._set_value(node, _control_value(node) + "".join(typed))
+                typed = []
+                form = _form_of(self._parent.document, node)
+                if form is not None:
+                    # implicit submission, the element is stale after it
+                    self._parent.submit_form(form)
+                    return
+            elif not _SPECIAL_KEYS_START <= char <= _SPECIAL_KEYS_END:
+                # special keys (arrows, modifiers) have no effect on a static page
+                typed.append(char)
+        self._set_value(node, _control_value(node) + "".join(typed))
+
+    def clear(self):
+        self._set_value(self.node, "")
+
+    def submit(self):
+        node = self.node
+        form = node if node.tag == "form" else _form_of(self._parent.document, node)
+        if form is None:
+            raise WebDriverException("The element is not in a form.")
+        self._parent.submit_form(form)
+
+    def find_element(self, by=By.ID, value=None) -> "StaticWebElement":
+        return _first(self.find_elements(by, value), by, value)
+
+    def find_elements(self, by=By.ID, value=None) -> List["StaticWebElement"]:
+        return [StaticWebElement(self._parent, node) for node in html_tree.select(self.node, by, value)]
+
+    @staticmethod
+    def _set_value(node, value: str):
+        if node.tag == "textarea":
+            node.text = value
+        else:
+            node.set("value", value)
+
+    def __repr__(self):
+        return f"<{type(self).__module__}.{type(self).__name__} (tag=\"{self._node.tag}\", id=\"{self._id}\")>"
+
+
+def _first(elements: list, by, value):
+    if not elements:
+        raise NoSuchElementException(f"Unable to locate element: {{\"method\":\"{by}\",\"selector\":\"{value}\"}}")
+    return elements[0]
+
+
+def _is_hidden(node) -> bool:
+    if node.get("hidden") is not None or _HIDDEN_STYLE.search(node.get("style") or ""):
+        return True
+    return node.tag == "input" and (node.get("type") or "").lower() == "hidden"
+
+
+def _is_checkable(node) -> bool:
+    return node.tag == "option" or (node.tag == "input" and (node.get("type") or "").lower() in ("checkbox", "radio"))
+
+
+def _set_flag(node, name: str, value: bool):
+    if value:
+        node.set(name, name)
+    elif name in node.attrib:
+        del node.attrib[name]
+
+
+def _form_of(document, node):
+    form_id = node.get("form")
+    if form_id:
+        forms = html_tree.select(document, By.ID, form_id)
+        return forms[0] if forms else None
+    return next(node.iterancestors("form"), None)
+
+
+def _check_radio(document, node):
+    name = node.get("name")
+    if name:
+        form = _form_of(document, node)
+        scope = form if form is not None else document
+        for radio in html_tree.select(scope, By.NAME, name):
+            if radio.tag == "input" and (radio.get("type") or "").lower() == "radio":
+                _set_flag(radio, "checked", False)
+    _set_flag(node, "checked", True)
+
+
+def _select_of(option):
+    return next(option.iterancestors("select"), None)
+
+
+def _selected_options(select) -> list:
+    if select is None:
+        return [None]
+    options = list(select.iter("option"))
+    selected = [option for option in options if option.get("selected") is not None]
+    if selected or select.get("multiple") is not None:
+        return selected or [None]
+    # a single select shows its first option, if none is selected
+    return options[:1] or [None]
+
+
+def _select_option(option):
+    select = _select_of(option)
+    if select is not None and select.get("multiple") is None:
+        for other in select.iter("option"):
+            _set_flag(other, "selected", False)
+        _set_flag(option, "selected", True)
+    else:
+        _set_flag(option, "selected", option.get("selected") is None)
+
+
+def _option_value(option) -> str:
+    value = option.get("value")
+    return value if value is not None else " ".join(option.text_content().split())
+
+
+def _control_value(node) -> Optional[str]:
+    if node.tag == "textarea":
+        return node.text or ""
+    if node.tag == "select":
+        option = _selected_options(node)[0]
+        return _option_value(option) if option is not None else None
+    if node.tag == "option":
+        return _option_value(node)
+    if node.tag == "input":
+        default = "on" if (node.get("type") or "").lower() in ("checkbox", "radio") else ""
+        return node.get("value", default)
+    return node.get("value")
+
+
+def _form_fields(document, form, submitter=None) -> List[Tuple[str, str]]:
+    """Name-value pairs of the successful controls of a form."""
+    controls = list(form.iter("input", "textarea", "select", "button"))
+    form_id = form.get("id")
+    if form_id:
+        # controls outside of the form, which refer to it by the `form` attribute
+        controls.extend(node for node in document.iter("input", "textarea", "select", "button")
+                        if node.get("form") == form_id and node not in controls)
+    fields = []
+    for control in controls:
+        name = control.get("name")
+        if not name or control.get("disabled") is not None:
+            continue
+        type_ = (control.get("type") or "").lower()
+        if control.tag == "button" or (control.tag == "input" and type_ in ("submit", "image", "button", "reset")):
+            if control is submitter:
+                fields.append((name, control.get("value", "")))
+        elif control.tag == "input" and type_ in ("checkbox", "radio"):
+            if control.get("checked") is not None:
+                fields.append((name, control.get("value", "on")))
+        elif control.tag == "input" and type_ == "file":
+            continue
+        elif control.tag == "select":
+            fields.extend((name, _option_value(option)) for option in _selected_options(control) if option is not None)
+        else:
+            fields.append((name, _control_value(control)))
+    return fields
+
+
+def _cookie_to_dict(cookie: Cookie) -> dict:
+    cookie_dict = {"name": cookie.name, "value": cookie.value, "domain": cookie.domain, "path": cookie.path,
+                   "secure": cookie.secure, "httpOnly": cookie.has_nonstandard_attr("HttpOnly")}
+    if cookie.expires is not None:
+        cookie_dict["expiry"] = cookie.expires
+    return cookie_dict
@@ -0,0 +1,178 @@
+"""Several logical sessions in tabs of one browser.
+Every tab gets its own WebDriver object: a shallow copy of the browser's WebDriver, which focuses its window
+before a command, only if another window is focused. WebElements found in a tab belong to the tab,
+so their commands are focused too. A tab gets its own SeWebDriver facade with its own caches.
+Tabs share cookies and localStorage of the browser profile, sessionStorage and the page state are per tab.
+A released tab is closed, the next flow gets a new tab, so it doesn't inherit sessionStorage of the previous one.
+
+"""
+import contextvars
+import copy
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.switch_to import SwitchTo
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from selen_kaa.frames import reset_to_top
+
+
+# commands, which don't depend on the focused window
+_WINDOW_INDEPENDENT_COMMANDS = frozenset((Command.W3C_GET_WINDOW_HANDLES, Command.NEW_WINDOW, Command.QUIT))
+
+
+class _Focus:
+    """The focused window of a browser, shared by all tabs of it."""
+
+    def __init__(self, handle: str):
+        self.main_handle = handle
+        self.handle = handle
+        # one command at a time, the window can't be switched between a switch and a command
+        self.lock = threading.RLock()
+        self.switches = 0
+
+
+# focus of every browser with tabs
+_focuses: "weakref.WeakKeyDictionary[WebDriver, _Focus]" = weakref.WeakKeyDictionary()
+
+
+class _TabExecutor:
+    """`execute` of a tab's WebDriver."""
+
+    def __init__(self, tab_driver: WebDriver, handle: str, focus: _Focus):
+        self._tab_driver = tab_driver
+        self._execute = type(tab_driver).execute
+        self.handle = handle
+        self._focus = focus
+
+    def __call__(self, driver_command: str, params: Optional[dict] = None) -> dict:
+        focus = self._focus
+        with focus.lock:
+            if focus.handle != self.handle and driver_command not in _WINDOW_INDEPENDENT_COMMANDS:
+                self._execute(self._tab_driver, Command.SWITCH_TO_WINDOW, {"handle": self.handle})
+                focus.handle = self.handle
+                focus.switches += 1
+                # a switch of windows selects the top document of the window
+                reset_to_top(self._tab_driver)
+            response = self._execute(self._tab_driver, driver_command, params)
+            if driver_command == Command.SWITCH_TO_WINDOW:
+                # the tab has switched to another window, e.g. a popup, it stays there
+                self.handle = focus.handle = params["handle"]
+            return response
+
+
+class Tab:
+    """A window of the browser with its own WebDriver object."""
+
+    def __init__(self, webdriver: WebDriver, handle: str, focus: _Focus):
+        self.webdriver: WebDriver = copy.copy(webdriver)
+        self._executor = _TabExecutor(self.webdriver, handle, focus)
+        # the copy sends all commands with focusing, including switch_to and elements found in the tab
+        self.webdriver.execute = self._executor
+        self.webdriver._switch_to = SwitchTo(self.webdriver)
+
+    @property
+    def handle(self) -> str:
+        return self._executor.handle
+
+
+class TabScheduler:
+    """Tabs of one browser for short independent flows.
+    >>>with browser.tabs.session() as tab:
+    ...    tab.get("https://some.com")
+    ...    tab.init_web_element(".title").should.be_visible()
+    >>>results = browser.tabs.run([login_flow, search_flow, checkout_flow], max_tabs=3)
+    While tabs are in use, send commands through the tabs, the browser's WebDriver doesn't know the focus.
+    """
+
+    def __init__(self, webdriver: WebDriver, facade: Callable[[Tab], Any]):
+        """
+        :param webdriver: WebDriver of the browser.
+        :param facade: creates a facade (SeWebDriver) of a tab, the facade has the tab in `tab` attribute.
+        """
+        self._webdriver = webdriver
+        self._facade = facade
+        self._lock = threading.Lock()
+        self._tabs: List[Tab] = []
+
+    @property
+    def _focus(self) -> _Focus:
+        try:
+            return _focuses[self._webdriver]
+        except KeyError:
+            focus = _focuses[self._webdriver] = _Focus(self._webdriver.current_window_handle)
+            return focus
+
+    @property
+    def size(self) -> int:
+        """Number of opened tabs, the main window is not counted."""
+        return len(self._tabs)
+
+    @property
+    def switches(self) -> int:
+        """Number of window switches made by the tabs."""
+        return self._focus.switches
+
+    def open(self):
+        """A facade of a new tab. Release it with `release()`."""
+        focus = self._focus
+        with focus.lock:
+            handle = self._webdriver.execute(Command.NEW_WINDOW, {"type": "tab"})["value"]["handle"]
+        tab = Tab(self._webdriver, handle, focus)
+        with self._lock:
+            self._tabs.append(tab)
+        return self._facade(tab)
+
+    def release(self, facade):
+        """Close the tab. A blank page in a reused tab would keep sessionStorage of the origins it visited."""
+        tab = facade.tab
+        with self._lock:
+            if tab not in self._tabs:
+                return
+            self._tabs.remove(tab)
+        focus = self._focus
+        with focus.lock:
+            tab.webdriver.close()
+            # no window is focused, the next command of any tab focuses its window
+            focus.handle = None
+
+    @contextmanager
+    def session(self) -> Iterator[Any]:
+        """A facade of a tab for the block, the tab is released after it."""
+        facade = self.open()
+        try:
+            yield facade
+        finally:
+            self.release(facade)
+
+    def run(self, flows: Iterable[Callable[[Any], Any]], max_tabs: int = 4) -> List[Any]:
+        """Run flows in parallel threads, every flow gets a facade of its own tab.
+        Commands of the tabs are serialized, while one flow waits, the others work.
+        Every flow runs in a copy of the caller's context, so the current budget (`SeWebDriver.budget()`)
+        caps the waits of the flows too.
+        :param flows: functions with the facade as the only argument.
+        :param max_tabs: maximum number of tabs open at once.
+        :return: results of the flows in the order of the flows, the first exception is raised.
+        """
+        def run_flow(flow):
+            with self.session() as facade:
+                return flow(facade)
+
+        with ThreadPoolExecutor(max_workers=max_tabs, thread_name_prefix="selen-kaa-tab") as executor:
+            futures = [executor.submit(contextvars.copy_context().run, run_flow, flow) for flow in flows]
+            return [future.result() for future in futures]
+
+    def close_all(self):
+        """Close all tabs and focus the main window."""
+        focus = self._focus
+        with self._lock:
+            tabs, self._tabs = self._tabs, []
+        with focus.lock:
+            for tab in tabs:
+                tab.webdriver.close()
+            self._webdriver.switch_to.window(focus.main_handle)
+            focus.handle = focus.main_handle
@@ -0,0 +1,122 @@
+"""Persisted statistics of the time an element needs to appear on a page.
+Used by SeWebDriver to derive per-selector timeouts instead of the fixed DEFAULT_TIMEOUT,
+so negative checks fail fast for fast elements, while slow elements still get their headroom.
+
+"""
+import os
+import json
+import atexit
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from selen_kaa.global_config import DEFAULT_TIMEOUT
+from selen_kaa.utils import custom_types
+from selen_kaa.utils.se_utils import percentile
+
+
+TimeoutType = custom_types.TimeoutType
+
+
+def page_key(url: str) -> str:
+    """Page key of an url, e.g. `/login` for `https://some.com/login?next=1`."""
+    return urlparse(url).path or "/"
+
+
+class TimingStats:
+    """Time-to-appear samples per (page, selector), stored in a local JSON file.
+
+    >>>stats = TimingStats("./.selen_kaa_timings.json")
+    >>>browser = SeWebDriver(webdriver.Chrome(), timing_stats=stats)
+    """
+
+    FILE_VERSION = 1
+    # keep only the most recent samples of each selector
+    MAX_SAMPLES = 200
+    # don't trust the statistics until there are enough samples
+    MIN_SAMPLES = 5
+    # derived timeout is `p99 * HEADROOM`, but never less than MIN_TIMEOUT
+    HEADROOM = 2
+    MIN_TIMEOUT = 0.5
+
+    def __init__(self,
+                 path: str,
+                 default_timeout: TimeoutType = DEFAULT_TIMEOUT,
+                 max_timeout: TimeoutType = None,
+                 autosave: bool = True):
+        """
+        :param path: path to a JSON file, it's created on the first save.
+        :param default_timeout: timeout for the selectors without enough statistics.
+        :param max_timeout: upper bound for a derived timeout, 3 * default_timeout if not passed.
+        :param autosave: save the statistics on the interpreter exit.
+        """
+        self.path = path
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout if max_timeout is not None else 3 * default_timeout
+        self._samples: Dict[str, Dict[str, List[float]]] = {}
+        self._pending: Dict[str, Dict[str, List[float]]] = {}
+        self._lock = threading.Lock()
+        self._samples = self._read_file()
+        if autosave:
+            atexit.register(self.save)
+
+    def record(self, page: str, selector: str, seconds: float):
+        """Add an observed time-to-appear for the selector on the page."""
+        with self._lock:
+            for storage in (self._samples, self._pending):
+                samples = storage.setdefault(page, {}).setdefault(selector, [])
+                samples.append(round(seconds, 4))
+                del samples[:-self.MAX_SAMPLES]
+
+    def samples(self, page: str, selector: str) -> List[float]:
+        return list(self._samples.get(page, {}).get(selector, []))
+
+    def percentile(self, page: str, selector: str, pct: float) -> Optional[float]:
+        """Percentile of time-to-appear in seconds, None if there are no samples."""
+        samples = self.samples(page, selector)
+        if not samples:
+            return None
+        return percentile(samples, pct)
+
+    def timeout_for(self, page: str, selector: str) -> TimeoutType:
+        """Timeout derived from the p99 of time-to-appear.
+        Returns default_timeout until MIN_SAMPLES are recorded.
+        """
+        samples = self.samples(page, selector)
+        if len(samples) < self.MIN_SAMPLES:
+            return self.default_timeout
+        p99 = percentile(samples, 99)
+        return min(max(p99 * self.HEADROOM, self.MIN_TIMEOUT), self.max_timeout)
+
+    def save(self):
+        """Merge recorded samples into the file.
+        Samples of other processes (e.g. pytest-xdist workers) written meanwhile are kept.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            on_disk = self._read_file()
+            for page, selectors in self._pending.items():
+                for selector, samples in selectors.items():
+                    merged = on_disk.setdefault(page, {}).setdefault(selector, [])
+                    merged.extend(samples)
+                    del merged[:-self.MAX_SAMPLES]
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as file_:
+                json.dump({"version": self.FILE_VERSION, "stats": on_disk}, file_)
+            os.replace(tmp_path, self.path)
+            self._samples = on_disk
+            self._pending = {}
+
+    def _read_file(self) -> Dict[str, Dict[str, List[float]]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as file_:
+                content = json.load(file_)
+        except ValueError:
+            # a broken file is not a reason to fail tests, start from scratch
+            return {}
+        if content.get("version") != self.FILE_VERSION:
+            return {}
+        return content.get("stats", {})
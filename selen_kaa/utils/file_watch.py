@@ -0,0 +1,162 @@
+"""Waiting for downloaded files.
+Browsers write a download into a partial file, e.g. `report.pdf.crdownload`, and rename it when it's done.
+Firefox creates an empty `report.pdf` next to `report.pdf.part` at the start. A file is complete,
+when it matches the pattern and no partial file of it exists.
+On Linux the directory is watched with inotify, the file is returned on the event of its rename or close.
+Elsewhere the directory is polled, and a file is complete when its size and mtime are the same in two polls.
+
+"""
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from selenium.common.exceptions import TimeoutException
+
+from selen_kaa.deadline import remaining
+
+
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".partial", ".download", ".tmp")
+POLL_INTERVAL = 0.1
+
+# inotify(7)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+# events of a complete write of a file: its rename from a partial file, or its close
+_COMPLETION_EVENTS = _IN_CLOSE_WRITE | _IN_MOVED_TO
+# events after which a partial file is gone
+_PARTIAL_GONE_EVENTS = _IN_MOVED_FROM | _IN_DELETE
+
+
+def is_partial(name: str) -> bool:
+    return name.endswith(PARTIAL_SUFFIXES)
+
+
+def _has_partial(directory: str, name: str) -> bool:
+    return any(os.path.exists(os.path.join(directory, name + suffix)) for suffix in PARTIAL_SUFFIXES)
+
+
+def _is_candidate(directory: str, name: str, pattern: str, since: Optional[float]) -> bool:
+    """The file matches and is not being written, as far as partial files tell."""
+    if is_partial(name) or not fnmatch.fnmatch(name, pattern) or _has_partial(directory, name):
+        return False
+    try:
+        stat = os.stat(os.path.join(directory, name))
+    except FileNotFoundError:
+        return False
+    return since is None or stat.st_mtime >= since
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        return libc if hasattr(libc, "inotify_init1") else None
+    except OSError:
+        return None
+
+
+_libc = _load_libc()
+
+
+def inotify_available() -> bool:
+    return _libc is not None
+
+
+def wait_for_complete_file(directory: str,
+                           pattern: str = "*",
+                           timeout=30,
+                           since: Optional[float] = None,
+                           use_inotify: bool = True) -> str:
+    """Path of the first complete file matching the pattern, raises TimeoutException after timeout.
+    :param directory: download directory.
+    :param pattern: glob pattern of the file name, e.g. "report-*.pdf".
+    :param timeout: time to wait in seconds, or a Deadline.
+    :param since: ignore files modified before this time, e.g. `time.time()` before the click on a link.
+    :param use_inotify: False to poll the directory even on Linux.
+    """
+    deadline = time.monotonic() + remaining(timeout)
+    if use_inotify and _libc is not None:
+        fd = _libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd >= 0:
+            try:
+                return _wait_with_inotify(fd, directory, pattern, deadline, since, timeout)
+            finally:
+                os.close(fd)
+    return _wait_with_polling(directory, pattern, deadline, since, timeout)
+
+
+def _wait_with_inotify(fd: int, directory: str, pattern: str, deadline: float,
+                       since: Optional[float], timeout) -> str:
+    if _libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"Can't watch the directory {directory}: {os.strerror(errno)}")
+    # the watch is set, files completed before it are found by the scan
+    for name in sorted(os.listdir(directory)):
+        if _is_candidate(directory, name, pattern, since):
+            return os.path.join(directory, name)
+    while True:
+        time_left = deadline - time.monotonic()
+        if time_left <= 0:
+            raise TimeoutException(_timeout_message(directory, pattern, timeout))
+        readable, _, _ = select.select([fd], [], [], time_left)
+        if not readable:
+            continue
+        data = os.read(fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            offset += length
+            if mask & _COMPLETION_EVENTS:
+                candidate = name
+            elif mask & _PARTIAL_GONE_EVENTS and is_partial(name):
+                # the partial file is renamed or deleted, the final file may be complete now
+                candidate = os.path.splitext(name)[0]
+            else:
+                continue
+            if _is_candidate(directory, candidate, pattern, since):
+                return os.path.join(directory, candidate)
+
+
+def _wait_with_polling(directory: str, pattern: str, deadline: float,
+                       since: Optional[float], timeout) -> str:
+    # (size, mtime) of candidates in the previous poll
+    previous: Dict[str, Tuple[int, int]] = {}
+    while True:
+        current: Dict[str, Tuple[int, int]] = {}
+        for name in sorted(os.listdir(directory)):
+            if not _is_candidate(directory, name, pattern, since):
+                continue
+            try:
+                stat = os.stat(os.path.join(directory, name))
+            except FileNotFoundError:
+                continue
+            current[name] = (stat.st_size, stat.st_mtime_ns)
+            if previous.get(name) == current[name]:
+                return os.path.join(directory, name)
+        previous = current
+        time_left = deadline - time.monotonic()
+        if time_left <= 0:
+            raise TimeoutException(_timeout_message(directory, pattern, timeout))
+        time.sleep(min(POLL_INTERVAL, time_left))
+
+
+def _timeout_message(directory: str, pattern: str, timeout) -> str:
+    partial: Set[str] = {name for name in os.listdir(directory) if is_partial(name)}
+    details = f" Partial files: {sorted(partial)}." if partial else ""
+    return (f"TimeoutException while waited {timeout} second(s) for a download matching '{pattern}' "
+            f"in {directory}.{details}")
@@ -0,0 +1,99 @@
+"""Lookups and visible text on lxml trees, shared by DOM snapshots and the static webdriver.
+lxml and cssselect are optional dependencies.
+
+"""
+from functools import lru_cache
+from typing import Callable, List
+
+from selenium.webdriver.common.by import By
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # pragma: no cover
+    etree = lxml_html = None
+
+
+BLOCK_TAGS = frozenset(("address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset",
+                        "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+                        "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "tr", "ul"))
+NO_TEXT_TAGS = frozenset(("script", "style", "template", "noscript", "head"))
+
+# the other locator strategies are expressed as XPath with the `$value` variable
+_XPATH_BY_STRATEGY = {
+    By.ID: "descendant::*[@id=$value]",
+    By.NAME: "descendant::*[@name=$value]",
+    By.CLASS_NAME: "descendant::*[contains(concat(' ', normalize-space(@class), ' '), concat(' ', $value, ' '))]",
+    By.TAG_NAME: "descendant::*[local-name()=$value]",
+    By.LINK_TEXT: "descendant::a[normalize-space(string())=normalize-space($value)]",
+    By.PARTIAL_LINK_TEXT: "descendant::a[contains(string(), $value)]",
+}
+# lookups from the document match the root element too
+_XPATH_FROM_DOCUMENT_BY_STRATEGY = {strategy: xpath.replace("descendant::", "descendant-or-self::", 1)
+                                    for strategy, xpath in _XPATH_BY_STRATEGY.items()}
+
+
+def require_lxml(feature: str):
+    if lxml_html is None:
+        raise ImportError(f"{feature} requires lxml.\n"
+                          "Please, install:\n"
+                          "pip install lxml cssselect")
+
+
+@lru_cache(maxsize=1024)
+def compile_selector(locator_strategy: str, value: str, from_document: bool = False) -> Callable:
+    """Compiled lookup, shared by all trees."""
+    if locator_strategy == By.XPATH:
+        return etree.XPath(value)
+    if locator_strategy == By.CSS_SELECTOR:
+        from lxml.cssselect import CSSSelector
+        return CSSSelector(value, translator="html")
+    if locator_strategy in _XPATH_BY_STRATEGY:
+        by_strategy = _XPATH_FROM_DOCUMENT_BY_STRATEGY if from_document else _XPATH_BY_STRATEGY
+        return etree.XPath(by_strategy[locator_strategy])
+    raise ValueError(f"Locator strategy '{locator_strategy}' is not supported on a parsed html.")
+
+
+def select(node, locator_strategy: str, value: str) -> list:
+    """Elements matched by a locator, searched from `node` like `WebElement.find_elements()` does:
+    css and the other strategies match descendants only, xpath is evaluated with `node` as context.
+    From the root element the search is the one of `WebDriver.find_elements()`, the root element matches too.
+    """
+    is_document = node.getparent() is None
+    lookup = compile_selector(locator_strategy, value, is_document)
+    if locator_strategy in _XPATH_BY_STRATEGY:
+        result = lookup(node, value=value)
+    else:
+        result = lookup(node)
+    include_self = is_document or locator_strategy == By.XPATH
+    return [item for item in result if isinstance(item, etree._Element) and (include_self or item is not node)]
+
+
+def visible_text(node, is_hidden: Callable) -> str:
+    """An approximation of `innerText`: hidden subtrees are skipped,
+    whitespace is collapsed and block elements are separated with new lines.
+    :param node: lxml element.
+    :param is_hidden: predicate for an element, which subtree has no visible text.
+    """
+    parts: List[str] = []
+    _collect_text(node, parts, is_hidden, is_root=True)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _collect_text(node, parts: List[str], is_hidden: Callable, is_root: bool = False):
+    if not isinstance(node.tag, str) or node.tag in NO_TEXT_TAGS or is_hidden(node):
+        if not is_root and node.tail:
+            parts.append(node.tail)
+        return
+    is_block = node.tag in BLOCK_TAGS
+    if is_block:
+        parts.append("\n")
+    if node.text:
+        parts.append(node.text)
+    for child in node:
+        _collect_text(child, parts, is_hidden)
+    if is_block:
+        parts.append("\n")
+    if not is_root and node.tail:
+        parts.append(node.tail)
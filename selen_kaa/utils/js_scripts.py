@@ -0,0 +1,566 @@
+"""JavaScript executed in the browser by selen-kaa.
+Locators are passed to the scripts as a pair `[kind, value]`, where kind is "css" or "xpath",
+or as `["text", mode, value, flags]` and `["shadow", [css selectors]]`, see `se_utils.to_js_locator()`.
+
+"""
+
+# function queryText(locator): elements, which own text matches a text locator
+# ["text", mode, value, flags], mode is "exact", "contains" (case insensitive) or "regex".
+# The own text of an element is the normalized text of its child text nodes. The inverted index
+# {text: elements} is built once per document and updated by a MutationObserver, results of a query
+# are cached until the next change of the DOM, so repeated lookups don't scan the DOM.
+TEXT_INDEX_JS = """
+    function textIndex() {
+        var index = document.__selenKaaTextIndex;
+        if (index) {
+            index.apply(index.observer.takeRecords());
+            return index;
+        }
+        var skipped = {SCRIPT: 1, STYLE: 1, NOSCRIPT: 1, TEMPLATE: 1};
+        index = {byText: new Map(), textOf: new Map(), queries: new Map()};
+        function ownText(el) {
+            var text = '';
+            for (var node = el.firstChild; node; node = node.nextSibling) {
+                if (node.nodeType === 3) { text += node.nodeValue; }
+            }
+            return text.replace(/[\\s\\u00a0]+/g, ' ').trim();
+        }
+        function remove(el) {
+            var text = index.textOf.get(el);
+            if (text === undefined) { return; }
+            index.textOf.delete(el);
+            var elements = index.byText.get(text);
+            elements.delete(el);
+            if (!elements.size) { index.byText.delete(text); }
+        }
+        function update(el) {
+            remove(el);
+            if (!el.isConnected || skipped[el.tagName]) { return; }
+            var text = ownText(el);
+            if (!text) { return; }
+            index.textOf.set(el, text);
+            if (!index.byText.has(text)) { index.byText.set(text, new Set()); }
+            index.byText.get(text).add(el);
+        }
+        function updateTree(root) {
+            if (root.nodeType === 3) {
+                if (root.parentElement) { update(root.parentElement); }
+                return;
+            }
+            if (root.nodeType !== 1) { return; }
+            update(root);
+            var walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+            while (walker.nextNode()) { update(walker.currentNode); }
+        }
+        function removeTree(root) {
+            if (root.nodeType !== 1) { return; }
+            remove(root);
+            var walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+            while (walker.nextNode()) { remove(walker.currentNode); }
+        }
+        index.apply = function (records) {
+            if (!records.length) { return; }
+            index.queries.clear();
+            records.forEach(function (record) {
+                if (record.type === 'characterData') {
+                    if (record.target.parentElement) { update(record.target.parentElement); }
+                    return;
+                }
+                Array.prototype.forEach.call(record.removedNodes, function (node) {
+                    if (!node.isConnected) { removeTree(node); }
+                });
+                Array.prototype.forEach.call(record.addedNodes, updateTree);
+                update(record.target);
+            });
+        };
+        updateTree(document.documentElement);
+        index.observer = new MutationObserver(index.apply);
+        index.observer.observe(document, {childList: true, subtree: true, characterData: true});
+        document.__selenKaaTextIndex = index;
+        return index;
+    }
+    function queryText(locator) {
+        var index = textIndex(), key = JSON.stringify(locator);
+        var cached = index.queries.get(key);
+        if (cached) { return cached.slice(); }
+        var mode = locator[1], value = locator[2], found = [];
+        if (mode === 'exact') {
+            var elements = index.byText.get(value.replace(/[\\s\\u00a0]+/g, ' ').trim());
+            if (elements) { found = Array.from(elements); }
+        } else {
+            var test;
+            if (mode === 'regex') {
+                var regex = new RegExp(value, locator[3]);
+                test = function (text) { return regex.test(text); };
+            } else {
+                var lowerValue = value.toLowerCase();
+                test = function (text) { return text.toLowerCase().indexOf(lowerValue) !== -1; };
+            }
+            index.byText.forEach(function (elements, text) {
+                if (test(text)) { elements.forEach(function (el) { found.push(el); }); }
+            });
+        }
+        found.sort(function (a, b) {
+            return a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING ? -1 : 1;
+        });
+        index.queries.set(key, found);
+        return found.slice();
+    }
+"""
+
+# function queryShadow(selectors, root): elements matched by the last css selector of a shadow DOM path
+# ["shadow", [selector of a host, ..., selector of the elements]], every selector is evaluated
+# in the shadow roots of the elements matched by the previous one, the first one in `root` or in the document.
+SHADOW_PATH_JS = """
+    function queryShadow(selectors, root) {
+        var roots = [root || document], found = [];
+        for (var i = 0; i < selectors.length; i++) {
+            found = [];
+            roots.forEach(function (root) {
+                Array.prototype.push.apply(found, root.querySelectorAll(selectors[i]));
+            });
+            roots = found.map(function (el) { return el.shadowRoot; }).filter(Boolean);
+        }
+        return found;
+    }
+"""
+
+# function queryAll(locator): returns Array of elements matched by the locator
+QUERY_ALL_JS = TEXT_INDEX_JS + SHADOW_PATH_JS + """
+    function queryAll(locator) {
+        if (locator[0] === 'text') { return queryText(locator); }
+        if (locator[0] === 'shadow') { return queryShadow(locator[1]); }
+        if (locator[0] === 'xpath') {
+            var snapshot = document.evaluate(locator[1], document, null,
+                XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) { nodes.push(snapshot.snapshotItem(i)); }
+            return nodes;
+        }
+        return Array.prototype.slice.call(document.querySelectorAll(locator[1]));
+    }
+"""
+
+# function isVisible(element): approximation of WebElement.is_displayed()
+IS_VISIBLE_JS = """
+    function isVisible(el) {
+        if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) { return false; }
+        var style = window.getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.opacity !== '0';
+    }
+"""
+
+# function compileFilters(filters): returns one predicate for the filters of SeElementsArray,
+# every filter is an Array, e.g. ["visible"], ["text_regex", pattern, flags], ["class", [names]]
+COMPILE_FILTERS_JS = IS_VISIBLE_JS + """
+    function textOf(el) {
+        return (el.innerText !== undefined ? el.innerText : el.textContent) || '';
+    }
+    function compileFilter(filter) {
+        switch (filter[0]) {
+            case 'visible':
+                return isVisible;
+            case 'text_contains':
+                return function (el) { return textOf(el).indexOf(filter[1]) !== -1; };
+            case 'text_regex':
+                var regex = new RegExp(filter[1], filter[2]);
+                return function (el) { return regex.test(textOf(el)); };
+            case 'class':
+                return function (el) {
+                    return filter[1].every(function (name) { return el.classList.contains(name); });
+                };
+            case 'attr':
+                return function (el) {
+                    var value = el.getAttribute(filter[1]);
+                    if (value === null) { return false; }
+                    if (filter[2] !== null && value !== filter[2]) { return false; }
+                    return filter[3] === null || value.indexOf(filter[3]) !== -1;
+                };
+        }
+        throw new Error('Unknown filter of SeElementsArray: ' + filter[0]);
+    }
+    function compileFilters(filters) {
+        var predicates = (filters || []).map(compileFilter);
+        return function (el) {
+            for (var i = 0; i < predicates.length; i++) {
+                if (!predicates[i](el)) { return false; }
+            }
+            return true;
+        };
+    }
+"""
+
+# function itemIdentity(el): FNV-1a hash of the whitespace-normalized text content of an item of SeElementsArray,
+# to tell whether an item found again at the same index is the same one, a few characters per item to transfer
+ITEM_IDENTITY_JS = """
+    function itemIdentity(el) {
+        if (!el) { return null; }
+        var text = el.textContent.replace(/[\\s\\u00a0]+/g, ' ').trim();
+        var hash = 0x811c9dc5;
+        for (var i = 0; i < text.length; i++) {
+            hash ^= text.charCodeAt(i);
+            hash = Math.imul(hash, 0x01000193) >>> 0;
+        }
+        return hash.toString(16);
+    }
+"""
+
+# Query of SeElementsArray, where only the needed part of matches is transferred:
+# mode "count" returns [total, null, null], "index" returns [total, element or null, its identity],
+# "slice" returns [total, Array of elements, Array of their identities]. Filters are applied before counting.
+ARRAY_QUERY_SCRIPT = QUERY_ALL_JS + COMPILE_FILTERS_JS + ITEM_IDENTITY_JS + """
+    var locator = arguments[0], mode = arguments[1], start = arguments[2], stop = arguments[3];
+    var filters = arguments[4];
+    var nodes = queryAll(locator);
+    if (filters && filters.length) {
+        nodes = nodes.filter(compileFilters(filters));
+    }
+    var total = nodes.length;
+    if (mode === 'count') {
+        return [total, null, null];
+    }
+    if (mode === 'index') {
+        var index = start < 0 ? total + start : start;
+        var node = index >= 0 && index < total ? nodes[index] : null;
+        return [total, node, itemIdentity(node)];
+    }
+    var sliced = nodes.slice(start === null ? 0 : start, stop === null ? undefined : stop);
+    return [total, sliced, sliced.map(itemIdentity)];
+"""
+
+# function queryFirst(locator): the first element matched by the locator or null
+QUERY_FIRST_JS = TEXT_INDEX_JS + SHADOW_PATH_JS + """
+    function queryFirst(locator) {
+        if (locator[0] === 'text') { return queryText(locator)[0] || null; }
+        if (locator[0] === 'shadow') { return queryShadow(locator[1])[0] || null; }
+        if (locator[0] === 'xpath') {
+            return document.evaluate(locator[1], document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        return document.querySelector(locator[1]);
+    }
+"""
+
+# Lookup of several elements in one call, returns Array of elements, null for not found ones.
+QUERY_FIRST_BATCH_SCRIPT = QUERY_FIRST_JS + """
+    return arguments[0].map(queryFirst);
+"""
+
+# functions setValue(element, value) and readValue(element) of form controls,
+# `setValue` dispatches `input` and `change` events as if a user changed the value
+FORM_VALUES_JS = """
+    function isTypeable(el) {
+        var type = (el.type || '').toLowerCase();
+        return el.isContentEditable || el.tagName.toLowerCase() === 'textarea'
+            || (el.tagName.toLowerCase() === 'input' && ['checkbox', 'radio', 'file'].indexOf(type) === -1);
+    }
+    function setValue(el, value) {
+        var tag = el.tagName.toLowerCase(), type = (el.type || '').toLowerCase();
+        if (type === 'checkbox' || type === 'radio') {
+            el.checked = !!value;
+        } else if (tag === 'select') {
+            var expected = Array.isArray(value) ? value.map(String) : [String(value)];
+            Array.prototype.forEach.call(el.options, function (option) {
+                option.selected = expected.indexOf(option.value) !== -1 || expected.indexOf(option.text) !== -1;
+            });
+        } else if (el.isContentEditable) {
+            el.textContent = value;
+        } else {
+            // the native setter makes frameworks with tracked values, e.g. React, notice the change
+            var proto = tag === 'textarea' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+        }
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+    function readValue(el) {
+        var tag = el.tagName.toLowerCase(), type = (el.type || '').toLowerCase();
+        if (type === 'checkbox' || type === 'radio') { return el.checked; }
+        if (tag === 'select') {
+            return Array.prototype.filter.call(el.options, function (option) { return option.selected; })
+                .map(function (option) { return [option.value, option.text]; });
+        }
+        if (el.isContentEditable) { return el.textContent; }
+        return el.value;
+    }
+"""
+
+# Set values of all form controls, if all of them are present.
+# Returns [indexes of missing controls, [index, element] pairs to type into]: with `typeOnly`
+# the typeable controls are not set, but returned for typing with real keystrokes.
+FILL_FORM_SCRIPT = QUERY_FIRST_JS + FORM_VALUES_JS + """
+    var locators = arguments[0], values = arguments[1], typeOnly = arguments[2];
+    var elements = locators.map(queryFirst), missing = [], toType = [];
+    elements.forEach(function (el, index) { if (el === null) { missing.push(index); } });
+    if (missing.length) { return [missing, toType]; }
+    elements.forEach(function (el, index) {
+        if (typeOnly && isTypeable(el)) {
+            toType.push([index, el]);
+        } else {
+            setValue(el, values[index]);
+        }
+    });
+    return [missing, toType];
+"""
+
+# Values of form controls, null for missing ones.
+READ_FORM_SCRIPT = QUERY_FIRST_JS + FORM_VALUES_JS + """
+    return arguments[0].map(function (locator) {
+        var el = queryFirst(locator);
+        return el === null ? null : readValue(el);
+    });
+"""
+
+# Text and class conditions of Wait evaluated in the browser, instead of transferring the whole text every poll.
+# Arguments: element, kind ("exact", "contains", "similar" or "class"), expected value normalized by Wait,
+# max length of the diagnostic. Returns [is_true, null] or [false, truncated actual value].
+ELEMENT_PREDICATE_SCRIPT = """
+    var el = arguments[0], kind = arguments[1], expected = arguments[2], maxLength = arguments[3];
+    function visibleText(el) {
+        // WebElement.text of an element, which is not rendered, is empty
+        if (!el.getClientRects().length) { return ''; }
+        var text = el.innerText !== undefined ? el.innerText : el.textContent;
+        return (text || '').replace(/\\u00a0/g, ' ').trim();
+    }
+    var actual, isTrue;
+    if (kind === 'class') {
+        actual = el.getAttribute('class') || '';
+        isTrue = expected.every(function (name) { return el.classList.contains(name); });
+    } else {
+        actual = visibleText(el);
+        if (kind === 'exact') {
+            isTrue = actual === expected;
+        } else if (kind === 'contains') {
+            isTrue = actual.indexOf(expected) !== -1;
+        } else {
+            // expected is [text, lower case text, text without whitespace]
+            isTrue = actual === expected[0] || actual.toLowerCase() === expected[1]
+                || actual.replace(/\\s+/g, '') === expected[2];
+        }
+    }
+    if (isTrue) { return [true, null]; }
+    return [false, actual.length > maxLength ? actual.slice(0, maxLength) + '...' : actual];
+"""
+
+# Size of the viewport, returns [height, width].
+VIEWPORT_SIZE_SCRIPT = """
+    return [document.documentElement.clientHeight, document.documentElement.clientWidth];
+"""
+
+# Async readiness check of SeWebElement.smart_click: scrolls the element into view if its center is out of it,
+# and polls until the element is the hit target of its center for two polls in a row, or the time is out.
+# Arguments: element, timeout in ms. Passes [true, null, false], or [false, reason, true if covered] to the callback.
+CLICK_READY_SCRIPT = """
+    var el = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+    var end = Date.now() + timeoutMs, lastPoint = null, polls = 0;
+    function describe(node) {
+        var description = node.tagName.toLowerCase();
+        if (node.id) { description += '#' + node.id; }
+        if (typeof node.className === 'string' && node.className.trim()) {
+            description += '.' + node.className.trim().split(/\\s+/).join('.');
+        }
+        return description;
+    }
+    function center() {
+        var rects = el.getClientRects();
+        if (!rects.length || !rects[0].width || !rects[0].height) { return null; }
+        // the first box, an inline element may wrap into several lines
+        return [rects[0].left + rects[0].width / 2, rects[0].top + rects[0].height / 2];
+    }
+    function inViewport(point) {
+        var root = document.documentElement;
+        return point[0] >= 0 && point[1] >= 0 && point[0] < root.clientWidth && point[1] < root.clientHeight;
+    }
+    // [reason, covered] why the click would fail now, null if it would succeed
+    function check() {
+        if (!el.isConnected) { return ['the element is detached from the document', false]; }
+        if (el.disabled) { return ['the element is disabled', false]; }
+        var point = center();
+        if (point === null) { return ['the element is not rendered', false]; }
+        if (!inViewport(point)) {
+            el.scrollIntoView({block: 'center', inline: 'center', behavior: 'instant'});
+            point = center();
+            if (point === null || !inViewport(point)) { return ['the element is out of the viewport', false]; }
+        }
+        var moved = lastPoint === null || lastPoint[0] !== point[0] || lastPoint[1] !== point[1];
+        lastPoint = point;
+        var root = el.getRootNode();
+        var hit = (root.elementFromPoint ? root : document).elementFromPoint(point[0], point[1]);
+        if (hit !== el && !el.contains(hit)) {
+            return [hit ? 'other element would receive the click: ' + describe(hit) : 'nothing is at its center', true];
+        }
+        // an element in motion may be elsewhere by the time of the click
+        return moved ? ['the element is moving', false] : null;
+    }
+    function poll() {
+        var failure = check();
+        if (failure === null) { done([true, null, false]); return; }
+        // the second poll tells if the element is still, even without time left
+        if (Date.now() >= end && ++polls > 1) { done([false, failure[0], failure[1]]); return; }
+        setTimeout(poll, 30);
+    }
+    poll();
+"""
+
+# Batch of SeElementsArray.collect_until: elements rendered since the previous batch of the collector,
+# then the list is scrolled to render more. Items are deduplicated by key in the page, so recycled nodes
+# of virtualized lists are reported again only with new content.
+# Arguments: collector id, locator, filters, key attribute (null for the text), max text length, release.
+# Returns [Array of [key, text, element], true if the scroll position has changed], null after release.
+COLLECT_BATCH_SCRIPT = QUERY_ALL_JS + COMPILE_FILTERS_JS + """
+    var id = arguments[0], locator = arguments[1], filters = arguments[2], keyAttr = arguments[3];
+    var maxText = arguments[4], release = arguments[5];
+    var collectors = window.__selenKaaCollectors = window.__selenKaaCollectors || {};
+    if (release) {
+        delete collectors[id];
+        return null;
+    }
+    var seen = collectors[id] = collectors[id] || {};
+    var nodes = queryAll(locator);
+    if (filters && filters.length) {
+        nodes = nodes.filter(compileFilters(filters));
+    }
+    var items = [];
+    nodes.forEach(function (el) {
+        var text = textOf(el).replace(/\\u00a0/g, ' ').trim();
+        var key = (keyAttr && el.getAttribute(keyAttr)) || text;
+        if (Object.prototype.hasOwnProperty.call(seen, key)) { return; }
+        seen[key] = true;
+        items.push([key, text.length > maxText ? text.slice(0, maxText) : text, el]);
+    });
+    function scrollerOf(el) {
+        for (var node = el && el.parentElement; node; node = node.parentElement) {
+            var overflow = window.getComputedStyle(node).overflowY;
+            if ((overflow === 'auto' || overflow === 'scroll') && node.scrollHeight > node.clientHeight) {
+                return node;
+            }
+        }
+        return document.scrollingElement || document.documentElement;
+    }
+    var scroller = scrollerOf(nodes[nodes.length - 1]);
+    var before = scroller.scrollTop;
+    var viewport = scroller === document.scrollingElement ? window.innerHeight : scroller.clientHeight;
+    scroller.scrollTop = before + Math.max(Math.floor(viewport * 0.8), 1);
+    return [items, scroller.scrollTop !== before];
+"""
+
+# Elements matched by a locator, the helpers "queryAll" and "queryFirst" of the helper runtime.
+QUERY_ALL_SCRIPT = QUERY_ALL_JS + """
+    return queryAll(arguments[0]);
+"""
+QUERY_FIRST_SCRIPT = QUERY_FIRST_JS + """
+    return queryFirst(arguments[0]);
+"""
+
+# The first element matched by a locator among descendants of the element arguments[0], or null.
+QUERY_CHILD_SCRIPT = TEXT_INDEX_JS + SHADOW_PATH_JS + """
+    var root = arguments[0], locator = arguments[1];
+    if (locator[0] === 'text') {
+        return queryText(locator).filter(function (el) { return el !== root && root.contains(el); })[0] || null;
+    }
+    if (locator[0] === 'shadow') { return queryShadow(locator[1], root)[0] || null; }
+    if (locator[0] === 'xpath') {
+        return document.evaluate(locator[1], root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    return root.querySelector(locator[1]);
+"""
+
+# Installs `window.__selenKaaReadiness` counters of `selen_kaa.readiness` once per document.
+# Timers longer than `maxTimerMs` are not tracked, as they are usually pollers, not pending work.
+INSTRUMENT_JS = """
+(function () {
+    if (window.__selenKaaReadiness) { return; }
+    var state = window.__selenKaaReadiness = {
+        requests: 0, sockets: 0, timers: 0, lastActivity: Date.now(), maxTimerMs: 1000,
+        setTimeout: window.setTimeout
+    };
+    function started() { state.requests++; state.lastActivity = Date.now(); }
+    function finished() { state.requests = Math.max(0, state.requests - 1); state.lastActivity = Date.now(); }
+
+    if (window.fetch) {
+        var nativeFetch = window.fetch;
+        window.fetch = function () {
+            started();
+            try {
+                return nativeFetch.apply(this, arguments).then(
+                    function (response) { finished(); return response; },
+                    function (error) { finished(); throw error; });
+            } catch (error) { finished(); throw error; }
+        };
+    }
+
+    var nativeSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        started();
+        // loadend is fired after load, error, abort and timeout
+        this.addEventListener('loadend', finished, {once: true});
+        try { return nativeSend.apply(this, arguments); } catch (error) { finished(); throw error; }
+    };
+
+    if (window.WebSocket) {
+        var NativeWebSocket = window.WebSocket;
+        var TrackedWebSocket = function (url, protocols) {
+            var socket = protocols === undefined ? new NativeWebSocket(url) : new NativeWebSocket(url, protocols);
+            var settled = false;
+            state.sockets++;
+            state.lastActivity = Date.now();
+            function settle() {
+                if (settled) { return; }
+                settled = true;
+                state.sockets--;
+                state.lastActivity = Date.now();
+            }
+            ['open', 'error', 'close'].forEach(function (event) { socket.addEventListener(event, settle); });
+            return socket;
+        };
+        TrackedWebSocket.prototype = NativeWebSocket.prototype;
+        ['CONNECTING', 'OPEN', 'CLOSING', 'CLOSED'].forEach(function (key) {
+            TrackedWebSocket[key] = NativeWebSocket[key];
+        });
+        window.WebSocket = TrackedWebSocket;
+    }
+
+    var pendingTimers = {}, nativeClearTimeout = window.clearTimeout;
+    function settleTimer(id) {
+        if (pendingTimers[id]) { delete pendingTimers[id]; state.timers--; }
+    }
+    window.setTimeout = function (callback, delay) {
+        if (typeof callback !== 'function' || (delay || 0) > state.maxTimerMs) {
+            return state.setTimeout.apply(window, arguments);
+        }
+        var args = Array.prototype.slice.call(arguments, 2), id;
+        id = state.setTimeout.call(window, function () {
+            settleTimer(id);
+            return callback.apply(this, args);
+        }, delay);
+        pendingTimers[id] = true;
+        state.timers++;
+        return id;
+    };
+    window.clearTimeout = function (id) {
+        settleTimer(id);
+        return nativeClearTimeout.apply(window, arguments);
+    };
+})();
+"""
+
+# Resolves with null when the page is settled, or with the pending counters on timeout.
+WAIT_SETTLED_SCRIPT = INSTRUMENT_JS + """
+    var quietMs = arguments[0], timeoutMs = arguments[1], pageReady = arguments[2];
+    var done = arguments[arguments.length - 1];
+    var state = window.__selenKaaReadiness, start = Date.now();
+    function check() {
+        var now = Date.now();
+        var busy = state.requests + state.sockets + (pageReady ? state.timers : 0);
+        var loaded = !pageReady || document.readyState === 'complete';
+        if (loaded && busy === 0 && now - state.lastActivity >= quietMs) {
+            done(null);
+        } else if (now - start >= timeoutMs) {
+            done({requests: state.requests, sockets: state.sockets, timers: state.timers,
+                  readyState: document.readyState});
+        } else {
+            state.setTimeout.call(window, check, 50);
+        }
+    }
+    check();
+"""
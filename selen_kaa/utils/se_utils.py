@@ -1,11 +1,35 @@
+import weakref
 from re import match
+from math import floor
+from contextlib import contextmanager
+from typing import List, Optional, Sequence, Tuple
 
 from selenium.webdriver.common.by import By
+from selen_kaa import global_config
 from selen_kaa.utils import custom_types
+from selen_kaa.utils.xpath_to_css import xpath_to_css
 
 
 TimeoutType = custom_types.TimeoutType
 
+# locator strategy of text selectors, resolved by the text index in the browser:
+# `text=Save` for the exact own text, `text~=save` for a case insensitive substring, `text=/^Save \d+$/i` for a regex
+TEXT_LOCATOR = "selen-kaa text"
+_EXACT_TEXT_PREFIX = "text="
+_CONTAINS_TEXT_PREFIX = "text~="
+_TEXT_REGEX = r"^/(.*)/([ims]*)$"
+_UPPER_CASE = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# own text nodes of an element, which the XPath of a text selector joins
+XPATH_TEXT_NODES = 8
+
+# locator strategy of shadow DOM paths, css selectors of hosts and of the element, resolved in one script:
+# `app-shell >>> nav-bar >>> button.save`
+SHADOW_LOCATOR = "selen-kaa shadow path"
+_SHADOW_SEPARATOR = ">>>"
+
+# known script timeouts of webdrivers, to avoid reading it before every async script
+_script_timeouts: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
 
 def get_selector_type(selector: str):
     """ Checks if selector is css or xpath
@@ -21,6 +45,162 @@ def get_selector_type(selector: str):
     xpath
     >>>get_selector_type("/div")
     xpath
+    >>>get_selector_type("text~=save")
+    selen-kaa text
+    >>>get_selector_type("app-shell >>> button.save")
+    selen-kaa shadow path
     """
+    if selector.startswith((_EXACT_TEXT_PREFIX, _CONTAINS_TEXT_PREFIX)):
+        return TEXT_LOCATOR
+    if _SHADOW_SEPARATOR in selector:
+        return SHADOW_LOCATOR
     pattern_xpath = r"^(./)|^/"
     return By.XPATH if match(pattern_xpath, selector) else By.CSS_SELECTOR
+
+
+def parse_text_selector(selector: str) -> List[str]:
+    """Text selector as [mode, value, regex flags].
+    >>>parse_text_selector("text=/^Save \\d+$/i")
+    ['regex', '^Save \\d+$', 'i']
+    """
+    if selector.startswith(_CONTAINS_TEXT_PREFIX):
+        return ["contains", selector[len(_CONTAINS_TEXT_PREFIX):], ""]
+    if not selector.startswith(_EXACT_TEXT_PREFIX):
+        raise ValueError(f"Text selector should start with `text=` or `text~=`, got `{selector}`.")
+    value = selector[len(_EXACT_TEXT_PREFIX):]
+    regex = match(_TEXT_REGEX, value)
+    if regex:
+        return ["regex", regex.group(1), regex.group(2)]
+    return ["exact", " ".join(value.split()), ""]
+
+
+def parse_shadow_path(selector: str) -> List[str]:
+    """Css selectors of a shadow DOM path.
+    >>>parse_shadow_path("app-shell >>> nav-bar >>> button.save")
+    ['app-shell', 'nav-bar', 'button.save']
+    """
+    selectors = [part.strip() for part in selector.split(_SHADOW_SEPARATOR)]
+    if not all(selectors):
+        raise ValueError(f"Shadow DOM path `{selector}` has an empty selector.")
+    return selectors
+
+
+def _xpath_literal(value: str) -> str:
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = ", \"'\", ".join(f"'{part}'" for part in value.split("'"))
+    return f"concat({parts})"
+
+
+def text_selector_to_xpath(selector: str) -> str:
+    """XPath equivalent of a text selector for webdrivers without JavaScript.
+    The own text of an element is its text nodes joined and whitespace-normalized, as in the browser.
+    XPath 1.0 can't join a node-set, so only elements with up to XPATH_TEXT_NODES own text nodes are matched.
+    The case is folded for ASCII letters only.
+    """
+    mode, value, _ = parse_text_selector(selector)
+    if mode == "regex":
+        raise ValueError(f"Regular expression text selector `{selector}` can be resolved only by JavaScript.")
+    text_nodes = ", ".join(f"text()[{position}]" for position in range(1, XPATH_TEXT_NODES + 1))
+    own_text = f"normalize-space(translate(concat({text_nodes}), '\u00a0', ' '))"
+    if mode == "exact":
+        condition = f"{own_text}={_xpath_literal(value)}"
+    else:
+        condition = (f"contains(translate({own_text}, '{_UPPER_CASE}', '{_UPPER_CASE.lower()}'), "
+                     f"{_xpath_literal(value.lower())})")
+    return (f"//*[not(self::script or self::style or self::noscript or self::template)][not(ancestor::template)]"
+            f"[text()][not(text()[{XPATH_TEXT_NODES + 1}])][{condition}]")
+
+
+def to_fast_locator(locator_strategy: str, selector: str, element_context: bool = False) -> Tuple[str, str]:
+    """Locator to search an element with.
+    XPath is replaced by an equivalent CSS selector, if `global_config.TRANSLATE_XPATH_TO_CSS` is on
+    and the XPath can be translated safely. Text selectors are replaced by XPath.
+    :param element_context: the locator is used from an element, e.g. `WebElement.find_element()`:
+        text selectors match its descendants only, XPath is translated as `xpath_to_css()` does for an element.
+    """
+    if locator_strategy == TEXT_LOCATOR:
+        xpath = text_selector_to_xpath(selector)
+        return By.XPATH, f".{xpath}" if element_context else xpath
+    if locator_strategy == SHADOW_LOCATOR:
+        raise ValueError(f"Shadow DOM path `{selector}` can be resolved only by JavaScript.")
+    if locator_strategy == By.XPATH and global_config.TRANSLATE_XPATH_TO_CSS:
+        css_selector = xpath_to_css(selector, element_context)
+        if css_selector is not None:
+            return By.CSS_SELECTOR, css_selector
+    return locator_strategy, selector
+
+
+def to_js_locator(locator_strategy: str, selector: str) -> Optional[List[str]]:
+    """Locator for the scripts of `selen_kaa.utils.js_scripts`: ["css", value] or ["xpath", value].
+    Text selectors are ["text", mode, value, flags], shadow DOM paths are ["shadow", [css selectors]].
+    None if the locator strategy can't be evaluated in the browser, e.g. for Appium strategies.
+    """
+    if locator_strategy == TEXT_LOCATOR:
+        return ["text", *parse_text_selector(selector)]
+    if locator_strategy == SHADOW_LOCATOR:
+        return ["shadow", parse_shadow_path(selector)]
+    locator_strategy, selector = to_fast_locator(locator_strategy, selector)
+    if locator_strategy in (By.CSS_SELECTOR, By.TAG_NAME):
+        return ["css", selector]
+    if locator_strategy == By.XPATH:
+        return ["xpath", selector]
+    if locator_strategy == By.CLASS_NAME:
+        return ["css", f".{selector}"]
+    if locator_strategy in (By.ID, By.NAME):
+        escaped = selector.replace("\\", "\\\\").replace('"', '\\"')
+        return ["css", f'[{locator_strategy}="{escaped}"]']
+    return None
+
+
+def javascript_enabled(webdriver) -> bool:
+    """False for webdrivers, which can't execute scripts, e.g. `selen_kaa.static_driver.StaticWebDriver`."""
+    capabilities = getattr(webdriver, "capabilities", None)
+    return not isinstance(capabilities, dict) or capabilities.get("javascriptEnabled", True) is not False
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Percentile with a linear interpolation between the closest ranks.
+    >>>percentile([1, 2, 3, 4], 50)
+    2.5
+    """
+    if not values:
+        raise ValueError("Percentile of an empty sequence is undefined.")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = floor(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def remember_script_timeout(webdriver, seconds: Optional[float]):
+    """The script timeout of the session has been set, `script_timeout()` restores this value."""
+    try:
+        _script_timeouts[webdriver] = seconds
+    except TypeError:
+        # webdriver can't be weak referenced
+        pass
+
+
+@contextmanager
+def script_timeout(webdriver, seconds: float):
+    """Make sure `execute_async_script()` may run for `seconds`.
+    The script timeout of the session is raised only if it's shorter, and is restored afterwards.
+    The timeout of the session is read once per webdriver, set it with `SeWebDriver.set_script_timeout()`
+    or call `remember_script_timeout()` after setting it on the webdriver directly.
+    """
+    try:
+        current = _script_timeouts[webdriver]
+    except KeyError:
+        current = _script_timeouts[webdriver] = webdriver.timeouts.script
+    # None means no script timeout at all
+    if current is None or seconds <= current:
+        yield
+        return
+    webdriver.set_script_timeout(seconds)
+    try:
+        yield
+    finally:
+        webdriver.set_script_timeout(current)
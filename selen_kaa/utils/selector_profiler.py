@@ -0,0 +1,97 @@
+"""Profiling of selectors' lookup cost on the live page.
+Every selector is evaluated in the browser several times, XPath via `document.evaluate()`
+and its CSS translation via `querySelectorAll()`, so the round trip of WebDriver doesn't affect the timing.
+
+"""
+from typing import Iterable, List, NamedTuple, Optional
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from selen_kaa.utils.se_utils import get_selector_type
+from selen_kaa.utils.xpath_to_css import xpath_to_css
+
+
+PROFILE_SCRIPT = """
+    var selectors = arguments[0], repeat = arguments[1];
+    function measure(query) {
+        var count = 0, start = performance.now();
+        for (var i = 0; i < repeat; i++) { count = query(); }
+        return [(performance.now() - start) / repeat, count];
+    }
+    return selectors.map(function (pair) {
+        var xpath = pair[0], css = pair[1], result = [null, null, null, null];
+        try {
+            if (xpath !== null) {
+                var xpathRes = measure(function () {
+                    return document.evaluate(xpath, document, null,
+                        XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength;
+                });
+                result[0] = xpathRes[0]; result[1] = xpathRes[1];
+            }
+            if (css !== null) {
+                var cssRes = measure(function () { return document.querySelectorAll(css).length; });
+                result[2] = cssRes[0]; result[3] = cssRes[1];
+            }
+        } catch (e) {
+            // an invalid selector has no cost to report
+        }
+        return result;
+    });
+"""
+
+
+class SelectorCost(NamedTuple):
+    """Average lookup time of a selector in milliseconds and the number of matched elements."""
+    selector: str
+    css: Optional[str]
+    xpath_ms: Optional[float]
+    xpath_matches: Optional[int]
+    css_ms: Optional[float]
+    css_matches: Optional[int]
+
+    @property
+    def cost_ms(self) -> float:
+        """Cost of the selector as it's written."""
+        cost = self.xpath_ms if self.xpath_ms is not None else self.css_ms
+        return cost or 0.0
+
+    @property
+    def is_translation_safe(self) -> bool:
+        """False if CSS translation has matched a different number of elements on this page."""
+        return self.css is None or self.xpath_matches is None or self.xpath_matches == self.css_matches
+
+
+def profile_selectors(webdriver: WebDriver, selectors: Iterable[str], repeat: int = 10) -> List[SelectorCost]:
+    """Time every selector on the current page in one script call.
+    :param webdriver: WebDriver with the page to profile.
+    :param selectors: css selectors or xpaths.
+    :param repeat: how many times to evaluate every selector for the average.
+    :return: list of SelectorCost sorted from the most expensive one.
+    """
+    selectors = list(selectors)
+    pairs = []
+    for selector in selectors:
+        if get_selector_type(selector) == By.XPATH:
+            pairs.append([selector, xpath_to_css(selector)])
+        else:
+            pairs.append([None, selector])
+    timings = webdriver.execute_script(PROFILE_SCRIPT, pairs, repeat)
+    costs = [SelectorCost(selector, css, *timing)
+             for selector, (_, css), timing in zip(selectors, pairs, timings)]
+    return sorted(costs, key=lambda cost: cost.cost_ms, reverse=True)
+
+
+def format_report(costs: List[SelectorCost], top: int = 10) -> str:
+    """Human readable table of the most expensive selectors."""
+    lines = [f"{'cost, ms':>10} {'css, ms':>10} {'matches':>8}  selector"]
+    for cost in costs[:top]:
+        css_ms = f"{cost.css_ms:.3f}" if cost.css_ms is not None and cost.xpath_ms is not None else "-"
+        matches = cost.xpath_matches if cost.xpath_matches is not None else cost.css_matches
+        line = f"{cost.cost_ms:>10.3f} {css_ms:>10} {str(matches):>8}  {cost.selector}"
+        if cost.css is not None and cost.xpath_ms is not None:
+            line += f"\n{'':>32}-> {cost.css}"
+            if not cost.is_translation_safe:
+                line += " (matches differ, keep XPath)"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,234 @@
+"""Translation of the common XPath subset into an equivalent CSS selector.
+Browsers evaluate CSS selectors noticeably faster than XPath on large DOMs.
+Only the expressions, which have an exact CSS equivalent, are translated:
+descendant and child axes, tag names, `@attr`, `@attr='value'`, `contains(@attr, 'value')`,
+`starts-with(@attr, 'value')`, the class idiom with `normalize-space(@class)`, `not()`,
+positional predicates `[n]` and `[last()]`, and `|` unions.
+Relative paths `./a` and `.//a` become `:scope > a` and `:scope a`, which are equivalent only for lookups
+from an element: at the document level `:scope` is `<html>`, not the document. For the same reason absolute paths
+are not translated for lookups from an element, XPath searches the whole document from it, CSS only descendants.
+For everything else `xpath_to_css()` returns None, so the XPath should be used as is.
+
+"""
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+
+_NAME = r"[A-Za-z_][\w.-]*"
+_QUOTED = r"(?:'([^']*)'|\"([^\"]*)\")"
+_IDENT_PATTERN = re.compile(r"^-?[A-Za-z_][\w-]*$")
+_STEP_PATTERN = re.compile(rf"^(?:(child|descendant)::)?(\*|{_NAME})((?:\[.*\])*)$", re.DOTALL)
+_ATTR_EXISTS = re.compile(rf"^@({_NAME})$")
+_ATTR_EQUALS = re.compile(rf"^@({_NAME})\s*(!?=)\s*{_QUOTED}$")
+_ATTR_FUNC = re.compile(rf"^(contains|starts-with)\(\s*@({_NAME})\s*,\s*{_QUOTED}\s*\)$")
+_CLASS_IDIOM = re.compile(
+    rf"^contains\(\s*concat\(\s*{_QUOTED}\s*,\s*normalize-space\(\s*@class\s*\)\s*,\s*{_QUOTED}\s*\)\s*,"
+    rf"\s*{_QUOTED}\s*\)$"
+)
+_NOT = re.compile(r"^not\((.*)\)$", re.DOTALL)
+_POSITION = re.compile(r"^(?:position\(\)\s*=\s*)?(\d+)$")
+_LAST = re.compile(r"^last\(\)$")
+
+
+@lru_cache(maxsize=1024)
+def xpath_to_css(xpath: str, element_context: bool = False) -> Optional[str]:
+    """Translate XPath into an equivalent CSS selector, if it can be done safely.
+    >>>xpath_to_css("//div[@id='main']//a[contains(@href, '/img')]")
+    'div#main a[href*="/img"]'
+    >>>xpath_to_css("//div[text()='Some']")
+    None
+    :param element_context: the selector is used from an element, relative paths are translated only then,
+        absolute ones never.
+    """
+    paths = _split_top_level(xpath.strip(), "|")
+    css_paths = []
+    for path in paths:
+        css = _path_to_css(path.strip(), element_context)
+        if css is None:
+            return None
+        css_paths.append(css)
+    return ", ".join(css_paths)
+
+
+def _path_to_css(path: str, element_context: bool) -> Optional[str]:
+    is_absolute = False
+    if path.startswith("/") and element_context:
+        return None
+    if path.startswith("//"):
+        css_parts = []
+        rest = path[2:]
+        combinator = " "
+    elif path.startswith(".") and not element_context:
+        return None
+    elif path.startswith(".//"):
+        css_parts = [":scope"]
+        rest = path[3:]
+        combinator = " "
+    elif path.startswith("./"):
+        css_parts = [":scope"]
+        rest = path[2:]
+        combinator = " > "
+    elif path.startswith("/"):
+        css_parts = []
+        rest = path[1:]
+        combinator = ""
+        is_absolute = True
+    else:
+        return None
+
+    steps = _split_top_level(rest, "/")
+    if not steps or not steps[-1]:
+        return None
+    for step in steps:
+        if step == "":
+            # an empty step is the second slash of `//`
+            if combinator != " > ":
+                return None
+            combinator = " "
+            continue
+        match = _STEP_PATTERN.match(step)
+        if match is None:
+            return None
+        axis, tag, predicates = match.groups()
+        if axis == "descendant":
+            if combinator == " > " and css_parts:
+                combinator = " "
+            elif combinator != " ":
+                return None
+        css_step = _step_to_css(tag, _split_predicates(predicates))
+        if css_step is None:
+            return None
+        if is_absolute:
+            # the first step of an absolute path matches the root element only
+            css_step += ":root"
+            is_absolute = False
+        if css_parts:
+            css_parts.append(combinator)
+        css_parts.append(css_step)
+        combinator = " > "
+    return "".join(css_parts)
+
+
+def _step_to_css(tag: str, predicates: List[str]) -> Optional[str]:
+    css = "" if tag == "*" else tag
+    pseudo_suffix = "child" if tag == "*" else "of-type"
+    for index, predicate in enumerate(predicates):
+        position = _POSITION.match(predicate)
+        if position or _LAST.match(predicate):
+            # position among siblings is equal to CSS only before any filtering predicate
+            if index != 0:
+                return None
+            css += f":nth-{pseudo_suffix}({position.group(1)})" if position else f":last-{pseudo_suffix}"
+            continue
+        for term in _split_top_level(predicate, " and "):
+            term_css = _term_to_css(term.strip())
+            if term_css is None:
+                return None
+            css += term_css
+    return css or "*"
+
+
+def _term_to_css(term: str) -> Optional[str]:
+    while term.startswith("(") and term.endswith(")") and _split_top_level(term[1:-1], ")") == [term[1:-1]]:
+        term = term[1:-1].strip()
+
+    match = _ATTR_EXISTS.match(term)
+    if match:
+        return _attr_selector(match.group(1))
+
+    match = _ATTR_EQUALS.match(term)
+    if match:
+        name, operator, single, double = match.groups()
+        value = single if single is not None else double
+        if operator == "!=":
+            return f"{_attr_selector(name)}:not({_attr_selector(name, '=', value)})"
+        if name == "id" and _IDENT_PATTERN.match(value):
+            return f"#{value}"
+        return _attr_selector(name, "=", value)
+
+    match = _CLASS_IDIOM.match(term)
+    if match:
+        prefix, suffix, expected = [next(val for val in pair if val is not None)
+                                    for pair in zip(match.groups()[::2], match.groups()[1::2])]
+        class_name = expected.strip()
+        if prefix != " " or suffix != " " or expected != f" {class_name} " or not class_name \
+                or " " in class_name:
+            return None
+        if _IDENT_PATTERN.match(class_name):
+            return f".{class_name}"
+        return _attr_selector("class", "~=", class_name)
+
+    match = _ATTR_FUNC.match(term)
+    if match:
+        func, name, single, double = match.groups()
+        value = single if single is not None else double
+        if value == "":
+            # contains(@a, '') and starts-with(@a, '') are True for any present attribute
+            return _attr_selector(name)
+        return _attr_selector(name, "*=" if func == "contains" else "^=", value)
+
+    match = _NOT.match(term)
+    if match and _split_top_level(match.group(1), ")") == [match.group(1)]:
+        inner = _term_to_css(match.group(1).strip())
+        if inner is None:
+            return None
+        return f":not({inner})"
+    return None
+
+
+def _attr_selector(name: str, operator: str = "", value: Optional[str] = None) -> str:
+    if value is None:
+        return f"[{name}]"
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\a ")
+    return f'[{name}{operator}"{escaped}"]'
+
+
+def _split_predicates(predicates: str) -> List[str]:
+    result = []
+    depth = 0
+    quote = None
+    start = 0
+    for index, char in enumerate(predicates):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == "[":
+            if depth == 0:
+                start = index + 1
+            depth += 1
+        elif char == "]":
+            depth -= 1
+            if depth == 0:
+                result.append(predicates[start:index].strip())
+    return result
+
+
+def _split_top_level(expression: str, separator: str) -> List[str]:
+    """Split the expression by a separator, which is not inside of quotes, brackets or parentheses."""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    index = 0
+    while index < len(expression):
+        char = expression[index]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char in "[(":
+            depth += 1
+        elif char in "])" and depth > 0:
+            depth -= 1
+        elif depth == 0 and expression.startswith(separator, index):
+            parts.append(expression[start:index])
+            index += len(separator)
+            start = index
+            continue
+        index += 1
+    parts.append(expression[start:])
+    return parts
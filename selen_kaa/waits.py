@@ -1,48 +1,133 @@
 import time
-from typing import Callable
+import weakref
+from typing import Callable, Optional, Union
 
 from selenium.webdriver.support import wait
 from selenium.webdriver.support import expected_conditions as ec
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import (NoSuchElementException, TimeoutException, StaleElementReferenceException,
+                                        WebDriverException)
 
+from selen_kaa import locators
 from selen_kaa.errors import TIMEOUT_BASE_ERR_MSG
+from selen_kaa.deadline import Deadline, remaining
+from selen_kaa.helper_runtime import HelperRuntime
 from selen_kaa.utils import se_utils
 from selen_kaa.utils import custom_types
+from selen_kaa.utils import file_watch
 from selen_kaa.utils.custom_funcs import single_dispatch
+from selen_kaa.element.se_element_interface import SeElementInterface
 
 
-TimeoutType = custom_types.TimeoutType
+# a number of seconds, or a Deadline shared by the nested steps of a wait
+TimeoutType = Union[custom_types.TimeoutType, Deadline]
 ElementType = custom_types.ElementType
 
 
+class ElementPredicate:
+    """Text or class condition of an element, evaluated in the browser.
+    Every poll transfers a boolean and, if false, the actual value truncated to DIAGNOSTIC_LENGTH.
+    Normalizations of the expected value are computed once, for the browser and for the Python fallback,
+    which is used by webdrivers without JavaScript.
+    """
+
+    DIAGNOSTIC_LENGTH = 200
+
+    EXACT = "exact"
+    CONTAINS = "contains"
+    SIMILAR = "similar"
+    CLASS = "class"
+
+    __slots__ = ("kind", "expected", "_js_expected", "_in_browser", "actual")
+
+    def __init__(self, kind: str, expected: str):
+        self.kind = kind
+        self.expected = expected
+        if kind == self.SIMILAR:
+            self._js_expected = [expected, expected.lower(), "".join(expected.split())]
+        elif kind == self.CLASS:
+            self._js_expected = expected.split()
+        else:
+            self._js_expected = expected
+        self._in_browser: Optional[bool] = None
+        # truncated actual value of the last poll, for the error message
+        self.actual: Optional[str] = None
+
+    def __call__(self, webdriver: WebDriver, web_element: WebElement) -> bool:
+        if self._in_browser is None:
+            self._in_browser = se_utils.javascript_enabled(webdriver)
+        if self._in_browser:
+            try:
+                is_true, self.actual = HelperRuntime.shared(webdriver).call(
+                    "elementPredicate", web_element, self.kind, self._js_expected, self.DIAGNOSTIC_LENGTH)
+                return is_true
+            except StaleElementReferenceException:
+                raise
+            except WebDriverException:
+                # no JavaScript in the context, e.g. a native context of Appium
+                self._in_browser = False
+        actual = (web_element.get_attribute("class") or "") if self.kind == self.CLASS else web_element.text
+        is_true = self._matches(actual)
+        self.actual = None if is_true else self._truncate(actual)
+        return is_true
+
+    def _matches(self, actual: str) -> bool:
+        if self.kind == self.EXACT:
+            return actual == self.expected
+        if self.kind == self.CONTAINS:
+            return self.expected in actual
+        if self.kind == self.CLASS:
+            return set(self._js_expected).issubset(actual.split())
+        text, lower_text, squeezed_text = self._js_expected
+        return actual == text or actual.lower() == lower_text or "".join(actual.split()) == squeezed_text
+
+    def _truncate(self, actual: str) -> str:
+        return actual if len(actual) <= self.DIAGNOSTIC_LENGTH else actual[:self.DIAGNOSTIC_LENGTH] + "..."
+
+
 class Wait:
 
     DEFAULT_TIMEOUT = 4
     PULL_FREQUENCY = 0.2
 
+    __slots__ = ("_webdriver", "__weakref__")
+    _shared: "weakref.WeakKeyDictionary[WebDriver, Wait]" = weakref.WeakKeyDictionary()
+
     def __init__(self, webdriver: WebDriver):
         self._webdriver: WebDriver = webdriver
 
+    @classmethod
+    def shared(cls, webdriver: WebDriver) -> "Wait":
+        """Wait has no state besides the webdriver, so one instance per webdriver is enough."""
+        try:
+            return cls._shared[webdriver]
+        except KeyError:
+            wait_ = cls._shared[webdriver] = cls(webdriver)
+            return wait_
+        except TypeError:
+            # webdriver can't be weak referenced, e.g. None in unit tests
+            return cls(webdriver)
+
     def element_be_in_dom(self, selector: str, timeout: TimeoutType = DEFAULT_TIMEOUT):
         if not isinstance(selector, str):
             raise TypeError("Selector should be a string for `element_be_in_dom()` method.")
-        return self._set_condition_for_wait(selector, ec.presence_of_element_located, timeout)
+        return self._set_condition_for_wait(selector, locators.element_located, timeout)
 
     @single_dispatch
     def element_to_be_visible(self, target: ElementType, timeout: TimeoutType = DEFAULT_TIMEOUT):
+        deadline = Deadline.of(timeout)
 
         def wrapped_visible():
-            target.get_web_element_by_timeout(timeout)
+            target.get_web_element_by_timeout(deadline)
             return target if target.is_displayed() else False
 
-        return self.wait_fluently(wrapped_visible, timeout,
+        return self.wait_fluently(wrapped_visible, deadline,
                                   TIMEOUT_BASE_ERR_MSG.format(timeout, target.selector, "be visible"))
 
     @element_to_be_visible.register(str)
     def __element_to_be_visible_str(self, target: str, timeout=DEFAULT_TIMEOUT):
-        return self._set_condition_for_wait(target, ec.visibility_of_element_located, timeout)
+        return self._set_condition_for_wait(target, locators.element_visible, timeout)
 
     @element_to_be_visible.register(WebElement)
     def __element_to_be_visible_we(self, target: WebElement, timeout=DEFAULT_TIMEOUT):
@@ -54,11 +139,12 @@ class Wait:
         Difference from `element_not_present`: returns True if element is not visible,
         but it's still present in DOM.
         """
+        deadline = Deadline.of(timeout)
 
         def wrapped_webelement_disappears():
             try:
                 # init web_element within wait's timeout, not web_element's
-                target.get_web_element_by_timeout(self.PULL_FREQUENCY)
+                target.get_web_element_by_timeout(min(self.PULL_FREQUENCY, deadline.remaining()))
                 if target.web_element.is_displayed():
                     return False
                 # return True if element is not stale and is not displayed
@@ -66,12 +152,12 @@ class Wait:
             except (NoSuchElementException, StaleElementReferenceException):
                 return target
 
-        return self.wait_fluently(wrapped_webelement_disappears, timeout,
+        return self.wait_fluently(wrapped_webelement_disappears, deadline,
                                   TIMEOUT_BASE_ERR_MSG.format(timeout, target.selector, "disappear"))
 
     @element_to_be_invisible.register(str)
     def __element_to_be_invisible_str(self, target: str, timeout):
-        return self._set_condition_for_wait(target, ec.invisibility_of_element_located, timeout)
+        return self._set_condition_for_wait(target, locators.element_invisible, timeout)
 
     @element_to_be_invisible.register(WebElement)
     def __element_to_be_invisible_we(self, target: WebElement, timeout):
@@ -82,10 +168,11 @@ class Wait:
         """True if there is no NoSuchElementException or StaleElementReferenceException.
         Element should be neither visible, nor enabled, nor be present in DOM.
         """
+        deadline = Deadline.of(timeout)
 
         def no_wrapped_webelement_in_dom():
             try:
-                target.get_web_element_by_timeout(self.PULL_FREQUENCY)
+                target.get_web_element_by_timeout(min(self.PULL_FREQUENCY, deadline.remaining()))
                 if target.web_element.is_enabled():
                     return False
                 # return False even element isn't enabled, but still present
@@ -93,12 +180,12 @@ class Wait:
             except (NoSuchElementException, StaleElementReferenceException):
                 return target
 
-        return self.wait_fluently(no_wrapped_webelement_in_dom, timeout,
+        return self.wait_fluently(no_wrapped_webelement_in_dom, deadline,
                                   TIMEOUT_BASE_ERR_MSG.format(timeout, target.selector, "not be present in DOM"))
 
     @element_not_present.register(str)
     def __element_not_present_str(self, target: str, timeout: TimeoutType = DEFAULT_TIMEOUT):
-        return self._set_condition_for_wait(target, ec.invisibility_of_element_located, timeout)
+        return self._set_condition_for_wait(target, locators.element_invisible, timeout)
 
     @element_not_present.register(WebElement)
     def __element_not_present_we(self, target: WebElement, timeout: TimeoutType = DEFAULT_TIMEOUT):
@@ -111,30 +198,32 @@ class Wait:
         True for `in` comparision, e.g. "test" in "some test here".
         """
 
-        def has_text_in_target():
-            target.get_web_element_by_timeout(timeout)
-            return target if text in target.text else False
+        predicate = ElementPredicate(ElementPredicate.CONTAINS, text)
+        deadline = Deadline.of(timeout)
 
-        err_msg = f"TimeoutException while waited {timeout} for the element {target.selector} to contain text '{text}'. " \
-                  f"Actual text '{target.text}'"
+        def has_text_in_target():
+            return target if self._evaluate(predicate, target, deadline) else False
 
-        return self.wait_fluently(has_text_in_target, timeout, err_msg)
+        return self.wait_fluently(has_text_in_target, deadline,
+                                  lambda: f"TimeoutException while waited {timeout} for the element {target.selector} "
+                                          f"to contain text '{text}'. Actual text '{predicate.actual}'")
 
     @element_to_contain_text.register(str)
     def __element_to_contain_text_str(self, target: str, text: str, timeout: TimeoutType = DEFAULT_TIMEOUT):
-        return self._wait_until(ec.text_to_be_present_in_element((se_utils.get_selector_type(target), target), text),
-                                timeout)
+        condition = locators.text_in_element(se_utils.get_selector_type(target), target, text)
+        return self._wait_until(condition, timeout)
 
     @element_to_contain_text.register(WebElement)
     def __element_to_contain_text_we(self, target: WebElement, text: str, timeout: TimeoutType = DEFAULT_TIMEOUT):
 
-        def has_text_in_target():
-            return target if text in target.text else False
+        predicate = ElementPredicate(ElementPredicate.CONTAINS, text)
 
-        err_msg = f"TimeoutException while waited {timeout} for the element to contain text '{text}'. " \
-                  f"Actual text '{target.text}'"
+        def has_text_in_target():
+            return target if predicate(self._webdriver, target) else False
 
-        return self.wait_fluently(has_text_in_target, timeout, err_msg),
+        return self.wait_fluently(has_text_in_target, timeout,
+                                  lambda: f"TimeoutException while waited {timeout} for the element "
+                                          f"to contain text '{text}'. Actual text '{predicate.actual}'")
 
 
     @single_dispatch
@@ -143,29 +232,32 @@ class Wait:
         True for exact comparision of expected text with actual text attribute of web element.
         """
 
-        def has_exact_text_in_target():
-            target.get_web_element_by_timeout(timeout)
-            return target if text == target.text else False
+        predicate = ElementPredicate(ElementPredicate.EXACT, text)
+        deadline = Deadline.of(timeout)
 
-        err_msg = f"TimeoutException while waited {timeout} for the element {target.selector} " \
-                  f"to have exact text '{text}'. Actual text '{target.text}'"
+        def has_exact_text_in_target():
+            return target if self._evaluate(predicate, target, deadline) else False
 
-        return self.wait_fluently(has_exact_text_in_target, timeout, err_msg)
+        return self.wait_fluently(has_exact_text_in_target, deadline,
+                                  lambda: f"TimeoutException while waited {timeout} for the element {target.selector} "
+                                          f"to have exact text '{text}'. Actual text '{predicate.actual}'")
 
     @element_to_have_exact_text.register(str)
     def __element_to_have_exact_text_str(self, target: str, text: str, timeout=DEFAULT_TIMEOUT):
-        return self._wait_until(ec.text_to_be_present_in_element((se_utils.get_selector_type(target), target), text),
-                                timeout)
+        condition = locators.text_in_element(se_utils.get_selector_type(target), target, text)
+        return self._wait_until(condition, timeout)
 
     @element_to_have_exact_text.register(WebElement)
     def __element_to_have_exact_text_we(self, target: WebElement, text: str, timeout=DEFAULT_TIMEOUT):
 
+        predicate = ElementPredicate(ElementPredicate.EXACT, text)
+
         def has_exact_text_in_target():
-            return target if text == target.text else False
+            return target if predicate(self._webdriver, target) else False
 
-        err_msg = f"TimeoutException while waited {timeout} for the element to have exact text '{text}'." \
-                  f" Actual text '{target.text}'"
-        return self.wait_fluently(has_exact_text_in_target, timeout, err_msg),
+        return self.wait_fluently(has_exact_text_in_target, timeout,
+                                  lambda: f"TimeoutException while waited {timeout} for the element "
+                                          f"to have exact text '{text}'. Actual text '{predicate.actual}'")
 
     @single_dispatch
     def element_have_similar_text(self, target: ElementType, text: str, timeout: TimeoutType = DEFAULT_TIMEOUT):
@@ -174,35 +266,26 @@ class Wait:
         This method is different from `wait_element_to_contain_text`,
         as it ignores whitespaces, newtabs, cases for similarity comparision.
         """
-        target.get_web_element_by_timeout(timeout)
+        deadline = Deadline.of(timeout)
+        target.get_web_element_by_timeout(deadline)
         element = target
-        return self._element_have_similar_text_helper(element, text, timeout)
+        return self._element_have_similar_text_helper(element, text, deadline)
 
     def _element_have_similar_text_helper(self, element, text, timeout):
-        text_ = None
+        predicate = ElementPredicate(ElementPredicate.SIMILAR, text)
+        deadline = Deadline.of(timeout)
 
         def get_text_in_element():
             """Func to check if element contains similar text."""
-            nonlocal text_
-            if text_ is None:
-                text_ = element.text
-            element_text = element.text
-            if element_text == text:
-                return element
-            if text.lower() == element_text.lower():
-                return element
-            if "".join(text.split()) == "".join(element_text.split()):
-                return element
-            return False
+            return element if self._evaluate(predicate, element, deadline) else False
 
-        return self.wait_fluently(get_text_in_element, timeout,
-                                  f"TimeoutException while waited {timeout} for text '{text}'. "
-                                  f"Actual text is '{text_}'")
+        return self.wait_fluently(get_text_in_element, deadline,
+                                  lambda: f"TimeoutException while waited {timeout} for text '{text}'. "
+                                          f"Actual text is '{predicate.actual}'")
 
     @element_have_similar_text.register(str)
     def __element_have_similar_text_str(self, target: str, text: str, timeout=DEFAULT_TIMEOUT):
-        selector_type = se_utils.get_selector_type(target)
-        element = self._webdriver.find_element(by=selector_type, value=target)
+        element = locators.find_element(self._webdriver, se_utils.get_selector_type(target), target)
         return self._element_have_similar_text_helper(element, text, timeout)
 
     @element_have_similar_text.register(WebElement)
@@ -212,39 +295,39 @@ class Wait:
     @single_dispatch
     def element_to_get_class(self, target: ElementType, expected_class: str, timeout: TimeoutType = DEFAULT_TIMEOUT):
         """Wait until web element gets expected class."""
-        target.get_web_element_by_timeout(timeout)
+        deadline = Deadline.of(timeout)
+        target.get_web_element_by_timeout(deadline)
         element = target
-        return self._wait_element_to_get_class(element, expected_class, timeout)
+        return self._wait_element_to_get_class(element, expected_class, deadline)
 
     def _wait_element_to_get_class(self, element, expected_class, timeout):
-        class_not_expected = None
+        predicate = ElementPredicate(ElementPredicate.CLASS, expected_class)
+        deadline = Deadline.of(timeout)
 
         def check_class_in_element():
-            """Func to check if class is present in element.
-            Driver is passed by Selenium wait() method.
-            """
-            nonlocal class_not_expected
-            result = []
-            expected_class_ls = expected_class.split(" ")
-            actual_class = element.get_attribute("class")
-            for class_ in expected_class_ls:
-                for element_class_ in actual_class.split(" "):
-                    if element_class_ == class_:
-                        result.append(element)
-            if len(result) == len(expected_class_ls):
-                return element
-            if class_not_expected is None:
-                class_not_expected = actual_class
-            return False
+            """Func to check if class is present in element."""
+            return element if self._evaluate(predicate, element, deadline) else False
 
-        return self.wait_fluently(check_class_in_element, timeout,
-                                  f"TimeoutException while waited  {timeout} for class '{expected_class}'. "
-                                  f"Actual class is '{class_not_expected}'.")
+        return self.wait_fluently(check_class_in_element, deadline,
+                                  lambda: f"TimeoutException while waited  {timeout} for class '{expected_class}'. "
+                                          f"Actual class is '{predicate.actual}'.")
+
+    def _evaluate(self, predicate: "ElementPredicate", element, deadline: Deadline) -> bool:
+        """Predicate of the element, a stale web element of a wrapped element is found again,
+        e.g. an item of SeElementsArray after the list was re-rendered.
+        """
+        if isinstance(element, SeElementInterface):
+            return element._recovering_stale(lambda web_element: predicate(self._webdriver, web_element),
+                                             element.get_web_element_by_timeout(deadline), deadline)
+        return predicate(self._webdriver, element)
+
+    @staticmethod
+    def _web_element_of(element) -> WebElement:
+        return element.web_element if isinstance(element, SeElementInterface) else element
 
     @element_to_get_class.register(str)
     def __element_to_get_class_str(self, target: str, expected_class: str, timeout=DEFAULT_TIMEOUT):
-        selector_type = se_utils.get_selector_type(target)
-        element = self._webdriver.find_element(by=selector_type, value=target)
+        element = locators.find_element(self._webdriver, se_utils.get_selector_type(target), target)
         return self._wait_element_to_get_class(element, expected_class, timeout)
 
     @element_to_get_class.register(WebElement)
@@ -280,16 +363,19 @@ class Wait:
                                          child_css_selector,
                                          timeout: TimeoutType = DEFAULT_TIMEOUT):
         """Wait for a web element to have another web element as a child element."""
-        target.get_web_element_by_timeout(timeout)
+        deadline = Deadline.of(timeout)
+        target.get_web_element_by_timeout(deadline)
         webelement_ = target
-        return self._wait_child_element(webelement_, child_css_selector, timeout)
+        return self._wait_child_element(webelement_, child_css_selector, deadline)
 
 
     def _wait_child_element(self, parent, child_css_selector, timeout):
-        def nested(web_element):
+        locator_strategy = se_utils.get_selector_type(child_css_selector)
+
+        def nested(element):
             try:
-                return web_element.find_element(by=se_utils.get_selector_type(child_css_selector),
-                                                value=child_css_selector)
+                return locators.find_child_element(self._webdriver, self._web_element_of(element),
+                                                   locator_strategy, child_css_selector)
             except NoSuchElementException:
                 return False
 
@@ -303,7 +389,7 @@ class Wait:
                                                   child_css_selector,
                                                   timeout=DEFAULT_TIMEOUT):
         self.element_be_in_dom(target)
-        web_element_ = self._webdriver.find_element(by=se_utils.get_selector_type(target), value=target)
+        web_element_ = locators.find_element(self._webdriver, se_utils.get_selector_type(target), target)
         return self._wait_child_element(web_element_, child_css_selector, timeout)
 
     @element_to_include_child_element.register(WebElement)
@@ -313,14 +399,15 @@ class Wait:
     @single_dispatch
     def element_to_be_in_viewport(self, target: ElementType, timeout: TimeoutType = DEFAULT_TIMEOUT):
         """Wait until element gets into viewport's coordinates."""
-        target.get_web_element_by_timeout(timeout)
-        return self._wait_element_in_viewport(target, timeout)
+        deadline = Deadline.of(timeout)
+        target.get_web_element_by_timeout(deadline)
+        return self._wait_element_in_viewport(target, deadline)
 
     @element_to_be_in_viewport.register(str)
     def __element_to_be_in_viewport_str(self, target: str, timeout: TimeoutType = DEFAULT_TIMEOUT):
         """Wait until element gets into viewport's coordinates."""
         self.element_be_in_dom(target)
-        web_element_ = self._webdriver.find_element(by=se_utils.get_selector_type(target), value=target)
+        web_element_ = locators.find_element(self._webdriver, se_utils.get_selector_type(target), target)
         return self._wait_element_in_viewport(web_element_, timeout)
 
     @element_to_be_in_viewport.register(WebElement)
@@ -329,13 +416,7 @@ class Wait:
         return self._wait_element_in_viewport(target, timeout)
 
     def _wait_element_in_viewport(self, element, timeout):
-        find_viewport_pos_script = """
-              var height = document.documentElement.clientHeight;
-              var width = document.documentElement.clientWidth;
-              var arr = [height, width];
-              return arr;
-          """
-        rect_ = self._webdriver.execute_script(find_viewport_pos_script)
+        rect_ = HelperRuntime.shared(self._webdriver).call("viewportSize")
         height = rect_[0]
         width = rect_[1]
         web_element_ = element
@@ -359,9 +440,7 @@ class Wait:
         :param timeout: int
         :return: boolean
         """
-        if not timeout:
-            timeout = 0
-        return wait.WebDriverWait(self._webdriver, timeout).until(condition)
+        return wait.WebDriverWait(self._webdriver, remaining(timeout)).until(condition)
 
     def _wait_until_not(self, condition, timeout: TimeoutType = DEFAULT_TIMEOUT):
         """Wrapper method around Selenium WebDriverWait() with until_not().
@@ -369,32 +448,42 @@ class Wait:
         :param timeout: int
         :return: boolean
         """
-        if not timeout:
-            timeout = 0
-        return wait.WebDriverWait(self._webdriver, timeout).until_not(condition)
+        return wait.WebDriverWait(self._webdriver, remaining(timeout)).until_not(condition)
 
     def _set_condition_for_wait(self, selector, condition, timeout):
-        by_ = se_utils.get_selector_type(selector)
-        if not timeout:
-            timeout = 0
-        return self._wait_until(condition((by_, selector)), timeout)
+        """Wait for a condition of `selen_kaa.locators`, e.g. `locators.element_visible`, built for the selector."""
+        return self._wait_until(condition(se_utils.get_selector_type(selector), selector), timeout)
+
+    @staticmethod
+    def download_to_complete(directory: str, pattern: str = "*", timeout: TimeoutType = DEFAULT_TIMEOUT,
+                             since: Optional[float] = None) -> str:
+        """Wait for a downloaded file, which matches the pattern and has no partial file, e.g. `.crdownload`.
+        On Linux the directory is watched with inotify, elsewhere it's polled until the file size is stable.
+        >>>started = time.time()
+        >>>page.export_button.click()
+        >>>path = Wait.download_to_complete(download_dir, "report-*.csv", timeout=60, since=started)
+        :param directory: download directory of the browser.
+        :param pattern: glob pattern of the file name.
+        :param timeout: time to wait for the download.
+        :param since: ignore files modified before this time.
+        :return: path of the file, else raises TimeoutException.
+        """
+        return file_watch.wait_for_complete_file(directory, pattern, timeout, since)
 
     @staticmethod
-    def wait_fluently(condition: Callable, timeout: TimeoutType, err_msg: str):
+    def wait_fluently(condition: Callable, timeout: TimeoutType, err_msg: Union[str, Callable[[], str]]):
         """Custom wait for special cases where driver is not needed as arg for condition.
         :param condition: function to verify if Condition is True
-        :param timeout: time to wait for positive condition.
-        :param err_msg: error message
+        :param timeout: time to wait for positive condition, or the Deadline of an outer wait.
+        :param err_msg: error message, or a function building it after the timeout, e.g. from the last poll
         :return: element if condition is True, else raises TimeoutException
 
         """
-        if timeout is None:
-            timeout = 0
-        start_time = time.time()
+        deadline = Deadline.of(timeout)
         while True:
             res = condition()
             if res:
                 return res
-            if time.time() - start_time >= timeout:
-                raise TimeoutException(err_msg)
-            time.sleep(0.3)
+            if deadline.expired:
+                raise TimeoutException(err_msg() if callable(err_msg) else err_msg)
+            time.sleep(min(0.3, deadline.remaining()))
@@ -3,22 +3,53 @@
  Added some method for usability.
 
 """
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver import ActionChains
 
+from selen_kaa import forms
+from selen_kaa import state
+from selen_kaa.actions import ActionBatch
+from selen_kaa.deadline import budget
+from selen_kaa.dom_snapshot import DomSnapshot
+from selen_kaa.frames import FramePathType, FrameTracker, reset_to_top
+from selen_kaa.helper_runtime import HelperRuntime
+from selen_kaa.readiness import PageReadiness
+from selen_kaa.tabs import Tab, TabScheduler
+from selen_kaa.metrics import MetricsCollector
 from selen_kaa.global_config import DEFAULT_TIMEOUT
 from selen_kaa.utils import custom_types
+from selen_kaa.utils import se_utils
+from selen_kaa.utils import selector_profiler
+from selen_kaa.timing_stats import TimingStats
 from selen_kaa.element.se_web_element import SeWebElement
 from selen_kaa.element.se_elements_array import SeElementsArray
 
 
 TimeoutType = custom_types.TimeoutType
 
+# commands, after which the top document is selected
+_NAVIGATION_COMMANDS = frozenset(("back", "forward", "refresh"))
+
 
 class SeWebDriver:
 
-    def __init__(self, webdriver: WebDriver):
+    def __init__(self, webdriver: WebDriver, timing_stats: Optional[TimingStats] = None, tab: Optional[Tab] = None):
+        """
+        :param webdriver: Selenium or Appium WebDriver.
+        :param timing_stats: optional store of time-to-appear statistics,
+        if passed, elements without an explicit timeout get a timeout derived from it.
+        :param tab: tab of a browser, if the facade is created by `tabs`.
+        """
         self.webdriver: WebDriver = webdriver
+        self.timing_stats = timing_stats
+        self.tab = tab
+        self._tabs: Optional[TabScheduler] = None
+        # selectors of initialized elements, ordered, for `profile_selectors()`
+        self._used_selectors = {}
+        self._readiness: Optional[PageReadiness] = None
+        self._metrics = MetricsCollector()
 
     def __getattr__(self, attr):
         """Calls method or properties on self._webdriver.
@@ -32,6 +63,8 @@ class SeWebDriver:
             if callable(orig_attr):
                 def hooked(*args, **kwargs):
                     result = orig_attr(*args, **kwargs)
+                    if attr in _NAVIGATION_COMMANDS:
+                        reset_to_top(self.webdriver)
                     # prevent recursion
                     if result == self.webdriver:
                         return self
@@ -41,38 +74,220 @@ class SeWebDriver:
         except AttributeError as exc:
             raise AttributeError(f"WebDriver has no attribute {attr}.\n{exc}")
 
+    def get(self, url: str, collect_metrics: bool = False) -> Optional[Dict[str, float]]:
+        """Load a web page in the current browser session.
+        :param url: url to load.
+        :param collect_metrics: gather page performance metrics in one script after the load,
+        they are aggregated per url in `metrics()`.
+        :return: metrics of this load if collect_metrics, else None.
+        """
+        self.webdriver.get(url)
+        reset_to_top(self.webdriver)
+        if collect_metrics:
+            return self._metrics.collect(self.webdriver, url)
+        return None
+
+    def save_state(self, path: str, indexed_db: bool = False) -> state.BrowserState:
+        """Save cookies, localStorage and sessionStorage of the current origin to a gzipped JSON file.
+        >>>browser.save_state("state/admin.json.gz")
+        :param path: file of the state.
+        :param indexed_db: save IndexedDB databases of the origin too.
+        """
+        browser_state = state.capture(self.webdriver, indexed_db)
+        state.save(browser_state, path)
+        return browser_state
+
+    def load_state(self,
+                   path: str,
+                   ttl: Optional[float] = None,
+                   validate: Optional[Callable[[], bool]] = None,
+                   url: Optional[str] = None) -> bool:
+        """Restore a state saved by `save_state()`: open its page, restore it and reload the page.
+        >>>if not browser.load_state("state/admin.json.gz", ttl=3600, validate=lambda: page.avatar.expect.be_visible()):
+        ...    login_page.login("admin")
+        ...    browser.save_state("state/admin.json.gz")
+        :param path: file of the state.
+        :param ttl: maximum age of the state in seconds.
+        :param validate: function without arguments, checks that the restored session is still valid.
+        :param url: page to open instead of the saved one, of the same origin.
+        :return: False if there is no state, it's expired or invalid.
+        """
+        browser_state = state.load(path, ttl)
+        if browser_state is None:
+            return False
+        state.restore(self.webdriver, browser_state, url)
+        reset_to_top(self.webdriver)
+        return validate is None or bool(validate())
+
+    def metrics(self) -> MetricsCollector:
+        """Page performance metrics of `get(url, collect_metrics=True)` calls, aggregated per url.
+        Use `metrics().summary()` for percentiles and `metrics().to_json(path)` to export them.
+        """
+        return self._metrics
+
     @property
     def action_chains(self):
         return ActionChains(self.webdriver)
 
-    def init_web_element(self, selector: str, timeout: TimeoutType = None, locator_strategy=None) -> SeWebElement:
+    def batch_actions(self, timeout: TimeoutType = DEFAULT_TIMEOUT) -> ActionBatch:
+        """Builder of one W3C Actions payload, which accepts SeWebElements as targets.
+        All targets are resolved in one lookup, the actions are sent with one `perform()`.
+        >>>with browser.batch_actions() as batch:
+        ...    batch.hover(menu).click(menu_item)
+        >>>batch.timing
+        :param timeout: time to wait for all targets to be present.
+        """
+        return ActionBatch(self.webdriver, timeout)
+
+    def init_web_element(self,
+                         selector: str,
+                         timeout: TimeoutType = None,
+                         locator_strategy=None,
+                         page: Optional[str] = None,
+                         frame: FramePathType = None) -> SeWebElement:
         """Init a new WrappedWebElement.
         Lazy initialization. Element would be called on the time of first interaction.
         :param selector: str as any locator, css selector or xpath
         :param timeout: time to wait until element appears
         :param locator_strategy: field of class `selenium.webdriver.common.by::By` or `MobileBy` for Appium
+        :param page: key of the page for timing statistics,
+        the path of the current url at the time of every lookup if not passed
+        :param frame: selector of the iframe of the element, or selectors of nested iframes from the top,
+        e.g. ("#editor", "iframe.preview")
         :return: SeWebElement
         """
         if selector is None:
             raise Exception("Selector should be not empty.")
 
-        timeout_ = DEFAULT_TIMEOUT
-        if timeout or timeout == 0:
-            timeout_ = timeout
-        return SeWebElement(self.webdriver, selector, timeout_, locator_strategy)
+        self._used_selectors[selector] = None
+        if self.timing_stats is None:
+            timeout_ = DEFAULT_TIMEOUT
+            if timeout or timeout == 0:
+                timeout_ = timeout
+            return SeWebElement(self.webdriver, selector, timeout_, locator_strategy, frame=frame)
 
-    def init_all_web_elements(self, selector: str, timeout: TimeoutType = None, locator_strategy=None) -> SeElementsArray:
+        # without a timeout, the element derives it from the statistics of the page at the time of a lookup
+        timeout_ = timeout if timeout or timeout == 0 else None
+        return SeWebElement(self.webdriver, selector, timeout_, locator_strategy,
+                            timing_stats=self.timing_stats, page=page, frame=frame)
+
+    def init_all_web_elements(self, selector: str, timeout: TimeoutType = None, locator_strategy=None,
+                              frame: FramePathType = None) -> SeElementsArray:
         """Init a list with references to WrappedWebElement.
         Lazy initialization. All elements would be called on the time of first interaction
         with any of the elements.
         :param selector: str as any locator, css selector or xpath
         :param timeout: time to wait until element appears
         :param locator_strategy: field of class `selenium.webdriver.common.by::By` or `MobileBy` for Appium
+        :param frame: selector of the iframe of the elements, or selectors of nested iframes from the top
         :return: List of SeWebElement
         """
+        self._used_selectors[selector] = None
         timeout_ = DEFAULT_TIMEOUT
         if timeout or timeout == 0:
             timeout_ = timeout
-        arr = SeElementsArray(self.webdriver, selector, timeout_, locator_strategy)
+        arr = SeElementsArray(self.webdriver, selector, timeout_, locator_strategy, frame)
         arr.element_type = SeWebElement
         return arr
+
+    def profile_selectors(self,
+                          selectors: Optional[Iterable[str]] = None,
+                          repeat: int = 10) -> List[selector_profiler.SelectorCost]:
+        """Time XPath and its CSS translation on the current page, in the browser.
+        :param selectors: selectors to profile, all selectors of initialized elements if not passed.
+        :param repeat: how many times to evaluate every selector for the average.
+        :return: list of SelectorCost sorted from the most expensive one,
+        use `selector_profiler.format_report()` to print it.
+        """
+        selectors_ = selectors if selectors is not None else self._used_selectors
+        return selector_profiler.profile_selectors(self.webdriver, selectors_, repeat)
+
+    def fill_form(self,
+                  values: Dict[str, Any],
+                  mode: str = forms.FILL_BY_SCRIPT,
+                  verify: bool = True,
+                  timeout: TimeoutType = DEFAULT_TIMEOUT) -> Optional[Dict[str, Any]]:
+        """Fill a form in a minimal number of commands, see `selen_kaa.forms.fill_form()`.
+        :param values: {css selector or xpath: value}.
+        :param mode: `forms.FILL_BY_SCRIPT` sets all values in one script,
+        `forms.FILL_BY_KEYS` types into text fields with one W3C Actions sequence.
+        :param verify: read all values back in one call and raise ValueError on a mismatch.
+        :param timeout: time to wait for all controls to be present.
+        :return: {selector: actual value} if verify, else None.
+        """
+        return forms.fill_form(self.webdriver, values, mode, verify, timeout)
+
+    def dom_snapshot(self) -> DomSnapshot:
+        """Capture the rendered DOM with visibility flags in one script, for offline checks.
+        >>>snapshot = browser.dom_snapshot()
+        >>>snapshot.find(".title").should.have_exact_text("Selen-kaa")
+        Requires `pip install lxml cssselect`.
+        """
+        if not se_utils.javascript_enabled(self.webdriver):
+            # e.g. StaticWebDriver, no computed visibility, the page source is the DOM
+            return DomSnapshot(self.webdriver.page_source, self.webdriver.current_url, self.webdriver.title)
+        return DomSnapshot.from_webdriver(self.webdriver)
+
+    @property
+    def tabs(self) -> TabScheduler:
+        """Pool of tabs of this browser, every tab gets its own SeWebDriver facade.
+        >>>with browser.tabs.session() as tab:
+        ...    tab.get("https://some.com")
+        >>>browser.tabs.run([flow_1, flow_2], max_tabs=2)
+        """
+        if self._tabs is None:
+            self._tabs = TabScheduler(self.webdriver,
+                                      lambda tab: self.__class__(tab.webdriver, self.timing_stats, tab=tab))
+        return self._tabs
+
+    @property
+    def frames(self) -> FrameTracker:
+        """The selected frame, elements with a frame path switch to their frame only if another one is selected.
+        Call `browser.frames.invalidate()` after switching frames with `switch_to`.
+        """
+        return FrameTracker.shared(self.webdriver)
+
+    @property
+    def helpers(self) -> HelperRuntime:
+        """JavaScript helpers of selen-kaa, installed once per document and called by name.
+        >>>height, width = browser.helpers.call("viewportSize")
+        """
+        return HelperRuntime.shared(self.webdriver)
+
+    @property
+    def readiness(self) -> PageReadiness:
+        """In-page counters of pending requests and timers.
+        Call `browser.readiness.install()` before the first `get()` to track the first page load too.
+        """
+        if self._readiness is None:
+            self._readiness = PageReadiness(self.webdriver)
+        return self._readiness
+
+    def wait_network_idle(self, quiet_ms: int = 500, timeout: TimeoutType = DEFAULT_TIMEOUT):
+        """Wait until there are no pending fetch/XHR requests and opening WebSockets for `quiet_ms`.
+        :param quiet_ms: how long the network should stay idle, in milliseconds.
+        :param timeout: time to wait, raises TimeoutException with pending counters after it.
+        """
+        return self.readiness.wait_network_idle(quiet_ms, timeout)
+
+    def wait_page_ready(self, quiet_ms: int = 500, timeout: TimeoutType = DEFAULT_TIMEOUT):
+        """Wait until the document is loaded, the network is idle and no short timers are pending.
+        :param quiet_ms: how long the network should stay idle, in milliseconds.
+        :param timeout: time to wait, raises TimeoutException with pending counters after it.
+        """
+        return self.readiness.wait_page_ready(quiet_ms, timeout)
+
+    def set_script_timeout(self, time_to_wait: float):
+        """Set the script timeout of the session, the helpers, which raise it for a while, restore this value."""
+        self.webdriver.set_script_timeout(time_to_wait)
+        se_utils.remember_script_timeout(self.webdriver, time_to_wait)
+
+    def deadline(self, seconds: float):
+        """Time budget of a block, no wait inside of it waits longer than the rest of the budget.
+        >>>with browser.deadline(30):
+        ...    login_page.login()
+        ...    dashboard.title.should.be_visible(timeout=60)
+        :param seconds: time budget of the block.
+        :return: context manager yielding the Deadline of the budget.
+        """
+        return budget(seconds)
@@ -0,0 +1,23 @@
+from selen_kaa.element.se_web_element import SeWebElement
+
+from tests.webapp.pages import form_page
+
+
+def test_batch_actions_in_one_lookup(app):
+    page = app.goto_form_page()
+    with app.web_driver.batch_actions() as batch:
+        batch.type(page.first_name, "Viktor").type(form_page.LAST_NAME, "Kaa").click(page.agree)
+    assert batch.timing.actions == 5
+    assert batch.timing.lookup_calls == 1
+    assert batch.timing.total >= batch.timing.perform
+    assert page.first_name.get_attribute("value") == "Viktor"
+    assert page.last_name.get_attribute("value") == "Kaa"
+    assert page.agree.is_selected()
+
+
+def test_batch_actions_accept_array_elements(app):
+    index_page = app.goto_index_page()
+    element = index_page.the_same_text[2]
+    assert isinstance(element, SeWebElement)
+    timing = app.web_driver.batch_actions().hover(element).click(index_page.btn_show_div).perform()
+    assert timing.lookup_calls == 1
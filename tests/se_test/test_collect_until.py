@@ -0,0 +1,49 @@
+from selen_kaa.element.se_elements_array import CollectedItem
+
+# a virtualized list of 50 items, which renders 5 recycled nodes for the scroll position
+VIRTUAL_LIST_SCRIPT = """
+    var box = document.createElement('div');
+    box.id = 'virtual-list';
+    box.style.cssText = 'height: 100px; overflow-y: auto; position: relative';
+    var spacer = document.createElement('div');
+    spacer.style.height = '1000px';
+    box.appendChild(spacer);
+    var rows = [];
+    for (var i = 0; i < 5; i++) {
+        var row = document.createElement('div');
+        row.className = 'virtual-row';
+        row.style.cssText = 'position: absolute; height: 20px; left: 0';
+        box.appendChild(row);
+        rows.push(row);
+    }
+    function render() {
+        var first = Math.floor(box.scrollTop / 20);
+        rows.forEach(function (row, index) {
+            row.style.top = (first + index) * 20 + 'px';
+            row.setAttribute('data-id', String(first + index));
+            row.textContent = 'Item ' + (first + index);
+        });
+    }
+    box.addEventListener('scroll', render);
+    render();
+    document.body.insertBefore(box, document.body.firstChild);
+"""
+
+
+def test_collect_virtualized_list(app):
+    app.goto_index_page()
+    app.web_driver.execute_script(VIRTUAL_LIST_SCRIPT)
+    rows = app.web_driver.init_all_web_elements(".virtual-row")
+    items = list(rows.collect_until(count=50, key="data-id", timeout=20, scroll_pause=0.05))
+    assert all(isinstance(item, CollectedItem) for item in items)
+    assert sorted(int(item.key) for item in items) == list(range(50))
+    assert items[0].text == "Item 0"
+
+
+def test_collect_until_predicate(app):
+    app.goto_index_page()
+    app.web_driver.execute_script(VIRTUAL_LIST_SCRIPT)
+    rows = app.web_driver.init_all_web_elements(".virtual-row")
+    items = list(rows.collect_until(predicate=lambda item: item.text == "Item 12", timeout=20))
+    assert items[-1].text == "Item 12"
+    assert len(items) == 13
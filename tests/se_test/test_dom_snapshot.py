@@ -0,0 +1,24 @@
+import pytest
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
+
+from tests.webapp.pages.index_page import THE_SAME_CLASS, SHOW_DIV_BTN, TEST_DIV_VISIBILITY
+
+
+def test_dom_snapshot_conditions(app):
+    app.goto_index_page()
+    snapshot = app.web_driver.dom_snapshot()
+    same_text = snapshot.find_all(THE_SAME_CLASS)
+    assert len(same_text) == len(app.web_driver.find_elements(By.CSS_SELECTOR, THE_SAME_CLASS))
+    same_text[0].should.have_exact_text("Test the same 0")
+    snapshot.find(SHOW_DIV_BTN).should.be_visible()
+    snapshot.find(TEST_DIV_VISIBILITY).should.be_invisible()
+    snapshot.find(".no-such-class-for-no-element").should.not_present_in_dom()
+    with pytest.raises(TimeoutException):
+        snapshot.find(TEST_DIV_VISIBILITY).should.be_visible()
+
+
+def test_dom_snapshot_does_not_modify_page(app):
+    app.goto_index_page()
+    app.web_driver.dom_snapshot()
+    assert not app.web_driver.find_elements(By.CSS_SELECTOR, "[data-selen-kaa-visible]")
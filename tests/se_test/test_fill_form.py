@@ -0,0 +1,39 @@
+import pytest
+
+from selen_kaa.forms import FILL_BY_KEYS, FILL_BY_SCRIPT
+from tests.webapp.pages import form_page
+
+
+FORM_VALUES = {
+    form_page.FIRST_NAME: "Viktor",
+    form_page.LAST_NAME: "Kaa",
+    form_page.EMAIL: "kaa@example.com",
+    form_page.ABOUT: "Line 1",
+    form_page.AGREE: True,
+    form_page.COUNTRY: "Poland",
+}
+
+
+@pytest.mark.parametrize("mode", (FILL_BY_SCRIPT, FILL_BY_KEYS))
+def test_fill_form(app, mode):
+    page = app.goto_form_page()
+    actual = app.web_driver.fill_form(FORM_VALUES, mode=mode)
+    assert actual[form_page.FIRST_NAME] == "Viktor"
+    assert actual[form_page.AGREE] is True
+    assert actual[form_page.COUNTRY] == "pl"
+    page.submit.click()
+    assert page.submitted_values.filter_text(contains="last_name=Kaa").first_where() is not None
+
+
+def test_fill_form_replaces_old_value(app):
+    page = app.goto_form_page()
+    page.first_name.send_keys("old")
+    app.web_driver.fill_form({form_page.FIRST_NAME: "new"}, mode=FILL_BY_KEYS)
+    assert page.first_name.get_attribute("value") == "new"
+
+
+def test_fill_form_missing_control(app):
+    app.goto_form_page()
+    with pytest.raises(Exception) as exc:
+        app.web_driver.fill_form({"#no-such-input": "value"}, timeout=1)
+    assert "#no-such-input" in str(exc.value)
@@ -0,0 +1,29 @@
+FRAMES_SCRIPT = """
+    var outer = document.createElement('iframe');
+    outer.id = 'outer-frame';
+    outer.srcdoc = '<p class="title">Outer</p>'
+        + '<iframe id="inner-frame" srcdoc="<input id=&quot;name&quot;><p class=&quot;title&quot;>Inner</p>">'
+        + '</iframe>';
+    document.body.appendChild(outer);
+"""
+
+
+def test_frame_aware_elements(app):
+    app.goto_index_page()
+    browser = app.web_driver
+    browser.execute_script(FRAMES_SCRIPT)
+    outer_title = browser.init_web_element(".title", frame="#outer-frame")
+    inner_title = browser.init_web_element(".title", frame=("#outer-frame", "#inner-frame"))
+    name = browser.init_web_element("#name", frame=("#outer-frame", "#inner-frame"))
+    page_title = browser.init_web_element("#click-to-make-el-visible")
+
+    inner_title.should.have_exact_text("Inner")
+    switches = browser.frames.switches
+    name.send_keys("Kaa")
+    assert name.get_attribute("value") == "Kaa"
+    assert browser.frames.switches == switches
+    outer_title.should.have_exact_text("Outer")
+    assert browser.frames.switches == switches + 1
+    page_title.should.be_visible()
+    assert browser.frames.current == ()
+    assert len(browser.init_all_web_elements("p", frame=("#outer-frame", "#inner-frame"))) == 1
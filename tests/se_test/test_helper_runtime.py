@@ -0,0 +1,32 @@
+import pytest
+
+from selen_kaa import helper_runtime
+from selen_kaa.helper_runtime import HelperRuntime, register_helper
+
+
+@pytest.fixture
+def isolated_helpers(monkeypatch):
+    """Helpers registered by a test are gone after it, the library version of other tests stays the same."""
+    monkeypatch.setattr(helper_runtime, "_helpers", dict(helper_runtime._helpers))
+    monkeypatch.setattr(helper_runtime, "_library", None)
+
+
+def test_library_is_installed_once_per_document(app):
+    app.goto_index_page()
+    runtime = HelperRuntime(app.web_driver.webdriver)
+    height, width = runtime.call("viewportSize")
+    assert height > 0 and width > 0
+    runtime.call("viewportSize")
+    assert runtime.injections == 1
+    app.web_driver.refresh()
+    runtime.call("viewportSize")
+    assert runtime.injections == 2
+    assert runtime.calls == 3
+
+
+def test_registered_helper(app, isolated_helpers):
+    app.goto_index_page()
+    register_helper("selenKaaTestSum", "return arguments[0] + arguments[1];")
+    assert app.web_driver.helpers.call("selenKaaTestSum", 2, 3) == 5
+    elements = app.web_driver.helpers.call("queryFirstBatch", [["css", "#initial-stats"], ["css", "#no-such-element"]])
+    assert elements[0].tag_name and elements[1] is None
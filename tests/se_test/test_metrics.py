@@ -0,0 +1,15 @@
+from tests.webapp.setup import URL
+
+
+def test_get_collects_metrics(app):
+    for _ in range(2):
+        metrics = app.web_driver.get(URL, collect_metrics=True)
+        assert metrics["load_ms"] > 0
+        assert metrics["resource_count"] > 0
+    summary = app.web_driver.metrics().summary()
+    assert summary[URL]["load_ms"]["runs"] == 2
+
+
+def test_get_without_metrics(app):
+    assert app.web_driver.get(URL) is None
+    assert not app.web_driver.metrics().urls
@@ -0,0 +1,38 @@
+from selen_kaa.element.element_observer import ATTRIBUTES, CHILDREN, TEXT
+
+from tests.webapp.pages.index_page import TEST_DIV_VISIBILITY
+
+
+UPDATE_PROGRESS = """
+    var el = document.querySelector(arguments[0]);
+    el.style.display = 'block';
+    [25, 50, 75, 100].forEach(function (value, index) {
+        setTimeout(function () { el.textContent = value + '%'; }, 50 * (index + 1));
+    });
+"""
+
+
+def test_observe_text_changes(app):
+    index_page = app.goto_index_page()
+    with index_page.test_div.observe(attributes=False, children=False) as observer:
+        app.web_driver.execute_script(UPDATE_PROGRESS, TEST_DIV_VISIBILITY)
+        observer.wait_for(lambda change: change.value == "100%", timeout=4)
+    values = [change.value for change in observer.history if change.type == TEXT]
+    assert values[-4:] == ["25%", "50%", "75%", "100%"]
+
+
+def test_observe_attributes_and_children(app):
+    index_page = app.goto_index_page()
+    received = []
+    observer = index_page.test_div.observe(attributes=["class"], text=False, callback=received.append)
+    app.web_driver.execute_script("""
+        var el = document.querySelector(arguments[0]);
+        el.className = 'toast';
+        var child = document.createElement('span');
+        child.textContent = 'Saved';
+        el.appendChild(child);
+    """, TEST_DIV_VISIBILITY)
+    observer.stop()
+    assert [change.type for change in received] == [ATTRIBUTES, CHILDREN]
+    assert received[0].value == "toast"
+    assert received[1].added == ('span "Saved"',)
@@ -0,0 +1,43 @@
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+
+def test_wait_page_ready(app):
+    app.web_driver.readiness.install()
+    app.goto_index_page()
+    start_t = time.time()
+    assert app.web_driver.wait_page_ready(quiet_ms=200, timeout=5)
+    assert time.time() - start_t < 5
+
+
+def test_wait_network_idle_for_pending_request(app):
+    app.goto_index_page()
+    app.web_driver.readiness.install()
+    # the request is counted until it's finished
+    app.web_driver.execute_script("var xhr = new XMLHttpRequest(); xhr.open('GET', '/law'); xhr.send();")
+    assert app.web_driver.wait_network_idle(quiet_ms=100, timeout=5)
+
+
+def test_wait_network_idle_timeout(app):
+    app.goto_index_page()
+    app.web_driver.execute_script("setInterval(function () { fetch('/law'); }, 50);")
+    with pytest.raises(TimeoutException) as exc:
+        app.web_driver.wait_network_idle(quiet_ms=500, timeout=1)
+    assert "Pending requests" in exc.value.msg
+
+
+def test_wait_page_ready_timeout(app):
+    app.goto_index_page()
+    app.web_driver.execute_script("setInterval(function () { setTimeout(function () {}, 900); }, 50);")
+    with pytest.raises(TimeoutException) as exc:
+        app.web_driver.wait_page_ready(quiet_ms=200, timeout=1)
+    assert "to be ready" in exc.value.msg
+
+
+def test_script_timeout_set_by_user_is_kept(app):
+    app.goto_index_page()
+    app.web_driver.set_script_timeout(60)
+    app.web_driver.wait_network_idle(quiet_ms=100, timeout=70)
+    assert app.web_driver.timeouts.script == 60
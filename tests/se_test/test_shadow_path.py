@@ -0,0 +1,33 @@
+SHADOW_APP_SCRIPT = """
+    var shell = document.createElement('app-shell');
+    document.body.insertBefore(shell, document.body.firstChild);
+    var nav = document.createElement('nav-bar');
+    shell.attachShadow({mode: 'open'}).appendChild(nav);
+    var navRoot = nav.attachShadow({mode: 'open'});
+    navRoot.innerHTML = '<button class="save">Save</button><button class="save" hidden>Save all</button>';
+    setTimeout(function () { navRoot.querySelector('[hidden]').hidden = false; }, 500);
+"""
+
+
+def test_shadow_path_locators(app):
+    app.goto_index_page()
+    browser = app.web_driver
+    browser.execute_script(SHADOW_APP_SCRIPT)
+    save = browser.init_web_element("app-shell >>> nav-bar >>> button.save")
+    save.should.have_exact_text("Save")
+    save.should.be_visible()
+    assert save.tag_name == "button"
+    buttons = browser.init_all_web_elements("app-shell >>> nav-bar >>> button")
+    assert len(buttons) == 2
+    buttons[1].should.be_visible(timeout=2)
+    assert browser.init_web_element("app-shell >>> nav-bar >>> .no-such-class").expect.not_present_in_dom(timeout=0)
+
+
+def test_waits_for_shadow_paths(app):
+    app.goto_index_page()
+    browser = app.web_driver
+    browser.execute_script(SHADOW_APP_SCRIPT)
+    app.wait.element_be_in_dom("app-shell >>> nav-bar >>> button.save")
+    app.wait.element_to_be_visible("app-shell >>> nav-bar >>> button.save")
+    app.wait.element_to_have_exact_text("app-shell >>> nav-bar >>> button.save", "Save")
+    app.wait.element_to_include_child_element("body", "app-shell >>> nav-bar >>> button.save")
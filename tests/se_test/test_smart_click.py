@@ -0,0 +1,37 @@
+import pytest
+from selenium.common.exceptions import ElementClickInterceptedException
+
+
+# A button under a full-page overlay, which is removed after `arguments[0]` ms.
+OVERLAY_SCRIPT = """
+    var button = document.createElement('button');
+    button.id = 'covered-button';
+    button.textContent = 'Covered';
+    button.onclick = function () { button.textContent = 'Clicked'; };
+    document.body.appendChild(button);
+    var overlay = document.createElement('div');
+    overlay.id = 'overlay';
+    overlay.style.cssText = 'position: fixed; top: 0; left: 0; width: 100%; height: 100%; z-index: 1000;';
+    document.body.appendChild(overlay);
+    setTimeout(function () { overlay.remove(); }, arguments[0]);
+"""
+
+
+def test_smart_click_waits_for_overlay(app):
+    app.goto_index_page()
+    browser = app.web_driver
+    browser.execute_script(OVERLAY_SCRIPT, 1000)
+    button = browser.init_web_element("#covered-button")
+    button.smart_click(timeout=4)
+    button.should.have_exact_text("Clicked", timeout=0)
+
+
+def test_smart_click_raises_when_overlay_stays(app):
+    app.goto_index_page()
+    browser = app.web_driver
+    browser.execute_script(OVERLAY_SCRIPT, 60000)
+    button = browser.init_web_element("#covered-button")
+    with pytest.raises(ElementClickInterceptedException, match="div#overlay"):
+        button.smart_click(timeout=0.5)
+    assert button.should_be_unclickable()
+    assert button.text == "Covered"
@@ -0,0 +1,84 @@
+from selen_kaa import state
+from selen_kaa.utils import se_utils
+from tests.webapp.setup import URL
+
+
+def test_restore_storages(app, tmp_path):
+    path = str(tmp_path / "state.json.gz")
+    browser = app.web_driver
+    app.goto_index_page()
+    browser.add_cookie({"name": "session", "value": "abc"})
+    browser.execute_script("localStorage.setItem('token', 't1'); sessionStorage.setItem('tab', 'law');")
+    browser.save_state(path)
+
+    browser.delete_all_cookies()
+    browser.execute_script("localStorage.clear(); sessionStorage.clear();")
+    browser.get(URL + "law")
+    assert browser.load_state(path, ttl=60)
+    assert browser.current_url == URL
+    assert browser.get_cookie("session")["value"] == "abc"
+    assert browser.execute_script("return [localStorage.getItem('token'), sessionStorage.getItem('tab')]") == [
+        "t1", "law"]
+
+
+CREATE_DATABASE_SCRIPT = """
+    var done = arguments[arguments.length - 1], request = indexedDB.open('app', 1);
+    request.onupgradeneeded = function () {
+        request.result.createObjectStore('users', {keyPath: 'id'}).createIndex('by_name', 'name');
+        request.result.createObjectStore('settings');
+    };
+    request.onsuccess = function () {
+        var db = request.result, transaction = db.transaction(['users', 'settings'], 'readwrite');
+        transaction.objectStore('users').put({id: 1, name: 'admin'});
+        transaction.objectStore('settings').put('dark', 'theme');
+        transaction.oncomplete = function () {
+            db.close();
+            done(true);
+        };
+    };
+"""
+
+READ_DATABASE_SCRIPT = """
+    var done = arguments[arguments.length - 1], request = indexedDB.open('app');
+    request.onsuccess = function () {
+        var db = request.result, transaction = db.transaction(['users', 'settings'], 'readonly'), result = {};
+        transaction.objectStore('users').index('by_name').get('admin').onsuccess = function (event) {
+            result.user = event.target.result;
+        };
+        transaction.objectStore('settings').get('theme').onsuccess = function (event) {
+            result.theme = event.target.result;
+        };
+        transaction.oncomplete = function () { db.close(); done(result); };
+    };
+"""
+
+
+def test_restore_indexed_db(app, tmp_path):
+    path = str(tmp_path / "state.json.gz")
+    browser = app.web_driver
+    app.goto_index_page()
+    browser.execute_async_script(CREATE_DATABASE_SCRIPT)
+    saved = browser.save_state(path, indexed_db=True)
+    assert [database["name"] for database in saved.indexed_db] == ["app"]
+
+    browser.execute_async_script("""
+        var done = arguments[arguments.length - 1];
+        indexedDB.deleteDatabase('app').onsuccess = function () { done(true); };
+    """)
+    assert browser.load_state(path, ttl=60)
+    assert browser.execute_async_script(READ_DATABASE_SCRIPT) == {"user": {"id": 1, "name": "admin"},
+                                                                  "theme": "dark"}
+
+
+def test_restore_of_open_indexed_db_fails(app):
+    browser = app.web_driver
+    app.goto_index_page()
+    browser.execute_async_script(CREATE_DATABASE_SCRIPT)
+    databases = state.capture(browser.webdriver, indexed_db=True).indexed_db
+    browser.execute_async_script("""
+        var done = arguments[arguments.length - 1], request = indexedDB.open('app');
+        request.onsuccess = function () { window.openDatabase = request.result; done(true); };
+    """)
+    with se_utils.script_timeout(browser.webdriver, 5):
+        error = browser.execute_async_script(state.WRITE_INDEXED_DB_SCRIPT, databases)
+    assert error.startswith('database "app" is open in the page')
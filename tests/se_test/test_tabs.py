@@ -0,0 +1,50 @@
+from tests.webapp.setup import URL
+from tests.webapp.pages.index_page import IndexPage
+from tests.webapp.pages.form_page import FormPage
+
+
+def test_tabs_run_flows(app):
+    def index_flow(tab):
+        tab.get(URL)
+        return len(IndexPage(tab).the_same_text)
+
+    def form_flow(tab):
+        tab.get(URL + "form")
+        page = FormPage(tab)
+        page.first_name.send_keys("Viktor")
+        return page.first_name.get_attribute("value")
+
+    results = app.web_driver.tabs.run([index_flow, form_flow, index_flow], max_tabs=2)
+    assert results == [7, "Viktor", 7]
+    # released tabs are closed
+    assert app.web_driver.tabs.size == 0
+    app.web_driver.tabs.close_all()
+    assert len(app.web_driver.window_handles) == 1
+
+
+def test_tab_elements_focus_their_window(app):
+    app.goto_index_page()
+    with app.web_driver.tabs.session() as form_tab:
+        form_tab.get(URL + "form")
+        first_name = FormPage(form_tab).first_name.web_element
+        index_page = IndexPage(app.web_driver.tabs.open())
+        index_page._webdriver.get(URL)
+        switches = app.web_driver.tabs.switches
+        first_name.send_keys("Kaa")
+        assert app.web_driver.tabs.switches == switches + 1
+        assert first_name.get_attribute("value") == "Kaa"
+        assert app.web_driver.tabs.switches == switches + 1
+    app.web_driver.tabs.close_all()
+
+
+def test_flows_dont_share_session_storage(app):
+    def write_flow(tab):
+        tab.get(URL)
+        tab.execute_script("sessionStorage.setItem('flow', 'write');")
+
+    def read_flow(tab):
+        tab.get(URL)
+        return tab.execute_script("return sessionStorage.getItem('flow');")
+
+    assert app.web_driver.tabs.run([write_flow, read_flow], max_tabs=1) == [None, None]
+    app.web_driver.tabs.close_all()
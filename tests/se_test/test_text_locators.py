@@ -0,0 +1,31 @@
+def test_text_locators(app):
+    app.goto_index_page()
+    browser = app.web_driver
+    assert browser.init_web_element("text=Test the same 3").text == "Test the same 3"
+    assert len(browser.init_all_web_elements("text~=test THE same")) == 7
+    assert len(browser.init_all_web_elements("text=/^Test the same [0-2]$/")) == 3
+    browser.init_web_element("text~=show the div").should.be_visible()
+
+
+def test_text_index_follows_dom_changes(app):
+    app.goto_index_page()
+    browser = app.web_driver
+    assert len(browser.init_all_web_elements("text~=test the same")) == 7
+    browser.execute_script("""
+        var span = document.createElement('span');
+        span.textContent = 'Added later';
+        document.body.appendChild(span);
+        document.querySelector('.the-same-class').textContent = 'Renamed';
+    """)
+    browser.init_web_element("text=Added later").should.be_visible()
+    assert len(browser.init_all_web_elements("text~=test the same")) == 6
+    assert browser.init_web_element("text=Renamed").get_attribute("class") == "well the-same-class"
+
+
+def test_waits_for_text_selectors(app):
+    app.goto_index_page()
+    assert app.wait.element_be_in_dom("text=/^Test the same 3$/").text == "Test the same 3"
+    app.wait.element_to_be_visible("text~=show the div")
+    app.wait.element_to_contain_text("text=/^Test the same [3]$/", "same 3")
+    app.wait.element_not_present("text=No such text", timeout=0)
+    app.wait.element_to_include_child_element("#about", "text=/^Test the same 3$/")
@@ -0,0 +1,18 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+
+def test_text_conditions_in_browser(app):
+    index_page = app.goto_index_page()
+    element = index_page.the_same_text[1]
+    assert element.should.have_exact_text("Test the same 1")
+    assert element.should.contain_text("same 1")
+    assert element.should.have_similar_text(" test THE same 1 ")
+    assert element.should.have_class("well the-same-class")
+
+
+def test_text_condition_error_has_actual_text(app):
+    index_page = app.goto_index_page()
+    with pytest.raises(TimeoutException) as exc:
+        index_page.the_same_text[1].should.contain_text("no such text", timeout=0.5)
+    assert "Actual text 'Test the same 1'" in exc.value.msg
@@ -1,3 +1,7 @@
+import time
+
+import pytest
+
 from selen_kaa.element.se_elements_array import SeElementsArray
 from selen_kaa.element.se_web_element import SeWebElement
 
@@ -41,3 +45,41 @@ def test_elem_in_arr(app):
     assert index_page.the_same_text[0] != index_page.the_same_text[1]
     assert index_page.the_same_text[2] != index_page.the_same_text[3]
     assert index_page.the_same_text[4] != index_page.the_same_text[5]
+
+
+def test_len_and_index_dont_materialize_array(app):
+    index_page = app.goto_index_page()
+    assert len(index_page.the_same_text) == 7
+    assert "Test the same" in index_page.the_same_text[3].text
+    assert type(index_page.the_same_text[-1]) is WebElementWrapper
+    assert len(index_page.the_same_text[2:5]) == 3
+    # nothing was materialized by the fast paths
+    assert not index_page.the_same_text._elements_array
+
+
+def test_index_out_of_range(app):
+    index_page = app.goto_index_page()
+    arr = app.web_driver.init_all_web_elements(THE_SAME_CLASS, timeout=4)
+    start = time.time()
+    with pytest.raises(IndexError):
+        assert arr[100]
+    assert time.time() - start < 1
+    assert [elem.text for elem in arr[0:2]] == [elem.text for elem in index_page.the_same_text][0:2]
+
+
+def test_filters_are_evaluated_in_browser(app):
+    index_page = app.goto_index_page()
+    visible = index_page.the_same_text.filter_visible()
+    assert isinstance(visible, SeElementsArray)
+    assert len(visible) == 7
+    assert len(visible.filter_text(contains="Test the same 3")) == 1
+    assert len(index_page.the_same_text.filter_text(regex=r"same [0-2]$")) == 3
+    assert len(index_page.the_same_text.filter_class("well the-same-class")) == 7
+    assert type(visible.filter_attr("class", contains="well")[0]) is WebElementWrapper
+
+
+def test_first_where(app):
+    index_page = app.goto_index_page()
+    element = index_page.the_same_text.first_where(visible=True, contains="same 5")
+    assert element.text.endswith("5")
+    assert index_page.the_same_text.filter_class("no-such-class").first_where() is None
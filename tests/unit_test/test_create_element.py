@@ -1,3 +1,5 @@
+import time
+
 import pytest
 
 from selenium.webdriver.common.by import By
@@ -62,3 +64,51 @@ def test_create_se_web_element_by_custom_locator_strategy(param):
     selector, locator_strat = param
     elements = SeElementsArray(None, selector, locator_strategy=locator_strat)
     assert elements.locator_strategy == locator_strat
+
+
+def test_subclasses_of_se_web_element_keep_ad_hoc_attributes():
+
+    class RowElement(SeWebElement):
+        pass
+
+    element = SeWebElement(None, "div")
+    assert "_selector" in SeWebElement.__slots__
+    assert not hasattr(element, "__dict__")
+    with pytest.raises(AttributeError):
+        element.row_name = "first"
+    row = RowElement(None, "div")
+    row.row_name = "first"
+    assert row.row_name == "first"
+    assert element.should is element.should
+    assert element.expect is element.expect
+    element.timeout = 1
+    assert element.should._timeout == 1
+
+
+def test_waits_are_shared_per_webdriver():
+
+    class FakeWebDriver:
+        pass
+
+    driver = FakeWebDriver()
+    first = SeWebElement(driver, "div")
+    second = SeWebElement(driver, ".class")
+    assert first.should._wait is second.expect._wait
+    assert first.should._wait is not SeWebElement(FakeWebDriver(), "div").should._wait
+
+
+def test_index_out_of_rendered_array_fails_at_once():
+
+    class ScriptWebDriver:
+        """Every script returns a rendered array of 7 elements."""
+        capabilities = {"javascriptEnabled": True}
+
+        def execute_script(self, script, *args):
+            return [7, None, None]
+
+    arr = SeElementsArray(ScriptWebDriver(), "div", timeout=4)
+    arr.element_type = SeWebElement
+    start = time.time()
+    with pytest.raises(IndexError):
+        assert arr[100]
+    assert time.time() - start < 1
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from selen_kaa.deadline import Deadline, budget, remaining
+from selen_kaa.waits import Wait
+
+
+def test_deadline_without_budget():
+    deadline = Deadline(5)
+    assert 4.9 < deadline.remaining() <= 5
+    assert not deadline.expired
+    assert str(deadline) == "5"
+    assert Deadline.of(deadline) is deadline
+    assert Deadline(None).expired
+
+
+def test_budget_caps_deadlines():
+    with budget(1) as budget_deadline:
+        assert remaining(60) <= 1
+        assert remaining(0.5) <= 0.5
+        assert budget_deadline.remaining() <= 1
+    assert remaining(60) > 59
+
+
+def test_nested_budget_only_shortens():
+    with budget(1):
+        with budget(10):
+            assert remaining(60) <= 1
+        with budget(0.2):
+            assert remaining(60) <= 0.2
+        assert 0.2 < remaining(60) <= 1
+
+
+def test_wait_fluently_ends_with_budget():
+    start = time.monotonic()
+    with budget(0.4):
+        with pytest.raises(TimeoutException, match="waited 5"):
+            Wait.wait_fluently(lambda: False, 5, "waited 5")
+    assert time.monotonic() - start < 1
+
+
+def test_nested_waits_share_deadline():
+    deadline = Deadline(0.4)
+    start = time.monotonic()
+    for _ in range(3):
+        with pytest.raises(TimeoutException):
+            Wait.wait_fluently(lambda: False, deadline, "timeout")
+    # the second and third waits have nothing left
+    assert time.monotonic() - start < 0.8
+
+
+def test_element_wait_within_budget():
+    pytest.importorskip("lxml")
+    pytest.importorskip("flask")
+    from selen_kaa.webdriver import SeWebDriver
+    from selen_kaa.static_driver import StaticWebDriver
+    from tests.webapp.server.app import flask_app
+
+    browser = SeWebDriver(StaticWebDriver(wsgi_app=flask_app))
+    browser.get("http://localhost/")
+    element = browser.init_web_element("#no-such-element", timeout=30)
+    start = time.monotonic()
+    with browser.deadline(0.5):
+        with pytest.raises(NoSuchElementException):
+            element.should.be_visible(timeout=30)
+    assert time.monotonic() - start < 1.5
@@ -0,0 +1,64 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+pytest.importorskip("lxml")
+pytest.importorskip("cssselect")
+
+from selen_kaa.dom_snapshot import DomSnapshot  # noqa: E402
+
+
+HTML = """
+<html><head><title>Snapshot</title><script>var text = "not a text";</script></head>
+<body data-selen-kaa-visible="1" data-selen-kaa-on-screen="1">
+    <h1 id="title" class="header main" data-selen-kaa-visible="1" data-selen-kaa-on-screen="1">Selen-kaa</h1>
+    <div class="row" data-selen-kaa-visible="1" data-selen-kaa-on-screen="1">
+        First <span data-selen-kaa-visible="1">row</span>
+        <span class="hidden" data-selen-kaa-visible="0">hidden text</span>
+    </div>
+    <div class="row" data-selen-kaa-visible="1" data-selen-kaa-on-screen="0"><p>Second</p><p>row</p></div>
+</body></html>
+"""
+
+
+@pytest.fixture
+def snapshot():
+    return DomSnapshot(HTML, url="http://127.0.0.1:5000/", title="Snapshot")
+
+
+def test_find_by_css_xpath_and_id(snapshot):
+    assert snapshot.find("#title").tag_name == "h1"
+    assert snapshot.find("//h1[@id='title']").get_attribute("class") == "header main"
+    assert len(snapshot.find_all(".row")) == 2
+    assert len(snapshot.find_all("//div[@class='row']")) == 2
+    assert snapshot.find(".row").find_all("span")[1].get_class() == "hidden"
+    assert not snapshot.find("#absent").is_present
+
+
+def test_visible_text(snapshot):
+    rows = snapshot.find_all(".row")
+    assert rows[0].text == "First row"
+    assert rows[1].text == "Second\nrow"
+    assert "not a text" not in snapshot.find("body").text
+
+
+def test_should_conditions(snapshot):
+    title = snapshot.find("#title")
+    assert title.should.be_visible() is title
+    title.should.have_exact_text("Selen-kaa")
+    title.should.have_similar_text("selen-KAA")
+    title.should.contain_text("kaa")
+    title.should.have_class("main")
+    snapshot.find(".hidden").should.be_invisible()
+    snapshot.find("#absent").should.not_present_in_dom()
+    snapshot.find(".row").should.include_element("span")
+    with pytest.raises(TimeoutException):
+        snapshot.find_all(".row")[1].should.be_on_the_screen()
+    with pytest.raises(TimeoutException):
+        title.should.have_exact_text("Selen")
+
+
+def test_expect_conditions(snapshot):
+    assert snapshot.find("#title").expect.be_on_the_screen()
+    assert snapshot.find(".hidden").expect.be_visible() is False
+    assert snapshot.find("#absent").expect.be_visible() is False
+    assert snapshot.find("#title").expect.have_class("footer") is False
@@ -0,0 +1,49 @@
+import threading
+
+from selen_kaa.element.element_observer import INSTALL_OBSERVER_SCRIPT, ElementObserver, TEXT
+
+
+class ObservedDriver:
+    """Buffers of one observer: every drain returns the next batch, None once the document is replaced."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.threads = set()
+
+    def execute_script(self, script, *args):
+        self.threads.add(threading.current_thread())
+        if script == INSTALL_OBSERVER_SCRIPT:
+            return "1"
+        if not self.batches:
+            return [[], 0]
+        batch = self.batches.pop(0)
+        return None if batch is None else [batch, 0]
+
+
+def text_record(value, time_ms=1000):
+    return {"type": TEXT, "time": time_ms, "value": value}
+
+
+def test_drains_on_the_iterating_thread():
+    driver = ObservedDriver([[text_record("25%")], [], [text_record("100%")]])
+    observer = ElementObserver(driver, None, interval=0.01).start()
+    change = observer.wait_for(lambda change_: change_.value == "100%", timeout=1)
+    observer.stop()
+    assert change.timestamp == 1
+    assert [change_.value for change_ in observer.history] == ["25%", "100%"]
+    assert driver.threads == {threading.current_thread()}
+
+
+def test_stream_ends_with_the_document():
+    driver = ObservedDriver([[text_record("25%")], None])
+    observer = ElementObserver(driver, None, interval=0.01).start()
+    assert [change.value for change in observer.changes(timeout=1)] == ["25%"]
+    assert not observer.is_active
+
+
+def test_callback_is_fed_by_poll():
+    received = []
+    driver = ObservedDriver([[text_record("Saved")]])
+    observer = ElementObserver(driver, None, callback=received.append).start()
+    assert observer.poll() == 1
+    assert [change.value for change in received] == ["Saved"]
@@ -0,0 +1,40 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+pytest.importorskip("lxml")
+pytest.importorskip("cssselect")
+pytest.importorskip("flask")
+
+from selen_kaa.waits import ElementPredicate  # noqa: E402
+from selen_kaa.webdriver import SeWebDriver  # noqa: E402
+from selen_kaa.static_driver import StaticWebDriver  # noqa: E402
+from tests.webapp.server.app import flask_app  # noqa: E402
+from tests.webapp.webapp import WebApp  # noqa: E402
+
+
+@pytest.fixture
+def index_page():
+    return WebApp(SeWebDriver(StaticWebDriver(wsgi_app=flask_app))).goto_index_page()
+
+
+def test_predicates_without_javascript(index_page):
+    element = index_page.the_same_text[2]
+    assert element.should.have_exact_text("Test the same 2")
+    assert element.should.contain_text("same 2")
+    assert element.should.have_similar_text("test THE same 2")
+    assert element.should.have_similar_text("Testthe same2")
+    assert element.should.have_class("the-same-class well")
+    assert element.expect.have_class("no-such-class", timeout=0) is False
+
+
+def test_error_message_has_the_last_actual_value(index_page):
+    with pytest.raises(TimeoutException) as exc:
+        index_page.the_same_text[2].should.have_exact_text("Test the same 3", timeout=0)
+    assert "Actual text 'Test the same 2'" in exc.value.msg
+
+
+def test_actual_value_is_truncated(index_page):
+    body = index_page.btn_show_div.web_element.find_element("xpath", "/html/body")
+    predicate = ElementPredicate(ElementPredicate.EXACT, "no such text")
+    assert predicate(body.parent, body) is False
+    assert len(predicate.actual) == ElementPredicate.DIAGNOSTIC_LENGTH + len("...")
@@ -0,0 +1,134 @@
+import base64
+import io
+import json
+import os
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from selen_kaa.element import file_upload
+from selen_kaa.element.se_web_element import SeWebElement
+
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+
+class RemoteEnd(BaseHTTPRequestHandler):
+    """Stand-in of a grid: a session, one file input, and the upload endpoint."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+        if self.path == "/session":
+            self._reply({"sessionId": "s1", "capabilities": {"browserName": "chrome"}})
+        elif self.path == "/session/s1/se/file":
+            server.upload_bodies.append(len(body))
+            if server.fail_uploads:
+                self._reply({"error": "unknown error", "message": "disk is full"}, status=500)
+                return
+            with zipfile.ZipFile(io.BytesIO(base64.b64decode(json.loads(body)["file"]))) as archive:
+                name = archive.namelist()[0]
+                archive.extract(name, server.remote_dir)
+            self._reply(os.path.join(server.remote_dir, name))
+        elif self.path == "/session/s1/element":
+            self._reply({ELEMENT_KEY: "e1"})
+        elif self.path == "/session/s1/element/e1/value":
+            server.typed.append(json.loads(body)["text"])
+            self._reply(None)
+        else:
+            self._reply({"error": "unknown command", "message": self.path}, status=404)
+
+    def do_DELETE(self):
+        self._reply(None)
+
+    def _reply(self, value, status=200):
+        data = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def remote_end(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RemoteEnd)
+    server.remote_dir = str(tmp_path / "remote")
+    server.upload_bodies = []
+    server.typed = []
+    server.fail_uploads = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    driver = webdriver.Remote(command_executor=f"http://127.0.0.1:{server.server_port}",
+                              options=webdriver.ChromeOptions())
+    yield server, driver
+    driver.quit()
+    server.shutdown()
+    server.server_close()
+    file_upload._uploaded.clear()
+
+
+def fixture_file(tmp_path, name="video.bin", size=3 * file_upload.CHUNK_SIZE + 7):
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def test_upload_streams_file_to_remote_end(remote_end, tmp_path):
+    server, driver = remote_end
+    path = fixture_file(tmp_path)
+    result = SeWebElement(driver, "#file").upload(path)
+    assert not result.cached
+    assert result.size == os.path.getsize(path)
+    assert result.sent_bytes == server.upload_bodies[0]
+    assert result.throughput > 0
+    with open(result.remote_path, "rb") as remote, open(path, "rb") as local:
+        assert remote.read() == local.read()
+    assert server.typed == [result.remote_path]
+
+
+def test_same_file_is_uploaded_once_per_session(remote_end, tmp_path):
+    server, driver = remote_end
+    first = SeWebElement(driver, "#file").upload(fixture_file(tmp_path, size=100))
+    os.mkdir(str(tmp_path / "copy"))
+    copy_path = str(tmp_path / "copy" / "video.bin")
+    with open(copy_path, "wb") as copy, open(os.path.join(str(tmp_path), "video.bin"), "rb") as original:
+        copy.write(original.read())
+    second = SeWebElement(driver, "#file").upload(copy_path)
+    assert second.cached
+    assert second.remote_path == first.remote_path
+    assert second.sha256 == first.sha256
+    assert second.throughput == 0
+    assert len(server.upload_bodies) == 1
+    assert server.typed == [first.remote_path, first.remote_path]
+
+
+def test_same_content_of_another_name_is_uploaded(remote_end, tmp_path):
+    server, driver = remote_end
+    first = file_upload.upload_file(driver, fixture_file(tmp_path, size=100))
+    renamed_path = str(tmp_path / "renamed.bin")
+    with open(renamed_path, "wb") as renamed, open(os.path.join(str(tmp_path), "video.bin"), "rb") as original:
+        renamed.write(original.read())
+    second = file_upload.upload_file(driver, renamed_path)
+    assert not second.cached
+    assert second.sha256 == first.sha256
+    assert os.path.basename(second.remote_path) == "renamed.bin"
+    assert len(server.upload_bodies) == 2
+
+
+def test_failed_upload_is_not_cached(remote_end, tmp_path):
+    server, driver = remote_end
+    path = fixture_file(tmp_path, size=10)
+    server.fail_uploads = True
+    with pytest.raises(WebDriverException, match="disk is full"):
+        file_upload.upload_file(driver, path)
+    server.fail_uploads = False
+    assert not file_upload.upload_file(driver, path).cached
+    assert len(server.upload_bodies) == 2
@@ -0,0 +1,57 @@
+import os
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from selen_kaa.utils import file_watch
+from selen_kaa.waits import Wait
+
+
+def download_later(directory, name, delay=0.2, partial_suffix=".crdownload"):
+    """Write a partial file, then rename it, like Chrome does."""
+    def download():
+        partial = os.path.join(directory, name + partial_suffix)
+        with open(partial, "wb") as file:
+            file.write(b"x" * 1000)
+            file.flush()
+            time.sleep(delay)
+            file.write(b"y" * 1000)
+        os.rename(partial, os.path.join(directory, name))
+
+    thread = threading.Thread(target=download)
+    thread.start()
+    return thread
+
+
+@pytest.mark.parametrize("use_inotify", (True, False))
+def test_wait_for_renamed_download(tmp_path, use_inotify):
+    if use_inotify and not file_watch.inotify_available():
+        pytest.skip("inotify is available on Linux only")
+    (tmp_path / "other.txt").write_text("other")
+    thread = download_later(str(tmp_path), "report.csv")
+    path = file_watch.wait_for_complete_file(str(tmp_path), "*.csv", timeout=5, use_inotify=use_inotify)
+    thread.join()
+    assert path == os.path.join(str(tmp_path), "report.csv")
+    assert os.path.getsize(path) == 2000
+
+
+def test_placeholder_with_partial_file_is_not_complete(tmp_path):
+    # Firefox creates an empty final file next to the partial one
+    (tmp_path / "report.csv").write_text("")
+    (tmp_path / "report.csv.part").write_text("data")
+    with pytest.raises(TimeoutException, match="report.csv.part"):
+        Wait.download_to_complete(str(tmp_path), "*.csv", timeout=0.3)
+    os.replace(str(tmp_path / "report.csv.part"), str(tmp_path / "report.csv"))
+    assert Wait.download_to_complete(str(tmp_path), "*.csv", timeout=1).endswith("report.csv")
+
+
+def test_files_before_since_are_ignored(tmp_path):
+    old = tmp_path / "old.csv"
+    old.write_text("old")
+    os.utime(str(old), (time.time() - 60, time.time() - 60))
+    thread = download_later(str(tmp_path), "new.csv", delay=0.1)
+    path = Wait.download_to_complete(str(tmp_path), "*.csv", timeout=5, since=time.time() - 1)
+    thread.join()
+    assert path.endswith("new.csv")
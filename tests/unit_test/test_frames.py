@@ -0,0 +1,60 @@
+from selen_kaa.frames import FrameTracker, enter_frame, reset_to_top, to_frame_path
+
+
+class RecordingDriver:
+    """Records frame switches instead of sending them."""
+
+    def __init__(self):
+        self.commands = []
+        self.switch_to = self
+
+    def find_element(self, by, value):
+        self.commands.append(("find", value))
+        return value
+
+    def frame(self, iframe):
+        self.commands.append(("frame", iframe))
+
+    def parent_frame(self):
+        self.commands.append(("parent",))
+
+    def default_content(self):
+        self.commands.append(("top",))
+
+
+def test_to_frame_path():
+    assert to_frame_path(None) == ()
+    assert to_frame_path("#editor") == ("#editor",)
+    assert to_frame_path(["#editor", "iframe"]) == ("#editor", "iframe")
+
+
+def test_switch_only_when_needed():
+    driver = RecordingDriver()
+    enter_frame(driver, None)
+    assert driver.commands == []
+    enter_frame(driver, ("#outer", "#inner"))
+    enter_frame(driver, ("#outer", "#inner"))
+    assert driver.commands == [("find", "#outer"), ("frame", "#outer"), ("find", "#inner"), ("frame", "#inner")]
+    driver.commands.clear()
+    enter_frame(driver, "#outer")
+    assert driver.commands == [("parent",)]
+    driver.commands.clear()
+    enter_frame(driver, ("#other", "#inner"))
+    assert driver.commands == [("parent",), ("find", "#other"), ("frame", "#other"), ("find", "#inner"),
+                               ("frame", "#inner")]
+    driver.commands.clear()
+    enter_frame(driver, ())
+    assert driver.commands == [("top",)]
+    assert FrameTracker.shared(driver).switches == 7
+
+
+def test_reset_and_invalidate():
+    driver = RecordingDriver()
+    tracker = FrameTracker.shared(driver)
+    enter_frame(driver, "#outer")
+    reset_to_top(driver)
+    assert tracker.current == ()
+    tracker.invalidate()
+    driver.commands.clear()
+    enter_frame(driver, "#outer")
+    assert driver.commands == [("top",), ("find", "#outer"), ("frame", "#outer")]
@@ -0,0 +1,58 @@
+import pytest
+
+from selen_kaa import helper_runtime
+from selen_kaa.helper_runtime import HelperRuntime, register_helper
+
+
+@pytest.fixture
+def isolated_helpers(monkeypatch):
+    """Helpers registered by a test are gone after it, the library version of other tests stays the same."""
+    monkeypatch.setattr(helper_runtime, "_helpers", dict(helper_runtime._helpers))
+    monkeypatch.setattr(helper_runtime, "_library", None)
+
+
+def test_library_version_changes_with_helpers(isolated_helpers):
+    version = HelperRuntime(None).version
+    register_helper("selenKaaUnitTestHelper", "return 1;")
+    assert HelperRuntime(None).version != version
+    assert HelperRuntime(None).version.startswith(helper_runtime.RUNTIME_VERSION + "_")
+
+
+def test_call_script_is_short():
+    library = helper_runtime._current_library()
+    assert len(library.call_script) < 100
+    assert "arrayQuery" in library.install_and_call_script
+    assert library.install_and_call_script.endswith(library.call_script)
+
+
+def test_unknown_helper():
+    with pytest.raises(ValueError, match="no helper 'noSuchHelper'"):
+        HelperRuntime(None).call("noSuchHelper")
+
+
+def test_registered_helpers_are_isolated():
+    assert "selenKaaUnitTestHelper" not in helper_runtime._helpers
+
+
+def test_form_fill_polls_send_short_calls():
+    from selen_kaa.forms import fill_form
+
+    class FormDriver:
+        """The first control appears at the second poll, the library is installed at the first one."""
+
+        def __init__(self):
+            self.scripts = []
+
+        def execute_script(self, script, *args):
+            self.scripts.append(script)
+            if args[0] == "fillForm":
+                if len(self.scripts) < 3:
+                    return helper_runtime.MISSING if len(self.scripts) == 1 else [[0], []]
+                return [[], []]
+            return ["Kaa"]
+
+    driver = FormDriver()
+    assert fill_form(driver, {"#name": "Kaa"}, timeout=2) == {"#name": "Kaa"}
+    library = helper_runtime._current_library()
+    assert driver.scripts == [library.call_script, library.install_and_call_script,
+                              library.call_script, library.call_script]
@@ -0,0 +1,33 @@
+import json
+
+from selen_kaa.metrics import MetricsCollector
+
+
+URL = "http://127.0.0.1:5000/"
+
+
+def test_metrics_summary_percentiles():
+    collector = MetricsCollector()
+    for load_ms in (100, 200, 300, 400, 500):
+        collector.add(URL, {"load_ms": load_ms, "resource_count": 10, "first_paint_ms": None})
+    summary = collector.summary()
+    assert summary[URL]["load_ms"]["p50"] == 300
+    assert summary[URL]["load_ms"]["p90"] == 460
+    assert summary[URL]["load_ms"]["runs"] == 5
+    assert summary[URL]["resource_count"]["p99"] == 10
+    assert "first_paint_ms" not in summary[URL]
+    assert collector.last["load_ms"] == 500
+
+
+def test_metrics_export_to_json(tmp_path):
+    collector = MetricsCollector()
+    collector.add(URL, {"load_ms": 100})
+    collector.add(URL + "law", {"load_ms": 200})
+    path = str(tmp_path / "metrics.json")
+    collector.to_json(path, include_runs=True)
+    with open(path) as file_:
+        content = json.load(file_)
+    assert content["summary"][URL + "law"]["load_ms"]["p50"] == 200
+    assert content["stale_recoveries"] == MetricsCollector.stale_recoveries()
+    assert content["runs"][URL] == [{"load_ms": 100}]
+    assert collector.urls == [URL, URL + "law"]
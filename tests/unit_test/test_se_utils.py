@@ -1,6 +1,7 @@
 import pytest
 from selenium.webdriver.common.by import By
 
+from selen_kaa import global_config
 from selen_kaa.utils import se_utils
 
 
@@ -18,3 +19,87 @@ def test_css_selector(selector):
 ))
 def test_xpath_selector(selector):
     assert se_utils.get_selector_type(selector) == By.XPATH
+
+
+@pytest.mark.parametrize("locator, js_locator", (
+    ((By.CSS_SELECTOR, ".class"), ["css", ".class"]),
+    ((By.XPATH, "//div"), ["xpath", "//div"]),
+    ((By.TAG_NAME, "img"), ["css", "img"]),
+    ((By.CLASS_NAME, "class-name"), ["css", ".class-name"]),
+    ((By.ID, 'some"id'), ["css", '[id="some\\"id"]']),
+    ((By.NAME, "user"), ["css", '[name="user"]']),
+    (('-ios class chain', '**/XCUIElementTypeImage'), None),
+))
+def test_js_locator(locator, js_locator):
+    assert se_utils.to_js_locator(*locator) == js_locator
+
+
+@pytest.mark.parametrize("selector, js_locator", (
+    ("text=Save  all", ["text", "exact", "Save all", ""]),
+    ("text~=save", ["text", "contains", "save", ""]),
+    ("text=/^Save \\d+$/i", ["text", "regex", "^Save \\d+$", "i"]),
+))
+def test_text_selector(selector, js_locator):
+    locator_strategy = se_utils.get_selector_type(selector)
+    assert locator_strategy == se_utils.TEXT_LOCATOR
+    assert se_utils.to_js_locator(locator_strategy, selector) == js_locator
+
+
+def test_text_selector_to_xpath():
+    locator_strategy, xpath = se_utils.to_fast_locator(se_utils.TEXT_LOCATOR, "text=It's")
+    assert locator_strategy == By.XPATH
+    assert xpath.endswith("=\"It's\"]")
+    with pytest.raises(ValueError):
+        se_utils.to_fast_locator(se_utils.TEXT_LOCATOR, "text=/Save/")
+
+
+@pytest.mark.parametrize("selector, tags", (
+    ("text=Hello world", ["p"]),
+    ("text~=HELLO W", ["p"]),
+    ("text=Save", ["button"]),
+    ("text=hidden", []),
+    ("text=Hello", []),
+))
+def test_text_selector_xpath_matches_joined_own_text(selector, tags):
+    html = pytest.importorskip("lxml.html")
+    document = html.fromstring("<div><p>Hello <b>bold</b> world</p><button>\u00a0Save </button>"
+                               "<noscript>hidden</noscript><template><i>hidden</i></template></div>")
+    xpath = se_utils.text_selector_to_xpath(selector)
+    assert [element.tag for element in document.xpath(xpath)] == tags
+
+
+def test_shadow_path():
+    selector = "app-shell >>> nav-bar>>>button.save"
+    locator_strategy = se_utils.get_selector_type(selector)
+    assert locator_strategy == se_utils.SHADOW_LOCATOR
+    assert se_utils.to_js_locator(locator_strategy, selector) == ["shadow", ["app-shell", "nav-bar", "button.save"]]
+    with pytest.raises(ValueError):
+        se_utils.parse_shadow_path("app-shell >>> ")
+
+
+def test_script_timeout_restores_remembered_value():
+
+    class TimeoutsDriver:
+        def __init__(self):
+            self.timeouts = type("Timeouts", (), {"script": 30})()
+            self.set_timeouts = []
+
+        def set_script_timeout(self, seconds):
+            self.set_timeouts.append(seconds)
+
+    driver = TimeoutsDriver()
+    with se_utils.script_timeout(driver, 40):
+        pass
+    se_utils.remember_script_timeout(driver, 60)
+    with se_utils.script_timeout(driver, 70):
+        pass
+    assert driver.set_timeouts == [40, 30, 70, 60]
+
+
+def test_fast_locator_from_element(monkeypatch):
+    monkeypatch.setattr(global_config, "TRANSLATE_XPATH_TO_CSS", True)
+    assert se_utils.to_fast_locator(By.XPATH, "//a") == (By.CSS_SELECTOR, "a")
+    assert se_utils.to_fast_locator(By.XPATH, "//a", element_context=True) == (By.XPATH, "//a")
+    assert se_utils.to_fast_locator(By.XPATH, ".//a", element_context=True) == (By.CSS_SELECTOR, ":scope a")
+    locator_strategy, xpath = se_utils.to_fast_locator(se_utils.TEXT_LOCATOR, "text=Save", element_context=True)
+    assert xpath.startswith(".//*")
@@ -0,0 +1,59 @@
+import gzip
+import json
+import time
+
+import pytest
+
+pytest.importorskip("lxml")
+pytest.importorskip("flask")
+
+from selen_kaa import state  # noqa: E402
+from selen_kaa.webdriver import SeWebDriver  # noqa: E402
+from selen_kaa.static_driver import StaticWebDriver  # noqa: E402
+from tests.webapp.server.app import flask_app  # noqa: E402
+from tests.webapp.setup import URL  # noqa: E402
+
+
+def browser():
+    return SeWebDriver(StaticWebDriver(wsgi_app=flask_app))
+
+
+def test_save_and_load_state(tmp_path):
+    path = str(tmp_path / "state" / "user.json.gz")
+    first = browser()
+    first.get(URL + "law")
+    first.add_cookie({"name": "session", "value": "abc", "path": "/"})
+    saved = first.save_state(path)
+    assert saved.cookies[0]["name"] == "session"
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        assert json.load(file)["version"] == state.STATE_VERSION
+
+    second = browser()
+    assert second.load_state(path, ttl=60, validate=lambda: second.get_cookie("session") is not None)
+    assert second.current_url == URL + "law"
+    assert second.get_cookie("session")["value"] == "abc"
+
+
+def test_invalid_state(tmp_path):
+    path = str(tmp_path / "user.json.gz")
+    assert not browser().load_state(path)
+    first = browser()
+    first.get(URL)
+    first.save_state(path)
+    assert not browser().load_state(path, validate=lambda: False)
+    time.sleep(0.05)
+    assert not browser().load_state(path, ttl=0.01)
+    assert state.load(path) is not None
+
+
+def test_expired_cookies_are_not_restored(tmp_path):
+    path = str(tmp_path / "user.json.gz")
+    first = browser()
+    first.get(URL)
+    first.add_cookie({"name": "old", "value": "1", "path": "/", "expiry": int(time.time()) + 1})
+    browser_state = state.capture(first.webdriver)
+    cookies = [dict(cookie, expiry=int(time.time()) - 10) for cookie in browser_state.cookies]
+    state.save(browser_state._replace(cookies=cookies), path)
+    second = browser()
+    assert second.load_state(path)
+    assert second.get_cookie("old") is None
@@ -0,0 +1,173 @@
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+
+pytest.importorskip("lxml")
+pytest.importorskip("cssselect")
+pytest.importorskip("flask")
+
+from selen_kaa import global_config  # noqa: E402
+from selen_kaa.metrics import MetricsCollector  # noqa: E402
+from selen_kaa.webdriver import SeWebDriver  # noqa: E402
+from selen_kaa.static_driver import StaticWebDriver  # noqa: E402
+from tests.webapp.server.app import flask_app  # noqa: E402
+from tests.webapp.webapp import WebApp  # noqa: E402
+from tests.webapp.pages.index_page import THE_SAME_CLASS  # noqa: E402
+from tests.webapp.setup import URL  # noqa: E402
+
+
+@pytest.fixture
+def static_app():
+    return WebApp(SeWebDriver(StaticWebDriver(wsgi_app=flask_app)))
+
+
+def test_page_objects_without_browser(static_app):
+    index_page = static_app.goto_index_page()
+    assert static_app.web_driver.title == "Selen-kaa"
+    assert len(index_page.the_same_text) == 7
+    assert index_page.the_same_text[3].text == "Test the same 3"
+    assert len(index_page.the_same_text.filter_text(contains="same 5")) == 1
+    index_page.btn_show_div.should.be_visible()
+    index_page.btn_show_div.should.have_class("btn-primary")
+    index_page.no_such_element.should.not_present_in_dom(timeout=0)
+
+
+def test_document_lookups_include_root_element(static_app):
+    static_app.goto_index_page()
+    driver = static_app.web_driver.webdriver
+    assert driver.find_element("css selector", "html").tag_name == "html"
+    assert driver.find_element("xpath", "/html").tag_name == "html"
+    assert driver.find_element("tag name", "html").tag_name == "html"
+    body = driver.find_element("tag name", "body")
+    # from an element, css matches descendants only
+    assert body.find_elements("css selector", "body") == []
+
+
+def test_follow_link(static_app):
+    static_app.goto_index_page()
+    static_app.web_driver.init_web_element("//a[text()='Go to law page']").click()
+    assert static_app.web_driver.current_url == URL + "law"
+    static_app.web_driver.back()
+    assert static_app.web_driver.current_url == URL
+
+
+def test_smart_click_without_javascript(static_app):
+    static_app.goto_index_page()
+    static_app.web_driver.init_web_element("//a[text()='Go to law page']").smart_click(timeout=0)
+    assert static_app.web_driver.current_url == URL + "law"
+
+
+def test_submit_form(static_app):
+    page = static_app.goto_form_page()
+    page.first_name.set_text_value("Viktor")
+    page.last_name.send_keys("Kaa")
+    page.agree.click()
+    static_app.web_driver.init_web_element("#country option[value='pl']").click()
+    old_input = static_app.web_driver.find_element("css selector", "#email")
+    page.submit.click()
+    submitted = {element.text for element in page.submitted_values}
+    assert {"first_name=Viktor", "last_name=Kaa", "agree=on", "country=pl"} <= submitted
+    assert page.first_name.get_attribute("value") == "Viktor"
+    with pytest.raises(StaleElementReferenceException):
+        old_input.send_keys("kaa@example.com")
+
+
+def test_no_javascript(static_app):
+    static_app.goto_index_page()
+    with pytest.raises(WebDriverException):
+        static_app.web_driver.execute_script("return 1;")
+
+
+def test_cookies(static_app):
+    static_app.goto_index_page()
+    static_app.web_driver.add_cookie({"name": "session", "value": "kaa"})
+    assert static_app.web_driver.get_cookie("session")["value"] == "kaa"
+    static_app.web_driver.delete_all_cookies()
+    assert static_app.web_driver.get_cookies() == []
+
+
+def test_collect_until_without_javascript(static_app):
+    index_page = static_app.goto_index_page()
+    items = list(index_page.the_same_text.collect_until(count=3))
+    assert [item.text for item in items] == ["Test the same 0", "Test the same 1", "Test the same 2"]
+    items = list(index_page.the_same_text.collect_until(predicate=lambda item: item.key.endswith("4")))
+    assert len(items) == 5
+
+
+def test_text_selectors_without_javascript(static_app):
+    static_app.goto_index_page()
+    browser = static_app.web_driver
+    assert browser.init_web_element("text=Test the same 3").text == "Test the same 3"
+    assert len(browser.init_all_web_elements("text~=TEST THE SAME")) == 7
+    browser.init_web_element("text~=in 5 second").should.have_class("btn-primary")
+    assert static_app.wait.element_be_in_dom("text=Test the same 3").text == "Test the same 3"
+    static_app.wait.element_to_contain_text("text~=test the same 3", "same 3", timeout=0)
+    static_app.wait.element_not_present("text=No such text", timeout=0)
+    static_app.wait.element_to_include_child_element("#about", "text=Test the same 3", timeout=0)
+    with pytest.raises(TimeoutException):
+        static_app.wait.element_to_include_child_element("#initial-stats", "text=Test the same 3", timeout=0)
+
+
+def test_stale_array_items_are_found_again(static_app, monkeypatch):
+    index_page = static_app.goto_index_page()
+    browser = static_app.web_driver
+    selector = THE_SAME_CLASS
+    recovered_before = MetricsCollector.stale_recoveries().get(selector, 0)
+    items = list(index_page.the_same_text)
+    third = index_page.the_same_text[2]
+    browser.refresh()
+    assert items[1].text == "Test the same 1"
+    assert third.text == "Test the same 2"
+    assert browser.metrics().stale_recoveries()[selector] == recovered_before + 2
+
+    wrapped = browser.init_web_element(selector)
+    wrapped.web_element = browser.find_element("css selector", selector)
+    monkeypatch.setattr(global_config, "STALE_RECOVERY_ATTEMPTS", 0)
+    browser.refresh()
+    with pytest.raises(StaleElementReferenceException):
+        assert third.text
+    monkeypatch.undo()
+    with pytest.raises(StaleElementReferenceException):
+        # an element without a locator of its own can't be found again
+        assert wrapped.text
+
+
+def test_stale_array_item_is_not_replaced_by_another_one():
+    rows = ["Row 0", "Row 1", "Row 2", "Row 3"]
+
+    def list_app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/html; charset=utf-8")])
+        items = "".join(f"<li class='row'>{row}</li>" for row in rows)
+        return [f"<html><body><ul>{items}</ul></body></html>".encode("utf-8")]
+
+    browser = SeWebDriver(StaticWebDriver(wsgi_app=list_app))
+    browser.get(URL)
+    items = list(browser.init_all_web_elements(".row"))
+    second = browser.init_all_web_elements(".row")[1]
+    assert [item.text for item in items[:2]] == ["Row 0", "Row 1"]
+    assert second.text == "Row 1"
+    rows.remove("Row 1")
+    browser.refresh()
+    assert items[0].text == "Row 0"
+    with pytest.raises(StaleElementReferenceException, match="replaced by another item"):
+        assert items[1].text
+    with pytest.raises(StaleElementReferenceException, match="replaced by another item"):
+        assert second.text
+    # the item wasn't used before it went stale, so it's found at its index
+    assert items[2].text == "Row 3"
+
+
+def test_waits_find_stale_array_items_again(static_app):
+    static_app.goto_index_page()
+    browser = static_app.web_driver
+    recovered_before = MetricsCollector.stale_recoveries().get(THE_SAME_CLASS, 0)
+    item = browser.init_all_web_elements(THE_SAME_CLASS)[1]
+    assert item.text == "Test the same 1"
+    browser.refresh()
+    assert item.should.have_exact_text("Test the same 1", timeout=1)
+    browser.refresh()
+    assert item.should.contain_text("the same 1", timeout=1)
+    browser.refresh()
+    assert item.should.have_similar_text("test the same 1", timeout=1)
+    browser.refresh()
+    assert item.should.have_class("the-same-class", timeout=1)
+    assert browser.metrics().stale_recoveries()[THE_SAME_CLASS] == recovered_before + 4
@@ -0,0 +1,48 @@
+import itertools
+from types import SimpleNamespace
+
+from selenium.webdriver.remote.command import Command
+
+from selen_kaa.deadline import budget, remaining
+from selen_kaa.tabs import TabScheduler
+
+
+class FakeBrowser:
+    """WebDriver of a browser, which records the commands, copies of it share the record."""
+    current_window_handle = "main"
+
+    def __init__(self):
+        self.commands = []
+        self._handles = (f"tab-{number}" for number in itertools.count())
+
+    def execute(self, driver_command, params=None):
+        self.commands.append((driver_command, params))
+        if driver_command == Command.NEW_WINDOW:
+            return {"value": {"handle": next(self._handles)}}
+        return {"value": None}
+
+    def close(self):
+        self.execute(Command.CLOSE)
+
+
+def scheduler_of(browser):
+    return TabScheduler(browser, lambda tab: SimpleNamespace(tab=tab, webdriver=tab.webdriver))
+
+
+def test_released_tab_is_closed():
+    browser = FakeBrowser()
+    tabs = scheduler_of(browser)
+    with tabs.session() as first:
+        assert first.tab.handle == "tab-0"
+    assert tabs.size == 0
+    assert browser.commands[-2:] == [(Command.SWITCH_TO_WINDOW, {"handle": "tab-0"}), (Command.CLOSE, None)]
+    with tabs.session() as second:
+        # a new tab, sessionStorage of the first flow is gone with its tab
+        assert second.tab.handle == "tab-1"
+
+
+def test_flows_run_in_the_budget_of_the_caller():
+    tabs = scheduler_of(FakeBrowser())
+    with budget(5):
+        results = tabs.run([lambda tab: remaining(60), lambda tab: remaining(60)], max_tabs=2)
+    assert all(result <= 5 for result in results)
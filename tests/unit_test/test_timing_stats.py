@@ -0,0 +1,126 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from selen_kaa.timing_stats import TimingStats
+from selen_kaa.utils.se_utils import percentile
+
+
+PAGE = "/index"
+SELECTOR = "#five-sec-visible"
+
+
+@pytest.fixture()
+def stats_path(tmp_path):
+    return str(tmp_path / "timings.json")
+
+
+def test_percentile():
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([5], 99) == 5
+    assert percentile([4, 1, 3, 2], 0) == 1
+    assert percentile([4, 1, 3, 2], 100) == 4
+
+
+def test_default_timeout_without_enough_samples(stats_path):
+    stats = TimingStats(stats_path, default_timeout=4, autosave=False)
+    for _ in range(TimingStats.MIN_SAMPLES - 1):
+        stats.record(PAGE, SELECTOR, 0.05)
+    assert stats.timeout_for(PAGE, SELECTOR) == 4
+
+
+def test_fast_element_gets_short_timeout(stats_path):
+    stats = TimingStats(stats_path, default_timeout=4, autosave=False)
+    for _ in range(20):
+        stats.record(PAGE, SELECTOR, 0.05)
+    assert stats.timeout_for(PAGE, SELECTOR) == TimingStats.MIN_TIMEOUT
+
+
+def test_slow_element_gets_headroom(stats_path):
+    stats = TimingStats(stats_path, default_timeout=4, max_timeout=10, autosave=False)
+    for _ in range(20):
+        stats.record(PAGE, SELECTOR, 3)
+    assert stats.timeout_for(PAGE, SELECTOR) == 6
+    stats.record(PAGE, SELECTOR, 30)
+    assert stats.timeout_for(PAGE, SELECTOR) == 10
+
+
+def test_stats_are_persisted_and_merged(stats_path):
+    first = TimingStats(stats_path, autosave=False)
+    second = TimingStats(stats_path, autosave=False)
+    first.record(PAGE, SELECTOR, 0.1)
+    second.record(PAGE, SELECTOR, 0.2)
+    first.save()
+    second.save()
+
+    with open(stats_path) as file_:
+        content = json.load(file_)
+    assert content["stats"][PAGE][SELECTOR] == [0.1, 0.2]
+    assert TimingStats(stats_path, autosave=False).samples(PAGE, SELECTOR) == [0.1, 0.2]
+    assert second.percentile(PAGE, SELECTOR, 50) == pytest.approx(0.15)
+
+
+def test_broken_file_is_ignored(stats_path):
+    with open(stats_path, "w") as file_:
+        file_.write("{not a json")
+    stats = TimingStats(stats_path, autosave=False)
+    assert stats.percentile(PAGE, SELECTOR, 50) is None
+
+
+def test_page_is_resolved_at_lookup(stats_path):
+    pytest.importorskip("lxml")
+    pytest.importorskip("flask")
+    from selen_kaa.webdriver import SeWebDriver
+    from selen_kaa.static_driver import StaticWebDriver
+    from tests.webapp.server.app import flask_app
+    from tests.webapp.setup import URL
+
+    stats = TimingStats(stats_path, default_timeout=4, autosave=False)
+    for _ in range(TimingStats.MIN_SAMPLES):
+        stats.record("/law", "footer", 0.01)
+    browser = SeWebDriver(StaticWebDriver(wsgi_app=flask_app), timing_stats=stats)
+    # declared before the navigation, like in the page objects
+    title = browser.init_web_element("footer")
+    browser.get(URL + "law")
+    assert title.timeout == TimingStats.MIN_TIMEOUT
+    assert title.tag_name == "footer"
+    # the footer was there at once, it's not a sample of time-to-appear
+    assert len(stats.samples("/law", "footer")) == TimingStats.MIN_SAMPLES
+    assert stats.samples("/", "footer") == []
+
+
+class SlowPageDriver:
+    """Webdriver without JavaScript, the element appears at the third lookup, reads of the url are counted."""
+    capabilities = {"javascriptEnabled": False}
+
+    def __init__(self):
+        self.lookups = 0
+        self.url_reads = 0
+
+    @property
+    def current_url(self):
+        self.url_reads += 1
+        return "http://127.0.0.1:5000/slow?page=1"
+
+    def find_element(self, by, value):
+        self.lookups += 1
+        if self.lookups < 3:
+            raise NoSuchElementException(value)
+        return SimpleNamespace(tag_name="div")
+
+
+def test_sample_is_recorded_for_absent_element_only(stats_path):
+    from selen_kaa.element.se_web_element import SeWebElement
+
+    stats = TimingStats(stats_path, default_timeout=4, autosave=False)
+    driver = SlowPageDriver()
+    element = SeWebElement(driver, "#slow", timeout=None, timing_stats=stats)
+    assert element.tag_name == "div"
+    assert len(stats.samples("/slow", "#slow")) == 1
+    # one read for the timeout and the sample of the lookup
+    assert driver.url_reads == 1
+    assert element.tag_name == "div"
+    assert len(stats.samples("/slow", "#slow")) == 1
+    assert driver.url_reads == 2
@@ -0,0 +1,83 @@
+import pytest
+from selenium.webdriver.common.by import By
+
+from selen_kaa import global_config
+from selen_kaa.utils import se_utils
+from selen_kaa.utils.xpath_to_css import xpath_to_css
+from selen_kaa.utils.selector_profiler import SelectorCost, format_report
+
+
+@pytest.mark.parametrize("xpath, css", (
+    ("//div", "div"),
+    ("//*", "*"),
+    ("/html/body", "html:root > body"),
+    ("//ul/li", "ul > li"),
+    ("//div/descendant::a", "div a"),
+    ("//div[@id='main']//a[contains(@href, '/img')]", 'div#main a[href*="/img"]'),
+    ("//div[@id='1a']", 'div[id="1a"]'),
+    ("//div[@class='test tttest']", 'div[class="test tttest"]'),
+    ("//div[contains(concat(' ', normalize-space(@class), ' '), ' well ')]", "div.well"),
+    ('//input[starts-with(@name, "user")]', 'input[name^="user"]'),
+    ("//a[not(@href)]", "a:not([href])"),
+    ("//a[@href!='x']", 'a[href]:not([href="x"])'),
+    ("//a[@x and @y='1']", 'a[x][y="1"]'),
+    ("//ul/li[2]", "ul > li:nth-of-type(2)"),
+    ("//li[last()]", "li:last-of-type"),
+    ("//*[3]", ":nth-child(3)"),
+    ("//li[2][@class='a']", 'li:nth-of-type(2)[class="a"]'),
+    ("//a | //b[@x]", "a, b[x]"),
+    ("//a[@title='say \"hi\"']", 'a[title="say \\"hi\\""]'),
+))
+def test_xpath_is_translated(xpath, css):
+    assert xpath_to_css(xpath) == css
+
+
+def test_relative_xpath_is_translated_only_from_element():
+    assert xpath_to_css("./span", element_context=True) == ":scope > span"
+    assert xpath_to_css(".//span", element_context=True) == ":scope span"
+    # at the document level `:scope` is <html>, not the context node
+    assert xpath_to_css("./span") is None
+    assert xpath_to_css(".//span | //a") is None
+    # from an element XPath `//a` searches the whole document, CSS `a` only the descendants
+    assert xpath_to_css("//a", element_context=True) is None
+    assert xpath_to_css("/html/body", element_context=True) is None
+    assert xpath_to_css("./span | //a", element_context=True) is None
+
+
+@pytest.mark.parametrize("xpath", (
+    "./div/div/.class",
+    "/html//div[contains(text(), 'The page')]",
+    "/bookstore/book[price>35.00]/title",
+    "//li[@class='a'][2]",
+    "//div/..",
+    "//a/@href",
+    "(//li)[1]",
+    "//a[@x or @y]",
+    "//following-sibling::div",
+    "//div//",
+))
+def test_untranslatable_xpath(xpath):
+    assert xpath_to_css(xpath) is None
+
+
+def test_fast_locator_is_off_by_default():
+    xpath = "//div[@id='main']"
+    assert se_utils.to_fast_locator(By.XPATH, xpath) == (By.XPATH, xpath)
+
+
+def test_fast_locator_translates_xpath(monkeypatch):
+    monkeypatch.setattr(global_config, "TRANSLATE_XPATH_TO_CSS", True)
+    assert se_utils.to_fast_locator(By.XPATH, "//div[@id='main']") == (By.CSS_SELECTOR, "div#main")
+    assert se_utils.to_fast_locator(By.XPATH, "//div[text()='a']") == (By.XPATH, "//div[text()='a']")
+    assert se_utils.to_fast_locator(By.CSS_SELECTOR, "#main") == (By.CSS_SELECTOR, "#main")
+
+
+def test_format_report():
+    costs = [SelectorCost("//div[@id='a']", "div#a", 2.5, 1, 0.5, 1),
+             SelectorCost("//li[2]", "li:nth-of-type(2)", 1.0, 3, 0.1, 2),
+             SelectorCost(".css", None, None, None, 0.2, 4)]
+    report = format_report(costs)
+    assert "-> div#a" in report
+    assert "matches differ" in report
+    assert costs[0].is_translation_safe and not costs[1].is_translation_safe
+    assert costs[2].cost_ms == 0.2
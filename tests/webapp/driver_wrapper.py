@@ -1,9 +1,9 @@
 """Just a class to verify the wrapping works"""
-import re
 import time
 import logging
 
-from selenium.common.exceptions import WebDriverException, UnexpectedAlertPresentException
+from selenium.common.exceptions import (ElementClickInterceptedException, ElementNotInteractableException,
+                                        WebDriverException, UnexpectedAlertPresentException)
 
 from selen_kaa.webdriver import SeWebDriver
 from selen_kaa.element.se_web_element import SeWebElement
@@ -18,21 +18,12 @@ class WebElementWrapper(SeWebElement):
 
     def should_be_unclickable(self, timeout: TimeoutType = 0.1):
         try:
-            self.click(timeout)
-        except ElementNotClickableError:
+            self.smart_click(timeout)
+        except (ElementClickInterceptedException, ElementNotInteractableException):
             return True
         return False
 
 
-class ElementNotClickableError(WebDriverException):
-    """ Special exception for cases where element can't receive a click. """
-
-    @staticmethod
-    def can_handle_exception(error: WebDriverException):
-        pattern = re.compile(r"is not clickable at point \([0-9]+, [0-9]+\). Other element would receive the click:")
-        return pattern.search(error.msg) is not None
-
-
 class DriverWrapper(SeWebDriver):
 
     def __init__(self, webdriver):
@@ -0,0 +1,21 @@
+
+
+FIRST_NAME = "#first-name"
+LAST_NAME = "#last-name"
+EMAIL = "#email"
+ABOUT = "#about"
+AGREE = "#agree"
+COUNTRY = "#country"
+SUBMIT = "#submit-form"
+SUBMITTED_VALUES = ".submitted-value"
+
+
+class FormPage:
+
+    def __init__(self, webdriver):
+        self._webdriver = webdriver
+        self.first_name = self._webdriver.init_web_element(FIRST_NAME)
+        self.last_name = self._webdriver.init_web_element(LAST_NAME)
+        self.agree = self._webdriver.init_web_element(AGREE)
+        self.submit = self._webdriver.init_web_element(SUBMIT)
+        self.submitted_values = self._webdriver.init_all_web_elements(SUBMITTED_VALUES)
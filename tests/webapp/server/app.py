@@ -1,6 +1,6 @@
 import os
 
-from flask import Flask, render_template
+from flask import Flask, render_template, request
 
 # configure application
 flask_app = Flask(__name__)
@@ -31,6 +31,11 @@ def school():
     return render_template("school.html")
 
 
+@flask_app.route("/form", methods=["GET", "POST"])
+def form():
+    return render_template("form.html", data=request.form)
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     flask_app.run(debug=True, port=port)
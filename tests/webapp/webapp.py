@@ -1,6 +1,7 @@
 from selen_kaa.waits import Wait
 
 from tests.webapp.pages.index_page import IndexPage
+from tests.webapp.pages.form_page import FormPage
 from tests.webapp.setup import URL
 
 
@@ -13,3 +14,7 @@ class WebApp:
     def goto_index_page(self):
         self.web_driver.get(URL)
         return IndexPage(self.web_driver)
+
+    def goto_form_page(self):
+        self.web_driver.get(URL + "form")
+        return FormPage(self.web_driver)